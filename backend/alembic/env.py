@@ -8,7 +8,9 @@ from app.config import settings
 from app.database import Base
 
 # Import all models so Alembic can detect them
-from app.models import Participant, Admin, Event, Booking, OTPCode
+from app.models import Participant, Admin, Event, Booking, OTPCode, TestResult
+from app.models import EventStats, EventBookingHourly
+from app.services.otp_partitions import is_partition as is_otp_partition
 
 # this is the Alembic Config object
 config = context.config
@@ -24,6 +26,13 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave otp_codes partitions out of autogenerate; they are managed at runtime"""
+    if type_ == "table" and is_otp_partition(name):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -32,6 +41,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -49,7 +59,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
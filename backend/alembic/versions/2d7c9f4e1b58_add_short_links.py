@@ -0,0 +1,39 @@
+"""add short links
+
+Revision ID: 2d7c9f4e1b58
+Revises: 6f1d3b8e2a47
+Create Date: 2025-12-07 11:03:48.671925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7c9f4e1b58'
+down_revision: Union[str, None] = '6f1d3b8e2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('short_links',
+    sa.Column('code', sa.String(length=16), nullable=False),
+    sa.Column('target_url', sa.Text(), nullable=False),
+    sa.Column('result_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('click_count', sa.Integer(), nullable=False),
+    sa.Column('last_clicked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['result_id'], ['test_results.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.create_index('ix_short_links_result_id', 'short_links', ['result_id'], unique=True,
+                    postgresql_where=sa.text("result_id IS NOT NULL"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_short_links_result_id', table_name='short_links')
+    op.drop_table('short_links')
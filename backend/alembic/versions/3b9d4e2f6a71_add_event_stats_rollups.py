@@ -0,0 +1,72 @@
+"""add event stats rollup tables
+
+Revision ID: 3b9d4e2f6a71
+Revises: 7ee058d5e342
+Create Date: 2025-11-24 10:15:42.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d4e2f6a71'
+down_revision: Union[str, None] = '7ee058d5e342'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('confirmed_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('checked_in_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('results_uploaded_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('sms_sent_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_table('event_booking_hourly',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('bookings_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'hour')
+    )
+
+    # One-off backfill from existing rows; afterwards the counters are
+    # maintained incrementally by the application.
+    op.execute("""
+        INSERT INTO event_stats (
+            event_id, confirmed_count, cancelled_count, checked_in_count,
+            results_uploaded_count, sms_sent_count, updated_at
+        )
+        SELECT
+            e.id,
+            COUNT(b.id) FILTER (WHERE b.booking_status = 'confirmed'),
+            COUNT(b.id) FILTER (WHERE b.booking_status = 'cancelled'),
+            COUNT(b.id) FILTER (WHERE b.booking_status = 'checked_in'),
+            COUNT(r.id),
+            COUNT(r.id) FILTER (WHERE r.sms_sent),
+            now() AT TIME ZONE 'utc'
+        FROM events e
+        LEFT JOIN bookings b ON b.event_id = e.id
+        LEFT JOIN test_results r ON r.booking_id = b.id
+        GROUP BY e.id
+    """)
+    op.execute("""
+        INSERT INTO event_booking_hourly (event_id, hour, bookings_count)
+        SELECT event_id, date_trunc('hour', booked_at), COUNT(*)
+        FROM bookings
+        WHERE booked_at IS NOT NULL
+        GROUP BY event_id, date_trunc('hour', booked_at)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('event_booking_hourly')
+    op.drop_table('event_stats')
@@ -0,0 +1,66 @@
+"""add sms queue and dead letters
+
+Revision ID: 4c8e2f7a9b13
+Revises: b3e7a1d95f60
+Create Date: 2025-12-05 09:42:17.284630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2f7a9b13'
+down_revision: Union[str, None] = 'b3e7a1d95f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sms_queue',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('priority', sa.SmallInteger(), nullable=False),
+    sa.Column('provider', sa.String(length=30), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('provider_sid', sa.String(length=64), nullable=True),
+    sa.Column('result_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['result_id'], ['test_results.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sms_queue_ready', 'sms_queue', ['provider', 'priority', 'next_attempt_at'], unique=False,
+                    postgresql_where=sa.text("status IN ('queued', 'sending')"))
+
+    op.create_table('sms_dead_letters',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('provider', sa.String(length=30), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('result_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('failed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['result_id'], ['test_results.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sms_dead_letters_failed_at'), 'sms_dead_letters', ['failed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sms_dead_letters_failed_at'), table_name='sms_dead_letters')
+    op.drop_table('sms_dead_letters')
+    op.drop_index('ix_sms_queue_ready', table_name='sms_queue')
+    op.drop_table('sms_queue')
@@ -0,0 +1,45 @@
+"""add result listing indexes and abnormal rollup
+
+Revision ID: 5e2a9c4b7d13
+Revises: 8c1f5a7d2e94
+Create Date: 2025-11-26 14:03:51.264019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c4b7d13'
+down_revision: Union[str, None] = '8c1f5a7d2e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_test_results_uploaded_at_id', 'test_results', ['uploaded_at', 'id'], unique=False)
+    op.create_index('ix_test_results_category_uploaded_at', 'test_results', ['result_category', 'uploaded_at', 'id'], unique=False)
+    op.create_index('ix_test_results_sms_sent_uploaded_at', 'test_results', ['sms_sent', 'uploaded_at', 'id'], unique=False)
+
+    op.add_column('event_stats', sa.Column('abnormal_results_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE event_stats s
+        SET abnormal_results_count = c.abnormal
+        FROM (
+            SELECT b.event_id, COUNT(*) AS abnormal
+            FROM test_results r
+            JOIN bookings b ON b.id = r.booking_id
+            WHERE r.result_category <> 'Normal'
+            GROUP BY b.event_id
+        ) c
+        WHERE s.event_id = c.event_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('event_stats', 'abnormal_results_count')
+    op.drop_index('ix_test_results_sms_sent_uploaded_at', table_name='test_results')
+    op.drop_index('ix_test_results_category_uploaded_at', table_name='test_results')
+    op.drop_index('ix_test_results_uploaded_at_id', table_name='test_results')
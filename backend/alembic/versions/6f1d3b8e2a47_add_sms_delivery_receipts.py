@@ -0,0 +1,47 @@
+"""add sms delivery receipts
+
+Revision ID: 6f1d3b8e2a47
+Revises: 4c8e2f7a9b13
+Create Date: 2025-12-06 14:27:05.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1d3b8e2a47'
+down_revision: Union[str, None] = '4c8e2f7a9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sms_delivery_receipts',
+    sa.Column('provider_sid', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error_code', sa.String(length=10), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('provider_sid')
+    )
+    op.create_index('ix_sms_queue_provider_sid', 'sms_queue', ['provider_sid'], unique=True,
+                    postgresql_where=sa.text("provider_sid IS NOT NULL"))
+
+    op.add_column('test_results', sa.Column('sms_delivery_status', sa.String(length=20), nullable=True))
+    op.add_column('test_results', sa.Column('sms_delivered_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_test_results_delivery_uploaded_at', 'test_results', ['sms_delivery_status', 'uploaded_at', 'id'], unique=False)
+
+    op.add_column('event_stats', sa.Column('sms_delivered_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('event_stats', sa.Column('sms_failed_count', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('event_stats', 'sms_failed_count')
+    op.drop_column('event_stats', 'sms_delivered_count')
+    op.drop_index('ix_test_results_delivery_uploaded_at', table_name='test_results')
+    op.drop_column('test_results', 'sms_delivered_at')
+    op.drop_column('test_results', 'sms_delivery_status')
+    op.drop_index('ix_sms_queue_provider_sid', table_name='sms_queue')
+    op.drop_table('sms_delivery_receipts')
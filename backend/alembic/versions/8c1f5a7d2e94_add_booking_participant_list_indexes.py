@@ -0,0 +1,27 @@
+"""add booking participant list indexes
+
+Revision ID: 8c1f5a7d2e94
+Revises: 3b9d4e2f6a71
+Create Date: 2025-11-25 09:42:07.531886
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f5a7d2e94'
+down_revision: Union[str, None] = '3b9d4e2f6a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_event_booked_at', 'bookings', ['event_id', 'booked_at'], unique=False)
+    op.create_index('ix_bookings_event_status_booked_at', 'bookings', ['event_id', 'booking_status', 'booked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_event_status_booked_at', table_name='bookings')
+    op.drop_index('ix_bookings_event_booked_at', table_name='bookings')
@@ -0,0 +1,40 @@
+"""add result sms jobs
+
+Revision ID: 8e4b1c6d3f20
+Revises: 2d7c9f4e1b58
+Create Date: 2025-12-08 10:15:32.904217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b1c6d3f20'
+down_revision: Union[str, None] = '2d7c9f4e1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('result_sms_jobs',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('admin_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_result_sms_jobs_admin_id'), 'result_sms_jobs', ['admin_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_result_sms_jobs_admin_id'), table_name='result_sms_jobs')
+    op.drop_table('result_sms_jobs')
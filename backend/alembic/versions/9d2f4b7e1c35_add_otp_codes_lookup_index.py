@@ -0,0 +1,25 @@
+"""add otp_codes lookup index
+
+Revision ID: 9d2f4b7e1c35
+Revises: f6a3d9c1e802
+Create Date: 2025-12-03 10:14:52.730418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f4b7e1c35'
+down_revision: Union[str, None] = 'f6a3d9c1e802'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_otp_codes_lookup', 'otp_codes', ['phone_number', 'purpose', 'verified', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_otp_codes_lookup', table_name='otp_codes')
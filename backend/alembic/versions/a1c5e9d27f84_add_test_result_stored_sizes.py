@@ -0,0 +1,30 @@
+"""add test_result stored sizes
+
+Revision ID: a1c5e9d27f84
+Revises: 8e4b1c6d3f20
+Create Date: 2025-12-09 11:02:17.541893
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c5e9d27f84'
+down_revision: Union[str, None] = '8e4b1c6d3f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('stored_file_size', sa.Integer(), nullable=True))
+    op.add_column('test_results', sa.Column('thumbnail_file_size', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_test_results_file_sha256'), 'test_results', ['file_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_test_results_file_sha256'), table_name='test_results')
+    op.drop_column('test_results', 'thumbnail_file_size')
+    op.drop_column('test_results', 'stored_file_size')
@@ -0,0 +1,31 @@
+"""add test_result upload status
+
+Revision ID: a47c3e8f1b25
+Revises: 5e2a9c4b7d13
+Create Date: 2025-11-27 11:20:33.907145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a47c3e8f1b25'
+down_revision: Union[str, None] = '5e2a9c4b7d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were uploaded synchronously, so they are already complete
+    op.add_column('test_results', sa.Column('upload_status', sa.String(length=20), nullable=False, server_default='uploaded'))
+    op.add_column('test_results', sa.Column('upload_error', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_test_results_upload_status'), 'test_results', ['upload_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_test_results_upload_status'), table_name='test_results')
+    op.drop_column('test_results', 'upload_error')
+    op.drop_column('test_results', 'upload_status')
@@ -0,0 +1,40 @@
+"""add test_results.sms_provider_sid so receipts outlive the sms_queue purge
+
+Revision ID: a6c9e2f4d851
+Revises: f2a8d4c6b913
+Create Date: 2025-12-11 16:38:05.274691
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c9e2f4d851'
+down_revision: Union[str, None] = 'f2a8d4c6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('sms_provider_sid', sa.String(length=64), nullable=True))
+    # Latest sent notification per result, from messages not yet purged
+    op.execute("""
+        UPDATE test_results t
+        SET sms_provider_sid = q.provider_sid
+        FROM (
+            SELECT DISTINCT ON (result_id) result_id, provider_sid
+            FROM sms_queue
+            WHERE result_id IS NOT NULL AND provider_sid IS NOT NULL
+            ORDER BY result_id, sent_at DESC
+        ) q
+        WHERE t.id = q.result_id
+    """)
+    op.create_index(op.f('ix_test_results_sms_provider_sid'), 'test_results', ['sms_provider_sid'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_test_results_sms_provider_sid'), table_name='test_results')
+    op.drop_column('test_results', 'sms_provider_sid')
@@ -0,0 +1,102 @@
+"""partition otp_codes by created_at
+
+Revision ID: b3e7a1d95f60
+Revises: 9d2f4b7e1c35
+Create Date: 2025-12-04 11:08:23.615092
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7a1d95f60'
+down_revision: Union[str, None] = '9d2f4b7e1c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Daily partitions created up front; the maintenance job keeps ahead after this
+INITIAL_PARTITION_DAYS = 7
+
+COLUMNS = "id, phone_number, otp_code, purpose, created_at, expires_at, verified, attempts"
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_otp_codes_expires_at'), 'otp_codes', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_otp_codes_phone_number'), 'otp_codes', ['phone_number'], unique=False)
+    op.create_index('ix_otp_codes_lookup', 'otp_codes', ['phone_number', 'purpose', 'verified', 'created_at'], unique=False)
+
+
+def upgrade() -> None:
+    op.rename_table('otp_codes', 'otp_codes_legacy')
+    op.drop_index('ix_otp_codes_lookup', table_name='otp_codes_legacy')
+    op.drop_index(op.f('ix_otp_codes_expires_at'), table_name='otp_codes_legacy')
+    op.drop_index(op.f('ix_otp_codes_phone_number'), table_name='otp_codes_legacy')
+    op.execute("ALTER TABLE otp_codes_legacy RENAME CONSTRAINT otp_codes_pkey TO otp_codes_legacy_pkey")
+
+    # The partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE otp_codes (
+            id UUID NOT NULL,
+            phone_number VARCHAR(20) NOT NULL,
+            otp_code VARCHAR(6) NOT NULL,
+            purpose VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            verified BOOLEAN,
+            attempts INTEGER,
+            CONSTRAINT otp_codes_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    today = datetime.utcnow().date()
+    yesterday = today - timedelta(days=1)
+    for offset in range(-1, INITIAL_PARTITION_DAYS + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE otp_codes_p{day:%Y%m%d} PARTITION OF otp_codes "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+
+    # Only codes that can still be used are worth keeping
+    op.execute(f"""
+        INSERT INTO otp_codes ({COLUMNS})
+        SELECT {COLUMNS} FROM otp_codes_legacy
+        WHERE created_at >= '{yesterday.isoformat()}'
+          AND expires_at > now() AT TIME ZONE 'utc'
+    """)
+    op.drop_table('otp_codes_legacy')
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    op.rename_table('otp_codes', 'otp_codes_partitioned')
+    op.execute("ALTER TABLE otp_codes_partitioned RENAME CONSTRAINT otp_codes_pkey TO otp_codes_partitioned_pkey")
+    op.drop_index('ix_otp_codes_lookup', table_name='otp_codes_partitioned')
+    op.drop_index(op.f('ix_otp_codes_expires_at'), table_name='otp_codes_partitioned')
+    op.drop_index(op.f('ix_otp_codes_phone_number'), table_name='otp_codes_partitioned')
+
+    op.create_table('otp_codes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=False),
+    sa.Column('otp_code', sa.String(length=6), nullable=False),
+    sa.Column('purpose', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('verified', sa.Boolean(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"""
+        INSERT INTO otp_codes ({COLUMNS})
+        SELECT {COLUMNS} FROM otp_codes_partitioned
+        WHERE expires_at > now() AT TIME ZONE 'utc'
+    """)
+    # Drops every partition with it
+    op.drop_table('otp_codes_partitioned')
+
+    _create_indexes()
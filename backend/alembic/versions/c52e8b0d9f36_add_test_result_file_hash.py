@@ -0,0 +1,28 @@
+"""add test_result file hash and size
+
+Revision ID: c52e8b0d9f36
+Revises: a47c3e8f1b25
+Create Date: 2025-11-28 16:48:12.350672
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e8b0d9f36'
+down_revision: Union[str, None] = 'a47c3e8f1b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('file_sha256', sa.String(length=64), nullable=True))
+    op.add_column('test_results', sa.Column('file_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_results', 'file_size')
+    op.drop_column('test_results', 'file_sha256')
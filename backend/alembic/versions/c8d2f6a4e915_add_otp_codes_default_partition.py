@@ -0,0 +1,27 @@
+"""add otp_codes default partition
+
+Revision ID: c8d2f6a4e915
+Revises: a1c5e9d27f84
+Create Date: 2025-12-09 15:44:08.217630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d2f6a4e915'
+down_revision: Union[str, None] = 'a1c5e9d27f84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Catches codes issued for days the maintenance job hasn't created a partition for yet
+    op.execute("CREATE TABLE otp_codes_default PARTITION OF otp_codes DEFAULT")
+
+
+def downgrade() -> None:
+    # Codes in it are for days without a partition, and can't be kept without one
+    op.execute("DROP TABLE otp_codes_default")
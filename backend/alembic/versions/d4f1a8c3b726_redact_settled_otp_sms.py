@@ -0,0 +1,30 @@
+"""redact settled otp sms and index sent messages for retention
+
+Revision ID: d4f1a8c3b726
+Revises: c8d2f6a4e915
+Create Date: 2025-12-10 09:27:51.306418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f1a8c3b726'
+down_revision: Union[str, None] = 'c8d2f6a4e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Codes already sent or given up on are never needed again
+    op.execute("UPDATE sms_queue SET body = '[redacted]' WHERE kind = 'otp' AND status = 'sent'")
+    op.execute("UPDATE sms_dead_letters SET body = '[redacted]' WHERE kind = 'otp'")
+    op.create_index('ix_sms_queue_sent_at', 'sms_queue', ['sent_at'], unique=False,
+                    postgresql_where=sa.text("status = 'sent'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sms_queue_sent_at', table_name='sms_queue')
@@ -0,0 +1,44 @@
+"""add test_result public_id
+
+Revision ID: e18b6d2a4c07
+Revises: c52e8b0d9f36
+Create Date: 2025-12-01 10:05:29.774310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e18b6d2a4c07'
+down_revision: Union[str, None] = 'c52e8b0d9f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('public_id', sa.String(length=255), nullable=True))
+
+    # Backfill from result_file_url, mirroring the parsing view_result_with_otp used to do:
+    #   https://res.cloudinary.com/{cloud}/raw/{upload|private}/v123/{public_id}.pdf
+    #   local://{key} and s3://{key}
+    op.execute(r"""
+        UPDATE test_results
+        SET public_id = CASE
+            WHEN result_file_url ~ '/(upload|private)/'
+                THEN regexp_replace(
+                    result_file_url,
+                    '^.*?/(upload|private)/(v[0-9]+/)?(.*?)(\.pdf)?$',
+                    '\3'
+                )
+            WHEN result_file_url LIKE 'local://%' OR result_file_url LIKE 's3://%'
+                THEN regexp_replace(result_file_url, '^[a-z0-9]+://', '')
+        END
+        WHERE public_id IS NULL AND result_file_url IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('test_results', 'public_id')
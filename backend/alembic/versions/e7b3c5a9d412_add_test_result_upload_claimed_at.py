@@ -0,0 +1,28 @@
+"""add test_results.upload_claimed_at for upload claims
+
+Revision ID: e7b3c5a9d412
+Revises: d4f1a8c3b726
+Create Date: 2025-12-11 10:14:32.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c5a9d412'
+down_revision: Union[str, None] = 'd4f1a8c3b726'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('upload_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    # Rows mid-upload go back to the queue
+    op.execute("UPDATE test_results SET upload_status = 'pending' WHERE upload_status = 'uploading'")
+    op.drop_column('test_results', 'upload_claimed_at')
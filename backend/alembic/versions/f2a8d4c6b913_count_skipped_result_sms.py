@@ -0,0 +1,28 @@
+"""rename result_sms_jobs.sent to queued and count skipped rows
+
+Revision ID: f2a8d4c6b913
+Revises: e7b3c5a9d412
+Create Date: 2025-12-11 14:02:47.631950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8d4c6b913'
+down_revision: Union[str, None] = 'e7b3c5a9d412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('result_sms_jobs', 'sent', new_column_name='queued')
+    op.add_column('result_sms_jobs', sa.Column('skipped', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('result_sms_jobs', 'skipped')
+    op.alter_column('result_sms_jobs', 'queued', new_column_name='sent')
@@ -0,0 +1,26 @@
+"""add test_result thumbnail
+
+Revision ID: f6a3d9c1e802
+Revises: e18b6d2a4c07
+Create Date: 2025-12-02 15:31:46.208553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a3d9c1e802'
+down_revision: Union[str, None] = 'e18b6d2a4c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('thumbnail_public_id', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_results', 'thumbnail_public_id')
@@ -5,17 +5,84 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Async engine (asyncpg) for the ported hot routers: events, participant bookings, auth
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 10
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Password hashing (bcrypt runs in a process pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16  # Beyond workers; more requests get 503
+    PASSWORD_HASH_TIMEOUT_SECONDS: int = 10
     
     # Twilio
     TWILIO_ACCOUNT_SID: str
     TWILIO_AUTH_TOKEN: str
     TWILIO_PHONE_NUMBER: str
-    SMS_MODE:  str
+    SMS_MODE:  str  # 'live' sends through the provider; anything else only logs
+    SMS_RATE_LIMIT_PER_SECOND: float = 5.0
+    SMS_PROVIDER_RATE_LIMITS: dict[str, float] = {}  # Per-provider overrides, e.g. {"twilio": 10}
+    SMS_DISPATCH_CONCURRENCY: int = 4  # Messages in flight per provider
+    SMS_DISPATCH_BATCH_SIZE: int = 50
+    SMS_SEGMENT_BUDGETS: dict[str, int] = {}  # Per template kind, e.g. {"result_abnormal": 3}
+
+    # Delivery receipts (provider status callbacks)
+    SMS_STATUS_CALLBACK_ENABLED: bool = True
+    SMS_STATUS_CALLBACK_URL: Optional[str] = None  # Defaults to PUBLIC_API_URL + /sms/status-callback
+    SMS_STATUS_CALLBACK_VERIFY: bool = True  # Check X-Twilio-Signature
+    SMS_RECEIPT_BATCH_SIZE: int = 500
+    SMS_RECEIPT_FLUSH_SECONDS: float = 2.0
+    SMS_RECEIPT_BUFFER_MAX: int = 50000
+
+    # SMS delivery queue (sms_queue table)
+    SMS_QUEUE_WORKERS_ENABLED: bool = True  # Disable to run workers separately (python -m app.services.sms_queue)
+    SMS_QUEUE_POLL_SECONDS: float = 1.0
+    SMS_QUEUE_MAX_ATTEMPTS: int = 5
+    SMS_QUEUE_RETRY_BASE_SECONDS: float = 5.0
+    SMS_QUEUE_RETRY_MAX_SECONDS: float = 600.0
+    SMS_QUEUE_LEASE_SECONDS: int = 60  # A claimed message is retried if not settled by then
+    SMS_QUEUE_METRICS_INTERVAL_SECONDS: int = 15
+    SMS_QUEUE_RETENTION_DAYS: int = 7  # Sent messages are purged after this
+    SMS_DEAD_LETTER_RETENTION_DAYS: int = 30
+    SMS_QUEUE_PURGE_INTERVAL_SECONDS: int = 3600
+    # Messages API base URL; point at benchmarks/fake_sms_provider.py to test offline
+    SMS_PROVIDER_BASE_URL: str = "https://api.twilio.com"
+    SMS_HTTP_POOL_SIZE: int = 10
+    SMS_HTTP_TIMEOUT_SECONDS: float = 10.0
+
+    # Short links in SMS bodies, served at SHORT_LINK_BASE_URL/{code}
+    SHORT_LINK_BASE_URL: Optional[str] = None  # Defaults to PUBLIC_API_URL + /r
+    SHORT_LINK_CODE_LENGTH: int = 7  # Base62; 62^7 is ~3.5e12 codes
+    RESULT_PAGE_URL: str = "https://rose.org/results/{result_id}"  # Where result short links lead
+    SHORT_LINK_CACHE_SIZE: int = 50000
+    SHORT_LINK_CACHE_TTL_SECONDS: int = 3600
+    SHORT_LINK_CLICK_FLUSH_SECONDS: float = 10.0
+
+    # OTP store: 'sql', 'memory' (single process only) or 'redis'
+    OTP_STORE_BACKEND: str = "sql"
+    OTP_REDIS_URL: str = "redis://localhost:6379/0"
+    OTP_PARTITION_PRECREATE_DAYS: int = 7
+    OTP_PARTITION_RETENTION_DAYS: int = 1
+    OTP_PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+
+    # OTP request limits (sliding window); backend 'memory' or 'redis'
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None  # Defaults to OTP_REDIS_URL
+    OTP_RATE_LIMIT_PER_PHONE: int = 3
+    OTP_RATE_LIMIT_PHONE_WINDOW_SECONDS: int = 600
+    OTP_RATE_LIMIT_PER_IP: int = 20
+    OTP_RATE_LIMIT_IP_WINDOW_SECONDS: int = 3600
+    TRUST_FORWARDED_FOR: bool = False  # Only behind a proxy that sets X-Forwarded-For
+
     # Google Maps
     GOOGLE_MAPS_API_KEY: Optional[str] = None
     
@@ -23,9 +90,50 @@ class Settings(BaseSettings):
     CLOUDINARY_CLOUD_NAME: Optional[str] = None
     CLOUDINARY_API_KEY: Optional[str] = None
     CLOUDINARY_API_SECRET: Optional[str] = None
+
+    # Result storage: 'cloudinary', 'local' or 's3'
+    RESULT_STORAGE_BACKEND: str = "cloudinary"
+    LOCAL_STORAGE_DIR: str = "storage/results"
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    PUBLIC_API_URL: str = "http://localhost:8000"
+    # At-rest encryption of result files: urlsafe base64 of 32 random bytes
+    RESULT_ENCRYPTION_KEY: Optional[str] = None
+    RESULT_DOWNLOAD_TOKEN_MINUTES: int = 10
+
+    # Results
+    RESULT_UPLOAD_WORKERS: int = 4
+    RESULT_UPLOAD_MAX_ATTEMPTS: int = 3  # Storage errors are retried with backoff before failing the row
+    RESULT_UPLOAD_RETRY_BASE_SECONDS: float = 2.0
+    RESULT_UPLOAD_LEASE_SECONDS: int = 900  # An 'uploading' row older than this is assumed abandoned
+    RESULT_SPOOL_DIR: str = "/tmp/rose_result_uploads"
+    RESULT_MAX_FILE_BYTES: int = 20 * 1024 * 1024
+    RESULT_UPLOAD_CHUNK_BYTES: int = 6 * 1024 * 1024
+
+    # PDF preprocessing (validation, linearization, thumbnails)
+    PDF_PIPELINE_ENABLED: bool = False
+    PDF_PIPELINE_WORKERS: int = 2
+    PDF_PIPELINE_TIMEOUT_SECONDS: int = 120
+    PDF_THUMBNAIL_WIDTH: int = 240
+    RESULT_INSERT_BATCH_SIZE: int = 100
+    BULK_RESULT_MAX_ROWS: int = 1000
+    BULK_RESULT_MAX_ARCHIVE_BYTES: int = 2 * 1024 * 1024 * 1024  # ZIP plus manifest, per request
+    PARTICIPANT_RESULTS_CACHE_SIZE: int = 10000
+    PARTICIPANT_RESULTS_CACHE_TTL_SECONDS: int = 300
     
     # App
     DEBUG: bool = True
+
+    # Logging (JSON lines on stdout, written by a background thread)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: dict[str, str] = {}  # Per logger, e.g. {"app.services.sms_queue": "DEBUG"}
+    # Fraction of records kept per `event` extra or logger name (warnings and up are always kept)
+    LOG_SAMPLE_RATES: dict[str, float] = {"sms_sent": 0.1, "otp_issued": 0.1}
+    LOG_REDACT: bool = True  # Mask phone numbers and OTP codes
+    LOG_QUEUE_SIZE: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,28 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import admin_auth, admin_routes
 from app.routers import participant_auth, participant_routes
 from app.routers import event
+from app.routers import admin_auth_async, participant_auth_async, participant_routes_async, event_async
 from app.routers import results
+from app.routers import sms
+from app.routers import short_links
+from app.services.result_upload_service import resume_pending_uploads, shutdown_upload_pool
+from app.services.pdf_pipeline import shutdown_pipeline
+from app.services.password_service import shutdown_password_pool
+from app.services.otp_partitions import start_partition_maintenance, stop_partition_maintenance
+from app.services.sms_client import close_sms_client
+from app.services.sms_queue import start_sms_workers, stop_sms_workers
+from app.services.sms_receipts import start_receipt_flusher, stop_receipt_flusher
+from app.services.short_link_service import start_click_flusher, stop_click_flusher
+from app.config import settings
+from app.database import dispose_async_engine
+from app.utils.metrics import render_metrics
+from app.utils.logging_config import setup_logging, shutdown_logging
+from app.utils.upload_limit import UploadSizeLimitMiddleware
+
+setup_logging()
 
 app = FastAPI(
     title="ROSE Event Management API",
@@ -20,6 +39,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Starlette reads the whole multipart body before the handler runs, so cap it here
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=["/admin/results"],
+    max_bytes=settings.RESULT_MAX_FILE_BYTES,
+)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=["/admin/results/bulk"],
+    max_bytes=settings.BULK_RESULT_MAX_ARCHIVE_BYTES,
+)
+
+@app.on_event("startup")
+def startup():
+    resume_pending_uploads()
+    if settings.OTP_STORE_BACKEND == "sql":
+        start_partition_maintenance()
+    if settings.SMS_QUEUE_WORKERS_ENABLED:
+        start_sms_workers()
+    start_receipt_flusher()
+    start_click_flusher()
+
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_upload_pool()
+    shutdown_pipeline()
+    shutdown_password_pool()
+    stop_partition_maintenance()
+    stop_sms_workers()
+    stop_receipt_flusher()
+    stop_click_flusher()
+    close_sms_client()
+    shutdown_logging()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
 @app.get("/")
 def read_root():
     return {
@@ -32,9 +89,17 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
-app.include_router(admin_auth.router)
-app.include_router(admin_routes.router)
-app.include_router(participant_auth.router)
-app.include_router(participant_routes.router)
-app.include_router(event.router)
-app.include_router(results.router)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# ASYNC_DB_ENABLED serves the hot routers from their async ports on the asyncpg engine
+if settings.ASYNC_DB_ENABLED:
+    routers = [admin_auth_async, admin_routes, participant_auth_async, participant_routes_async, event_async]
+else:
+    routers = [admin_auth, admin_routes, participant_auth, participant_routes, event]
+routers += [results, sms, short_links]
+
+for module in routers:
+    app.include_router(module.router)
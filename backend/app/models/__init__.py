@@ -4,5 +4,11 @@ from app.models.event import Event
 from app.models.booking import Booking
 from app.models.otp_code import OTPCode
 from app.models.test_result import TestResult
+from app.models.event_stats import EventStats, EventBookingHourly
+from app.models.sms_message import SMSMessage, SMSDeadLetter, SMSDeliveryReceipt
+from app.models.short_link import ShortLink
+from app.models.result_sms_job import ResultSMSJob
 
-__all__ = ["Participant", "Admin", "Event", "Booking", "OTPCode", "TestResult"]
\ No newline at end of file
+__all__ = ["Participant", "Admin", "Event", "Booking", "OTPCode", "TestResult",
+           "EventStats", "EventBookingHourly", "SMSMessage", "SMSDeadLetter",
+           "SMSDeliveryReceipt", "ShortLink", "ResultSMSJob"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
@@ -27,6 +27,9 @@ class Booking(Base):
     # Constraint: One participant can only book one slot per event
     __table_args__ = (
         UniqueConstraint('participant_id', 'event_id', name='unique_participant_event'),
+        # Serve paginated per-event participant listings in booking order
+        Index('ix_bookings_event_booked_at', 'event_id', 'booked_at'),
+        Index('ix_bookings_event_status_booked_at', 'event_id', 'booking_status', 'booked_at'),
     )
 
     def __repr__(self):
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.database import Base
+
+
+class EventStats(Base):
+    """
+    Per-event rollup counters for the admin dashboard.
+    Updated incrementally in the same transaction as the booking/result write,
+    so the dashboard never has to scan bookings or test_results.
+    """
+    __tablename__ = "event_stats"
+
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    confirmed_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    checked_in_count = Column(Integer, nullable=False, default=0)
+    results_uploaded_count = Column(Integer, nullable=False, default=0)
+    abnormal_results_count = Column(Integer, nullable=False, default=0)
+    sms_sent_count = Column(Integer, nullable=False, default=0)
+    sms_delivered_count = Column(Integer, nullable=False, default=0)
+    sms_failed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EventStats {self.event_id}>"
+
+
+class EventBookingHourly(Base):
+    """Number of bookings made per event per hour (booking velocity)."""
+    __tablename__ = "event_booking_hourly"
+
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    bookings_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<EventBookingHourly {self.event_id} @ {self.hour}: {self.bookings_count}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, DateTime
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
@@ -13,10 +13,16 @@ class OTPCode(Base):
     phone_number = Column(String(20), nullable=False, index=True)
     otp_code = Column(String(6), nullable=False)
     purpose = Column(String(50), nullable=False)  # 'registration', 'login', 'result_access'
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key (daily range partitions), so part of the primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=False, index=True)
     verified = Column(Boolean, default=False)
     attempts = Column(Integer, default=0)
 
+    __table_args__ = (
+        # Serve "newest unverified code for this phone and purpose"
+        Index('ix_otp_codes_lookup', 'phone_number', 'purpose', 'verified', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<OTPCode {self.phone_number} - {self.purpose}>"
\ No newline at end of file
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+
+from app.database import Base
+
+
+class ResultSMSJob(Base):
+    """
+    Progress of one bulk result-notification run. Stored so any API worker
+    can report on a job, whichever worker runs it. Once the job finishes,
+    total == queued + skipped + failed.
+    """
+    __tablename__ = "result_sms_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    admin_id = Column(UUID(as_uuid=True), ForeignKey("admins.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # 'pending', 'running', 'completed', 'failed'
+    total = Column(Integer, nullable=False, default=0)
+    queued = Column(Integer, nullable=False, default=0)  # Handed to sms_queue for delivery
+    skipped = Column(Integer, nullable=False, default=0)  # Already notified, e.g. by a concurrent job
+    failed = Column(Integer, nullable=False, default=0)  # Could not be queued
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": str(self.id),
+            "status": self.status,
+            "total": self.total,
+            "queued": self.queued,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def __repr__(self):
+        return f"<ResultSMSJob {self.id} - {self.status}>"
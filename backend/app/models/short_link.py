@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.database import Base
+
+
+class ShortLink(Base):
+    """
+    Short code -> target URL, used to keep links in SMS bodies short.
+    Clicks are counted in memory and added here in batches.
+    """
+    __tablename__ = "short_links"
+
+    code = Column(String(16), primary_key=True)
+    target_url = Column(Text, nullable=False)
+    result_id = Column(UUID(as_uuid=True), ForeignKey("test_results.id", ondelete="CASCADE"), nullable=True)
+    click_count = Column(Integer, nullable=False, default=0)
+    last_clicked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # One link per result, reused if its notification is sent again
+    __table_args__ = (
+        Index('ix_short_links_result_id', 'result_id', unique=True,
+              postgresql_where=text("result_id IS NOT NULL")),
+    )
+
+    def __repr__(self):
+        return f"<ShortLink {self.code}>"
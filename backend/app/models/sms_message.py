@@ -0,0 +1,91 @@
+from sqlalchemy import Column, String, Text, Integer, SmallInteger, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+
+from app.database import Base
+
+
+class SMSMessage(Base):
+    """
+    Outgoing SMS, queued in the same transaction as the write that caused it.
+    Workers claim rows with FOR UPDATE SKIP LOCKED (see services/sms_queue).
+    """
+    __tablename__ = "sms_queue"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(30), nullable=False)  # 'otp', 'booking_confirmation', 'booking_cancellation', 'result_notification'
+    priority = Column(SmallInteger, nullable=False)  # 0 = OTP (first), 1 = booking, 2 = result
+    provider = Column(String(30), nullable=False, default="twilio")
+    phone_number = Column(String(20), nullable=False)
+    body = Column(Text, nullable=False)  # OTP bodies are redacted once sent or dead-lettered
+    status = Column(String(20), nullable=False, default="queued")  # 'queued', 'sending', 'sent'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True)  # Not worth sending after this (e.g. OTPs)
+    last_error = Column(Text, nullable=True)
+    provider_sid = Column(String(64), nullable=True)
+    result_id = Column(UUID(as_uuid=True), ForeignKey("test_results.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claim order for workers; only pending rows are indexed
+        Index(
+            'ix_sms_queue_ready',
+            'provider', 'priority', 'next_attempt_at',
+            postgresql_where=text("status IN ('queued', 'sending')")
+        ),
+        # Retention purge of sent messages (see services/sms_queue.purge_settled)
+        Index(
+            'ix_sms_queue_sent_at',
+            'sent_at',
+            postgresql_where=text("status = 'sent'")
+        ),
+        # Match delivery receipts to messages
+        Index(
+            'ix_sms_queue_provider_sid',
+            'provider_sid',
+            unique=True,
+            postgresql_where=text("provider_sid IS NOT NULL")
+        ),
+    )
+
+    def __repr__(self):
+        return f"<SMSMessage {self.kind} to {self.phone_number} - {self.status}>"
+
+
+class SMSDeadLetter(Base):
+    """Messages that failed permanently or ran out of attempts"""
+    __tablename__ = "sms_dead_letters"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)  # Same id as in sms_queue
+    kind = Column(String(30), nullable=False)
+    provider = Column(String(30), nullable=False)
+    phone_number = Column(String(20), nullable=False)
+    body = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text, nullable=True)
+    result_id = Column(UUID(as_uuid=True), ForeignKey("test_results.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    failed_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<SMSDeadLetter {self.kind} to {self.phone_number}>"
+
+
+class SMSDeliveryReceipt(Base):
+    """
+    Latest delivery status reported by the provider for a message.
+    Written in batches by services/sms_receipts; a receipt may arrive before
+    the worker has stored the SID on the queued message.
+    """
+    __tablename__ = "sms_delivery_receipts"
+
+    provider_sid = Column(String(64), primary_key=True)
+    status = Column(String(20), nullable=False)  # Provider status: 'sent', 'delivered', 'undelivered', 'failed', ...
+    error_code = Column(String(10), nullable=True)
+    received_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SMSDeliveryReceipt {self.provider_sid} - {self.status}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -15,14 +15,35 @@ class TestResult(Base):
     result_category = Column(String(50), nullable=False)  # 'Normal', 'Abnormal - follow up required'
     result_notes = Column(Text, nullable=True)
     result_file_url = Column(Text, nullable=True)  # Cloudinary URL
+    public_id = Column(String(255), nullable=True)  # Storage key of the result file
+    thumbnail_public_id = Column(String(255), nullable=True)  # Storage key of the first-page thumbnail
+    upload_status = Column(String(20), nullable=False, default="uploaded", index=True)  # 'pending', 'uploading', 'uploaded', 'failed'
+    upload_error = Column(Text, nullable=True)
+    upload_claimed_at = Column(DateTime, nullable=True)  # When an upload job took the row ('uploading')
+    file_sha256 = Column(String(64), nullable=True, index=True)
+    file_size = Column(Integer, nullable=True)  # Size of the uploaded PDF
+    stored_file_size = Column(Integer, nullable=True)  # Size served on download (after preprocessing)
+    thumbnail_file_size = Column(Integer, nullable=True)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("admins.id"), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     sms_sent = Column(Boolean, default=False)
     sms_sent_at = Column(DateTime, nullable=True)
+    sms_delivery_status = Column(String(20), nullable=True)  # 'sent', 'delivered', 'failed' (from delivery receipts)
+    sms_delivered_at = Column(DateTime, nullable=True)
+    sms_provider_sid = Column(String(64), nullable=True, index=True)  # Latest notification; matches delivery receipts after sms_queue is purged
 
     # Relationships
     booking = relationship("Booking", back_populates="test_result")
     uploader = relationship("Admin", foreign_keys=[uploaded_by])
 
+    # Keyset pagination of the admin results listing (newest first), with
+    # and without the category / SMS filters
+    __table_args__ = (
+        Index('ix_test_results_uploaded_at_id', 'uploaded_at', 'id'),
+        Index('ix_test_results_category_uploaded_at', 'result_category', 'uploaded_at', 'id'),
+        Index('ix_test_results_sms_sent_uploaded_at', 'sms_sent', 'uploaded_at', 'id'),
+        Index('ix_test_results_delivery_uploaded_at', 'sms_delivery_status', 'uploaded_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<TestResult {self.id} - {self.result_category}>"
\ No newline at end of file
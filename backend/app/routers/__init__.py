@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+
+def add_unported_routes(router: APIRouter, sync_router: APIRouter) -> None:
+    """
+    Give an async port of a router the sync router's remaining endpoints, so
+    it can replace the sync router while only the hot endpoints are ported.
+    Call after the async routes are declared.
+    """
+    ported = {(route.path, method) for route in router.routes for method in route.methods}
+    for route in sync_router.routes:
+        if not any((route.path, method) in ported for method in route.methods):
+            router.routes.append(route)
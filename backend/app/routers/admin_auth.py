@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.schemas.admin_schemas import AdminRegisterRequest, AdminLoginRequest, TokenResponse, AdminResponse
 from app.models.admin import Admin
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.utils.security import create_access_token
+from app.services.password_service import hash_password, verify_and_update_password
 from app.database import get_db
 
 router = APIRouter(prefix="/admin/auth", tags=["Admin Authentication"])
@@ -26,8 +27,17 @@ def register_admin(request: AdminRegisterRequest, db: Session = Depends(get_db))
 @router.post("/login", response_model=TokenResponse)
 def login_admin(request: AdminLoginRequest, db: Session = Depends(get_db)):
     admin = db.query(Admin).filter(Admin.email == request.email).first()
-    if not admin or not verify_password(request.password, admin.password_hash):
+    if not admin:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    is_valid, new_hash = verify_and_update_password(request.password, admin.password_hash)
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Stored hash uses an old bcrypt cost: upgrade it now that we have the password
+    if new_hash:
+        admin.password_hash = new_hash
+        db.commit()
+
     access_token = create_access_token({"sub": str(admin.id), "role": "admin"})
     return TokenResponse(access_token=access_token, user={"id": str(admin.id), "name": admin.name, "email": admin.email})
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.admin_schemas import AdminRegisterRequest, AdminLoginRequest, TokenResponse
+from app.models.admin import Admin
+from app.utils.security import create_access_token
+from app.services.password_service import hash_password_async, verify_and_update_password_async
+from app.database import get_async_db
+
+# Async port of routers/admin_auth.py, used when ASYNC_DB_ENABLED is set.
+# bcrypt still runs in the password process pool; the handler awaits it.
+
+router = APIRouter(prefix="/admin/auth", tags=["Admin Authentication"])
+
+
+def _token_response(admin: Admin) -> TokenResponse:
+    access_token = create_access_token({"sub": str(admin.id), "role": "admin"})
+    return TokenResponse(access_token=access_token, user={"id": str(admin.id), "name": admin.name, "email": admin.email})
+
+
+@router.post("/register", response_model=TokenResponse)
+async def register_admin(request: AdminRegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    existing_admin = (await db.execute(select(Admin.id).where(Admin.email == request.email))).first()
+    if existing_admin:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    hashed_pw = await hash_password_async(request.password)
+    new_admin = Admin(name=request.name, email=request.email, password_hash=hashed_pw)
+    db.add(new_admin)
+    await db.commit()
+    await db.refresh(new_admin)
+
+    return _token_response(new_admin)
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login_admin(request: AdminLoginRequest, db: AsyncSession = Depends(get_async_db)):
+    admin = (await db.execute(select(Admin).where(Admin.email == request.email))).scalars().first()
+    if not admin:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    is_valid, new_hash = await verify_and_update_password_async(request.password, admin.password_hash)
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Stored hash uses an old bcrypt cost: upgrade it now that we have the password
+    if new_hash:
+        admin.password_hash = new_hash
+        await db.commit()
+
+    return _token_response(admin)
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 from uuid import UUID
 
-from app.utils.security import get_current_admin
+from app.utils.security import get_current_admin, get_current_admin_claims, TokenClaims
 from app.database import get_db
 from app.models.admin import Admin
 from app.models.event import Event
 from app.models.booking import Booking
 from app.schemas.admin_schemas import AdminResponse
 from app.schemas.booking import AdminBookingListResponse, AdminBookingResponse
+from app.schemas.dashboard import AdminDashboardResponse
+from app.services.stats_service import get_admin_dashboard, record_booking_status_change
+from app.services.result_service import invalidate_participant_results
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -20,10 +23,24 @@ def get_admin_profile(current_user: Admin = Depends(get_current_admin)):
     """
     return current_user
 
+@router.get("/dashboard", response_model=AdminDashboardResponse)
+def get_admin_dashboard_stats(
+    velocity_hours: int = Query(24, ge=1, le=24 * 30),
+    db: Session = Depends(get_db),
+    current_user: TokenClaims = Depends(get_current_admin_claims)
+):
+    """
+    Get per-event booking and result counts for events created by this admin.
+    Served from rollup tables, so it stays cheap regardless of booking volume.
+    """
+    events = get_admin_dashboard(db, current_user.id, velocity_hours=velocity_hours)
+    return AdminDashboardResponse(events=events, total_events=len(events))
+
+
 @router.get("/bookings", response_model=AdminBookingListResponse)
 def get_admin_event_bookings(
     db: Session = Depends(get_db),
-    current_user: Admin = Depends(get_current_admin)
+    current_user: TokenClaims = Depends(get_current_admin_claims)
 ):
     """
     Get all bookings for events created by this admin.
@@ -107,6 +124,7 @@ def check_in_participant(
         )
     
     # Update booking status
+    record_booking_status_change(db, event.id, booking.booking_status, "checked_in")
     booking.booking_status = "checked_in"
     
     try:
@@ -119,6 +137,8 @@ def check_in_participant(
             detail=f"Failed to check in participant: {str(e)}"
         )
     
+    invalidate_participant_results(booking.participant_id)
+    
     return {
         "message": "Participant checked in successfully",
         "booking_id": str(booking.id),
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.utils.security import get_current_admin
+from app.utils.security import get_current_admin, get_current_admin_claims, TokenClaims
 from app.models.admin import Admin
 from app.schemas.event import EventCreateRequest, EventResponse
 from app.services.event_service import EventService
@@ -67,47 +68,21 @@ def delete_event(
 @router.get("/{event_id}/participants")
 def get_event_participants(
     event_id: str,
+    booking_status: Optional[str] = Query(None, pattern="^(confirmed|cancelled|checked_in)$"),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_admin: Admin = Depends(get_current_admin)
+    current_admin: TokenClaims = Depends(get_current_admin_claims)
 ):
-    """Get an event with participants and their bookings."""
-    from app.models.booking import Booking
-    
-    # Get event
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    # Get bookings for this event
-    bookings = db.query(Booking).filter(Booking.event_id == event_id).all()
-    
-    # Format participant data with booking info
-    participants = [
-        {
-            "id": str(booking.id),  # ✅ This is the booking ID (what we need!)
-            "booking_id": str(booking.id),  # ✅ Explicit booking_id field
-            "booking_reference": booking.booking_reference,
-            "booking_status": booking.booking_status,
-            "booked_at": booking.booked_at.isoformat(),
-            "name": booking.participant.name,
-            "phone_number": booking.participant.phone_number,
-            "mykad_id": booking.participant.mykad_id,
-        }
-        for booking in bookings
-    ]
-    
-    return {
-        "event": {
-            "id": str(event.id),
-            "name": event.name,
-            "event_date": str(event.event_date),
-            "event_time": str(event.event_time),
-            "address": event.address,
-            "total_slots": event.total_slots,
-            "available_slots": event.available_slots,
-        },
-        "participants": participants
-    }
+    """Get an event with a page of its participants (event owner only)."""
+    service = EventService(db)
+    return service.get_event_with_participants(
+        event_id,
+        current_admin.id,
+        booking_status=booking_status,
+        limit=limit,
+        cursor=cursor
+    )
 
 
 # ---------------- EXPORT EVENT PARTICIPANTS (ADMIN ONLY) ----------------
@@ -115,7 +90,7 @@ def get_event_participants(
 def export_event_participants(
     event_id: str,
     db: Session = Depends(get_db),
-    current_admin: Admin = Depends(get_current_admin)
+    current_admin: TokenClaims = Depends(get_current_admin_claims)
 ):
     """Export event participants as CSV."""
     from app.models.booking import Booking
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.routers import add_unported_routes, event
+from app.utils.security import get_current_admin_claims, TokenClaims
+from app.schemas.event import EventResponse
+from app.services.event_service import EventService
+from app.models.event import Event, EventStatus
+
+# Async port of routers/event.py, used when ASYNC_DB_ENABLED is set.
+# Creating, editing and deleting events stay on the sync handlers: they are
+# admin-only and EventService geocodes addresses with blocking requests calls.
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+# ---------------- LIST EVENTS ----------------
+@router.get("/", response_model=list[EventResponse])
+async def list_events(db: AsyncSession = Depends(get_async_db), published_only: bool = True):
+    """List all published events (or all if `published_only=False`)."""
+    query = select(Event)
+    if published_only:
+        query = query.where(Event.status == EventStatus.published)
+    result = await db.execute(query.order_by(Event.event_date.asc(), Event.event_time.asc()))
+    return result.scalars().all()
+
+
+# ---------------- GET EVENT BY ID ----------------
+@router.get("/{event_id}", response_model=EventResponse)
+async def get_event_by_id(event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Get details for a specific event."""
+    event_row = await db.get(Event, event_id)
+    if not event_row:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event_row
+
+
+# ---------------- GET EVENT PARTICIPANTS (ADMIN ONLY) ----------------
+@router.get("/{event_id}/participants")
+async def get_event_participants(
+    event_id: UUID,
+    booking_status: Optional[str] = Query(None, pattern="^(confirmed|cancelled|checked_in)$"),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: TokenClaims = Depends(get_current_admin_claims)
+):
+    """Get an event with a page of its participants (event owner only)."""
+    return await db.run_sync(
+        lambda session: EventService(session).get_event_with_participants(
+            event_id,
+            current_admin.id,
+            booking_status=booking_status,
+            limit=limit,
+            cursor=cursor
+        )
+    )
+
+
+add_unported_routes(router, event.router)
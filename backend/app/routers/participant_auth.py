@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.schemas.participant_schemas import (
     ParticipantRegisterRequest, 
@@ -11,16 +12,25 @@ from app.schemas.participant_schemas import (
 from app.models.participant import Participant
 from app.utils.security import create_access_token
 from app.database import get_db
-from app.services.otp_service import create_otp_record, verify_otp, invalidate_previous_otps
-from app.services.sms_service import send_otp_sms
+from app.services.otp_service import create_otp_record, verify_otp
+from app.services.sms_queue import queue_otp_sms
+from app.services.rate_limit_service import enforce_otp_rate_limit
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/participant/auth", tags=["Participant Authentication"])
 
 
 @router.post("/register", response_model=OTPResponse)
-def register_participant(request: ParticipantRegisterRequest, db: Session = Depends(get_db)):
+def register_participant(
+    request: ParticipantRegisterRequest,
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
     """Step 1 of registration: Validate data and send OTP"""
     
+    enforce_otp_rate_limit(http_request, request.phone_number, "registration")
+    
     existing = db.query(Participant).filter(
         (Participant.phone_number == request.phone_number) |
         (Participant.mykad_id == request.mykad_id)
@@ -32,21 +42,21 @@ def register_participant(request: ParticipantRegisterRequest, db: Session = Depe
             detail="Phone number or MyKad already registered"
         )
     
-    invalidate_previous_otps(db, request.phone_number, "registration")
-    
     otp_record = create_otp_record(
         db=db,
         phone_number=request.phone_number,
         purpose="registration"
     )
     
-    send_otp_sms(
+    queue_otp_sms(
+        db,
         phone=request.phone_number,
         otp_code=otp_record.otp_code,
-        mock=True
+        expires_at=otp_record.expires_at
     )
+    db.commit()
     
-    print(f"📱 OTP sent to {request.phone_number}: {otp_record.otp_code}")
+    logger.info("OTP issued", extra={"event": "otp_issued", "phone_number": request.phone_number, "purpose": "registration"})
     
     return OTPResponse(
         message=f"OTP sent to {request.phone_number}. Valid for 10 minutes.",
@@ -94,9 +104,15 @@ def verify_registration(request: VerifyRegistrationRequest, db: Session = Depend
 
 
 @router.post("/login", response_model=OTPResponse)
-def login_participant(request: ParticipantLoginRequest, db: Session = Depends(get_db)):
+def login_participant(
+    request: ParticipantLoginRequest,
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
     """Step 1 of login: Verify phone + MyKad pairing and send OTP"""
     
+    enforce_otp_rate_limit(http_request, request.phone_number, "login")
+    
     participant = db.query(Participant).filter(
         Participant.phone_number == request.phone_number,
         Participant.mykad_id == request.mykad_id
@@ -108,21 +124,21 @@ def login_participant(request: ParticipantLoginRequest, db: Session = Depends(ge
             detail="Invalid phone number or MyKad"
         )
     
-    invalidate_previous_otps(db, request.phone_number, "login")
-    
     otp_record = create_otp_record(
         db=db,
         phone_number=request.phone_number,
         purpose="login"
     )
     
-    send_otp_sms(
+    queue_otp_sms(
+        db,
         phone=request.phone_number,
         otp_code=otp_record.otp_code,
-        mock=True
+        expires_at=otp_record.expires_at
     )
+    db.commit()
     
-    print(f"📱 OTP sent to {request.phone_number}: {otp_record.otp_code}")
+    logger.info("OTP issued", extra={"event": "otp_issued", "phone_number": request.phone_number, "purpose": "login"})
     
     return OTPResponse(
         message=f"OTP sent to {request.phone_number}. Valid for 10 minutes.",
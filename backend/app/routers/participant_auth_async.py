@@ -0,0 +1,156 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.participant_schemas import (
+    ParticipantRegisterRequest,
+    ParticipantLoginRequest,
+    VerifyOTPRequest,
+    VerifyRegistrationRequest,
+    TokenResponse,
+    OTPResponse
+)
+from app.models.participant import Participant
+from app.utils.security import create_access_token
+from app.database import get_async_db
+from app.services.otp_service import create_otp_record_async, verify_otp_async
+from app.services.sms_queue import queue_otp_sms
+from app.services.rate_limit_service import enforce_otp_rate_limit_async
+
+# Async port of routers/participant_auth.py, used when ASYNC_DB_ENABLED is set
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/participant/auth", tags=["Participant Authentication"])
+
+
+def _token_response(participant: Participant) -> TokenResponse:
+    access_token = create_access_token({
+        "sub": str(participant.id),
+        "role": "participant"
+    })
+    return TokenResponse(
+        access_token=access_token,
+        user={
+            "id": str(participant.id),
+            "name": participant.name,
+            "phone_number": participant.phone_number
+        }
+    )
+
+
+async def _send_otp(db: AsyncSession, phone_number: str, purpose: str) -> OTPResponse:
+    otp_record = await create_otp_record_async(db, phone_number=phone_number, purpose=purpose)
+
+    await db.run_sync(queue_otp_sms, phone_number, otp_record.otp_code, otp_record.expires_at)
+    await db.commit()
+
+    logger.info("OTP issued", extra={"event": "otp_issued", "phone_number": phone_number, "purpose": purpose})
+
+    return OTPResponse(
+        message=f"OTP sent to {phone_number}. Valid for 10 minutes.",
+        phone_number=phone_number
+    )
+
+
+@router.post("/register", response_model=OTPResponse)
+async def register_participant(
+    request: ParticipantRegisterRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Step 1 of registration: Validate data and send OTP"""
+
+    await enforce_otp_rate_limit_async(http_request, request.phone_number, "registration")
+
+    existing = (await db.execute(
+        select(Participant.id).where(
+            (Participant.phone_number == request.phone_number) |
+            (Participant.mykad_id == request.mykad_id)
+        ).limit(1)
+    )).first()
+
+    if existing:
+        raise HTTPException(
+            status_code=400,
+            detail="Phone number or MyKad already registered"
+        )
+
+    return await _send_otp(db, request.phone_number, "registration")
+
+
+@router.post("/verify-registration", response_model=TokenResponse)
+async def verify_registration(request: VerifyRegistrationRequest, db: AsyncSession = Depends(get_async_db)):
+    """Step 2 of registration: Verify OTP and create account"""
+
+    is_valid = await verify_otp_async(
+        db,
+        phone_number=request.phone_number,
+        otp_code=request.otp_code,
+        purpose="registration"
+    )
+
+    if not is_valid:
+        raise HTTPException(status_code=400, detail="Invalid or expired OTP")
+
+    participant = Participant(
+        name=request.name,
+        phone_number=request.phone_number,
+        mykad_id=request.mykad_id,
+        phone_verified=True
+    )
+    db.add(participant)
+    await db.commit()
+    await db.refresh(participant)
+
+    return _token_response(participant)
+
+
+@router.post("/login", response_model=OTPResponse)
+async def login_participant(
+    request: ParticipantLoginRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Step 1 of login: Verify phone + MyKad pairing and send OTP"""
+
+    await enforce_otp_rate_limit_async(http_request, request.phone_number, "login")
+
+    participant = (await db.execute(
+        select(Participant.id).where(
+            Participant.phone_number == request.phone_number,
+            Participant.mykad_id == request.mykad_id
+        )
+    )).first()
+
+    if not participant:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid phone number or MyKad"
+        )
+
+    return await _send_otp(db, request.phone_number, "login")
+
+
+@router.post("/verify-login", response_model=TokenResponse)
+async def verify_login(request: VerifyOTPRequest, db: AsyncSession = Depends(get_async_db)):
+    """Step 2 of login: Verify OTP and return JWT token"""
+
+    is_valid = await verify_otp_async(
+        db,
+        phone_number=request.phone_number,
+        otp_code=request.otp_code,
+        purpose="login"
+    )
+
+    if not is_valid:
+        raise HTTPException(status_code=400, detail="Invalid or expired OTP")
+
+    participant = (await db.execute(
+        select(Participant).where(Participant.phone_number == request.phone_number)
+    )).scalars().first()
+
+    if not participant:
+        raise HTTPException(status_code=404, detail="Participant not found")
+
+    return _token_response(participant)
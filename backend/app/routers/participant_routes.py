@@ -5,7 +5,7 @@ from app.database import get_db
 from app.models.booking import Booking
 from app.models.participant import Participant
 from app.schemas.event import EventResponse
-from app.utils.security import get_current_participant
+from app.utils.security import get_current_participant, get_current_participant_claims, TokenClaims
 from app.schemas.booking import (
     CreateBookingRequest,
     BookingWithEventResponse,
@@ -26,7 +26,7 @@ def get_profile(current_user: Participant = Depends(get_current_participant)):
 @router.get("/bookings", response_model=List[BookingResponse])
 def get_my_bookings(
     db: Session = Depends(get_db),
-    current_user: Participant = Depends(get_current_participant)
+    current_user: TokenClaims = Depends(get_current_participant_claims)
 ):
     bookings = db.query(Booking).options(joinedload(Booking.event)).filter(
         Booking.participant_id == current_user.id
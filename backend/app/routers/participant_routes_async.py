@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List
+from uuid import UUID
+from app.database import get_async_db
+from app.models.booking import Booking
+from app.models.participant import Participant
+from app.routers import add_unported_routes, participant_routes
+from app.schemas.event import EventResponse
+from app.utils.security import get_current_participant_async, get_current_participant_claims, TokenClaims
+from app.schemas.booking import (
+    CreateBookingRequest,
+    BookingWithEventResponse,
+    CancelBookingResponse,
+    BookingResponse
+)
+from app.schemas.participant_schemas import ParticipantResponse
+from app.services.booking_service import create_booking, cancel_booking
+
+# Async port of routers/participant_routes.py, used when ASYNC_DB_ENABLED is set.
+# Booking writes reuse booking_service on the async connection (run_sync).
+
+router = APIRouter(prefix="/participant", tags=["Participant"])
+
+
+def _booking_response(booking: Booking) -> BookingResponse:
+    return BookingResponse(
+        id=str(booking.id),
+        booking_reference=booking.booking_reference,
+        booking_status=booking.booking_status,
+        booked_at=booking.booked_at,
+        cancelled_at=booking.cancelled_at,
+        event=EventResponse.from_orm(booking.event).model_dump()
+    )
+
+
+@router.get("/profile", response_model=ParticipantResponse)
+async def get_profile(current_user: Participant = Depends(get_current_participant_async)):
+    return current_user
+
+
+@router.get("/bookings", response_model=List[BookingResponse])
+async def get_my_bookings(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenClaims = Depends(get_current_participant_claims)
+):
+    result = await db.execute(
+        select(Booking).options(joinedload(Booking.event)).where(Booking.participant_id == current_user.id)
+    )
+    return [_booking_response(b) for b in result.scalars().all()]
+
+
+# ----------------------------
+# Create a new booking
+# ----------------------------
+@router.post("/bookings", response_model=BookingWithEventResponse)
+async def book_event(
+    request: CreateBookingRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Participant = Depends(get_current_participant_async)
+):
+    booking = await db.run_sync(
+        create_booking,
+        current_user.id,
+        current_user.phone_number,
+        request.event_id
+    )
+
+    # Ensure event relationship is loaded
+    result = await db.execute(
+        select(Booking).options(joinedload(Booking.event)).where(Booking.id == booking.id)
+    )
+    booking = result.scalars().first()
+
+    return BookingWithEventResponse(booking=_booking_response(booking), message="Booking confirmed.")
+
+
+# ----------------------------
+# Cancel a booking
+# ----------------------------
+@router.post("/bookings/{booking_id}/cancel", response_model=CancelBookingResponse)
+async def cancel_my_booking(
+    booking_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Participant = Depends(get_current_participant_async)
+):
+    booking = await db.run_sync(cancel_booking, booking_id, current_user.phone_number)
+
+    if booking.participant_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Cannot cancel a booking that is not yours")
+
+    return CancelBookingResponse(
+        message="Booking cancelled successfully.",
+        booking_reference=booking.booking_reference,
+        slots_released=1
+    )
+
+
+add_unported_routes(router, participant_routes.router)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, UploadFile, File, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
+import uuid
 
+from app.config import settings
 from app.database import get_db
 from app.models.admin import Admin
 from app.models.participant import Participant
@@ -13,23 +16,52 @@ from app.schemas.result import (
     ResultUploadRequest,
     ResultResponse,
     ResultListResponse,
+    BulkResultUploadResponse,
     SendResultSMSRequest,
     SendResultSMSResponse,
+    BulkSendResultSMSRequest,
+    ResultSMSJobResponse,
     ParticipantResultResponse,
     RequestResultOTPResponse,
     ViewResultResponse
 )
-from app.utils.security import get_current_admin, get_current_participant
+from app.utils.security import (
+    get_current_admin,
+    get_current_participant,
+    get_current_admin_claims,
+    get_current_participant_claims,
+    TokenClaims,
+)
 from app.services.file_upload_service import file_upload_service
-from app.services.sms_service import send_result_notification_sms
+from app.services.storage_service import verify_file_signature
+from app.services.result_download_service import (
+    issue_download_token,
+    verify_download_token,
+    download_url,
+    stored_file_response,
+)
+from app.services.sms_queue import queue_otp_sms, queue_result_notification_sms
 from app.services.otp_service import create_otp_record, verify_otp
+from app.services.rate_limit_service import enforce_otp_rate_limit
+from app.services.stats_service import record_result_uploaded, record_result_sms_sent, get_result_counts
+from app.services.result_service import (
+    list_admin_results,
+    count_admin_results,
+    bulk_ingest_results,
+    get_participant_results,
+    invalidate_participant_results,
+)
+from app.services import result_sms_service
+from app.services.short_link_service import result_short_url
+from app.services.result_upload_service import spool_result_file, discard_spooled_file, enqueue_result_upload
 
-router = APIRouter(tags=["Results"])
+logger = logging.getLogger(__name__)
 
+router = APIRouter(tags=["Results"])
 
 # ADMIN ROUTES
 @router.post("/admin/results", response_model=ResultResponse)
-async def upload_result(
+def upload_result(
     booking_id: str = File(...),
     result_category: str = File(...),
     result_notes: str = File(None),
@@ -39,7 +71,13 @@ async def upload_result(
 ):
     """
     Admin uploads test result for a participant.
-    Only checked-in participants can receive results.
+    Only checked-in participants can receive results; a result whose upload
+    failed can be uploaded again.
+    Oversized bodies are rejected by UploadSizeLimitMiddleware before the
+    multipart form is parsed.
+    The PDF is stored locally and uploaded to storage in the background;
+    the result's upload_status moves from 'pending' through 'uploading' to
+    'uploaded' (or 'failed').
     """
     
     # Verify booking exists and is checked-in
@@ -59,37 +97,121 @@ async def upload_result(
         TestResult.booking_id == booking_id
     ).first()
     
-    if existing_result:
+    if existing_result and existing_result.upload_status != "failed":
         raise HTTPException(
             status_code=400,
             detail="Result already uploaded for this booking"
         )
     
-    # Upload PDF to Cloudinary
-    file_content = await file.read()
-    file_url = file_upload_service.upload_result_pdf(
-        file_content=file_content,
-        booking_id=booking_id,
-        filename=file.filename or "result.pdf"
-    )
+    # Persist the PDF locally; the storage upload happens off the request path
+    result_id = uuid.uuid4()
+    file_sha256, file_size = spool_result_file(result_id, file.file)
+    
+    # A failed upload is replaced by the new one
+    if existing_result:
+        record_result_uploaded(db, booking.event_id, existing_result.result_category, count=-1)
+        db.delete(existing_result)
+        db.flush()
     
     # Create result record
     test_result = TestResult(
+        id=result_id,
         booking_id=booking_id,
         result_category=result_category,
         result_notes=result_notes,
-        result_file_url=file_url,
+        upload_status="pending",
+        file_sha256=file_sha256,
+        file_size=file_size,
         uploaded_by=current_admin.id,
         sms_sent=False
     )
     
-    db.add(test_result)
-    db.commit()
-    db.refresh(test_result)
+    try:
+        db.add(test_result)
+        record_result_uploaded(db, booking.event_id, result_category)
+        db.commit()
+        db.refresh(test_result)
+    except Exception:
+        db.rollback()
+        discard_spooled_file(result_id)
+        raise
+    
+    enqueue_result_upload(result_id, booking_id, file.filename or "result.pdf")
+    invalidate_participant_results(booking.participant_id)
     
     return test_result
 
 
+@router.post("/admin/results/bulk", response_model=BulkResultUploadResponse)
+def bulk_upload_results(
+    archive: UploadFile = File(..., description="ZIP of result PDFs"),
+    manifest: UploadFile = File(..., description="CSV: booking_reference, result_category, filename, result_notes"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Admin uploads results for a whole event at once.
+    Each manifest row is validated and reported on individually.
+    Requests over BULK_RESULT_MAX_ARCHIVE_BYTES are rejected by
+    UploadSizeLimitMiddleware.
+    """
+    rows = bulk_ingest_results(
+        db,
+        current_admin.id,
+        archive_file=archive.file,
+        manifest=manifest.file.read()
+    )
+    created = sum(1 for row in rows if row["status"] == "created")
+
+    return BulkResultUploadResponse(
+        created=created,
+        failed=len(rows) - created,
+        rows=rows
+    )
+
+
+@router.post(
+    "/admin/results/send-sms",
+    response_model=ResultSMSJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def send_result_sms_bulk(
+    request: BulkSendResultSMSRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Admin sends notifications for every unsent result of an event, or for a list of results.
+    Sending happens in the background; poll the returned job for progress.
+    """
+    rows = result_sms_service.select_unsent_results(
+        db,
+        current_admin.id,
+        event_id=request.event_id,
+        result_ids=request.result_ids
+    )
+
+    job = result_sms_service.create_job(db, current_admin.id, total=len(rows))
+    background_tasks.add_task(result_sms_service.run_job, job.id, rows)
+
+    return job.to_dict()
+
+
+@router.get("/admin/results/send-sms/{job_id}", response_model=ResultSMSJobResponse)
+def get_result_sms_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_admin: TokenClaims = Depends(get_current_admin_claims)
+):
+    """Admin checks progress of a bulk result notification job."""
+    job = result_sms_service.get_job(db, job_id, current_admin.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
+
+
 @router.post("/admin/results/{result_id}/send-sms", response_model=SendResultSMSResponse)
 def send_result_sms(
     result_id: UUID,
@@ -112,23 +234,31 @@ def send_result_sms(
             detail="SMS already sent for this result"
         )
     
+    if result.upload_status != "uploaded":
+        raise HTTPException(
+            status_code=400,
+            detail="Result file is still being uploaded"
+        )
+    
     # Get booking and participant info
     booking = result.booking
     participant = booking.participant
     
-    # Send SMS notification
-    send_result_notification_sms(
+    # Queue SMS notification (sent by the SMS queue workers once committed)
+    queue_result_notification_sms(
+        db,
         phone=participant.phone_number,
         result_category=result.result_category,
         booking_reference=booking.booking_reference,
         participant_name=participant.name,
-        result_url=f"https://rose.org/results/{result.id}",  # Update with actual URL
-        mock=True
+        result_id=result.id,
+        result_url=result_short_url(db, result.id)
     )
     
-    # Mark SMS as sent
+    # Mark SMS as sent (queued in the same transaction); sms_sent_at is set
+    # once the provider accepts it
     result.sms_sent = True
-    result.sms_sent_at = datetime.utcnow()
+    record_result_sms_sent(db, booking.event_id)
     db.commit()
     
     return SendResultSMSResponse(
@@ -139,17 +269,62 @@ def send_result_sms(
 
 @router.get("/admin/results", response_model=ResultListResponse)
 def get_all_results(
+    event_id: Optional[UUID] = None,
+    result_category: Optional[str] = Query(None, pattern="^(Normal|Abnormal - follow up required)$"),
+    sms_sent: Optional[bool] = None,
+    delivery_status: Optional[str] = Query(None, pattern="^(sent|delivered|failed)$"),
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
-    current_admin: Admin = Depends(get_current_admin)
+    current_admin: TokenClaims = Depends(get_current_admin_claims)
 ):
     """
-    Admin views all test results.
+    Admin views test results for their events, newest first.
+    Filter by `delivery_status` to find notifications that were delivered or failed.
+    Pass `next_cursor` from the previous response as `cursor` to get the next page.
     """
-    results = db.query(TestResult).order_by(TestResult.uploaded_at.desc()).all()
-    
+    filters = {
+        "event_id": event_id,
+        "result_category": result_category,
+        "sms_sent": sms_sent,
+        "sms_delivery_status": delivery_status,
+        "uploaded_from": uploaded_from,
+        "uploaded_to": uploaded_to,
+    }
+    results, next_cursor = list_admin_results(db, current_admin.id, cursor=cursor, limit=limit, **filters)
+    counts = get_result_counts(db, current_admin.id, event_id=event_id)
+
+    # The rollups are per event and per single attribute: they give the total
+    # for at most one of category / SMS status and no date range. Anything
+    # else needs a real COUNT.
+    single_filters = [value for value in (result_category, sms_sent, delivery_status) if value is not None]
+    if len(single_filters) > 1 or uploaded_from or uploaded_to:
+        total = count_admin_results(db, current_admin.id, **filters)
+    elif result_category == "Normal":
+        total = counts["normal"]
+    elif result_category:
+        total = counts["abnormal"]
+    elif delivery_status == "delivered":
+        total = counts["sms_delivered"]
+    elif delivery_status == "failed":
+        total = counts["sms_failed"]
+    elif delivery_status == "sent":
+        # Notified, no final receipt yet
+        total = counts["sms_sent"] - counts["sms_delivered"] - counts["sms_failed"]
+    elif sms_sent is True:
+        total = counts["sms_sent"]
+    elif sms_sent is False:
+        total = counts["sms_pending"]
+    else:
+        total = counts["total"]
+
     return ResultListResponse(
         results=results,
-        total=len(results)
+        total=total,
+        next_cursor=next_cursor,
+        counts=counts
     )
 
 
@@ -157,53 +332,22 @@ def get_all_results(
 @router.get("/participant/results", response_model=List[ParticipantResultResponse])
 def get_my_results(
     db: Session = Depends(get_db),
-    current_participant: Participant = Depends(get_current_participant)
+    current_participant: TokenClaims = Depends(get_current_participant_claims)
 ):
     """
     Participant views their test results from past attended events.
     Shows results pending for attended events without processed results.
     """
     
-    # Get all bookings for this participant
-    bookings = db.query(Booking).filter(
-        Booking.participant_id == current_participant.id,
-        Booking.booking_status == "checked_in"  # Only attended events
-    ).all()
-    
-    results = []
-    
-    for booking in bookings:
-        if booking.test_result:
-            # Result available
-            results.append(
-                ParticipantResultResponse(
-                    id=str(booking.test_result.id),
-                    event_name=booking.event.name,
-                    event_date=str(booking.event.event_date),
-                    result_category=booking.test_result.result_category,
-                    result_available=True,
-                    uploaded_at=booking.test_result.uploaded_at
-                )
-            )
-        else:
-            # Result pending
-            results.append(
-                ParticipantResultResponse(
-                    id=str(booking.id),
-                    event_name=booking.event.name,
-                    event_date=str(booking.event.event_date),
-                    result_category="Pending",
-                    result_available=False,
-                    uploaded_at=booking.booked_at
-                )
-            )
-    
-    return results
+    results = get_participant_results(db, current_participant.id)
+    
+    return [ParticipantResultResponse(**result) for result in results]
 
 
 @router.post("/participant/results/{result_id}/request-otp", response_model=RequestResultOTPResponse)
 def request_result_otp(
     result_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_participant: Participant = Depends(get_current_participant)
 ):
@@ -211,6 +355,8 @@ def request_result_otp(
     Request OTP to view detailed result (PDPA security).
     """
     
+    enforce_otp_rate_limit(request, current_participant.phone_number, "result_access")
+    
     # Verify result belongs to this participant
     result = db.query(TestResult).filter(TestResult.id == result_id).first()
     
@@ -220,11 +366,10 @@ def request_result_otp(
     if result.booking.participant_id != current_participant.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Generate OTP
-    from app.services.otp_service import invalidate_previous_otps
-    
-    invalidate_previous_otps(db, current_participant.phone_number, "result_access")
+    if result.upload_status != "uploaded":
+        raise HTTPException(status_code=409, detail="Result is not available yet")
     
+    # Generate OTP (replaces any outstanding one)
     otp_record = create_otp_record(
         db=db,
         phone_number=current_participant.phone_number,
@@ -232,15 +377,18 @@ def request_result_otp(
     )
     
     # Send OTP via SMS
-    from app.services.sms_service import send_otp_sms
-    
-    send_otp_sms(
+    queue_otp_sms(
+        db,
         phone=current_participant.phone_number,
         otp_code=otp_record.otp_code,
-        mock=True
+        expires_at=otp_record.expires_at
     )
+    db.commit()
     
-    print(f"OTP sent to {current_participant.phone_number}: {otp_record.otp_code}")
+    logger.info(
+        "OTP issued",
+        extra={"event": "otp_issued", "phone_number": current_participant.phone_number, "purpose": "result_access"}
+    )
     
     return RequestResultOTPResponse(
         message=f"OTP sent to {current_participant.phone_number} to verify identity",
@@ -268,6 +416,9 @@ def view_result_with_otp(
     if result.booking.participant_id != current_participant.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
+    if result.upload_status != "uploaded":
+        raise HTTPException(status_code=409, detail="Result is not available yet")
+    
     # Verify OTP
     is_valid = verify_otp(
         db=db,
@@ -279,28 +430,98 @@ def view_result_with_otp(
     if not is_valid:
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
     
-    # Generate time-limited signed URL for PDF (1 hour validity)
+    # Files are streamed through the download endpoint with a short-lived token
+    token = issue_download_token(result.id, current_participant.id)
+    
     secure_url = None
     if result.result_file_url:
-        # Extract public_id from Cloudinary URL
-        # Format: https://res.cloudinary.com/{cloud}/raw/upload/v123/test_results/{booking_id}/filename
-        # We need: test_results/{booking_id}/filename
-        url_parts = result.result_file_url.split('/upload/')
-        if len(url_parts) > 1:
-            public_id = url_parts[1].split('.')[0]  # Remove extension
-            secure_url = file_upload_service.generate_signed_url(public_id, expires_in_hours=1)
-        else:
-            secure_url = result.result_file_url  # Fallback
+        secure_url = download_url(result.id, token)
+    
+    thumbnail_url = None
+    if result.thumbnail_public_id:
+        thumbnail_url = download_url(result.id, token, variant="thumbnail")
     
     return ViewResultResponse(
         result_category=result.result_category,
         result_notes=result.result_notes,
         result_file_url=secure_url,
+        thumbnail_url=thumbnail_url,
+        download_expires_in_minutes=settings.RESULT_DOWNLOAD_TOKEN_MINUTES,
         event_name=result.booking.event.name,
         event_date=str(result.booking.event.event_date)
     )
 
 
+@router.get("/participant/results/{result_id}/download")
+def download_result(
+    result_id: UUID,
+    token: str,
+    variant: str = Query("pdf", pattern="^(pdf|thumbnail)$"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a result PDF (or its thumbnail) using the token from the view endpoint.
+    Supports single-range requests so downloads can resume on flaky connections.
+    """
+    verify_download_token(token, result_id)
+    
+    row = db.query(
+        TestResult.public_id,
+        TestResult.thumbnail_public_id,
+        TestResult.result_file_url,
+        TestResult.stored_file_size,
+        TestResult.thumbnail_file_size
+    ).filter(TestResult.id == result_id).first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Result not found")
+    
+    if variant == "thumbnail":
+        key = row.thumbnail_public_id
+        size = row.thumbnail_file_size
+    else:
+        key = row.public_id or (row.result_file_url and file_upload_service.key_from_url(row.result_file_url))
+        size = row.stored_file_size
+    
+    if not key:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    response = stored_file_response(
+        key,
+        range_header,
+        if_range=if_range,
+        filename="result.pdf" if variant == "pdf" else None,
+        size=size
+    )
+    response.headers["Cache-Control"] = "private, no-store"
+    return response
+
+
+@router.get("/results/files/{key:path}")
+def download_result_file(
+    key: str,
+    expires: int,
+    signature: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range")
+):
+    """
+    Serve a stored file via a signed, expiring URL (local or encrypted storage).
+    Supports single-range requests so downloads can resume.
+    """
+    if not verify_file_signature(key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    
+    return stored_file_response(
+        key,
+        range_header,
+        if_range=if_range,
+        filename=None if key.endswith(".png") else "result.pdf"
+    )
+
+
 @router.get("/admin/results/{result_id}", response_model=ResultResponse)
 def get_result_by_id(
     result_id: UUID,
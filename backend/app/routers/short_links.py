@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Path, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse
+
+from app.services.short_link_service import NOT_CACHED, cached_target, click_counter, load_target
+
+router = APIRouter(prefix="/r", tags=["Short Links"])
+
+
+@router.get("/{code}", include_in_schema=False)
+async def follow_short_link(code: str = Path(..., pattern="^[A-Za-z0-9]{4,16}$")):
+    """
+    Redirect a short link to its target.
+    Cached codes are answered without touching the database or the threadpool.
+    """
+    target = cached_target(code)
+    if target is NOT_CACHED:
+        target = await run_in_threadpool(load_target, code)
+
+    if target is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
+
+    click_counter.add(code)
+    # 302 rather than 301, so browsers come back through here and clicks are counted
+    return RedirectResponse(target, status_code=status.HTTP_302_FOUND, headers={"Cache-Control": "no-store"})
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from app.config import settings
+from app.services.sms_client import status_callback_url, valid_signature
+from app.services.sms_receipts import receipt_buffer, sms_delivery_receipts_total
+
+router = APIRouter(prefix="/sms", tags=["SMS"])
+
+
+@router.post("/status-callback", status_code=status.HTTP_204_NO_CONTENT)
+async def sms_status_callback(request: Request):
+    """
+    Delivery receipts from the SMS provider.
+    Receipts are only buffered here; a background flusher writes them in batches.
+    """
+    params = dict(await request.form())
+
+    if settings.SMS_STATUS_CALLBACK_VERIFY and not valid_signature(
+        settings.TWILIO_AUTH_TOKEN,
+        status_callback_url(),
+        params,
+        request.headers.get("X-Twilio-Signature", "")
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid signature")
+
+    sid = params.get("MessageSid")
+    message_status = params.get("MessageStatus")
+    if not sid or not message_status:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="MessageSid and MessageStatus are required"
+        )
+
+    message_status = message_status.lower()
+    if not receipt_buffer.add(sid, message_status, params.get("ErrorCode") or None):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Receipt buffer full",
+            headers={"Retry-After": "5"}
+        )
+
+    sms_delivery_receipts_total.inc(status=message_status)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
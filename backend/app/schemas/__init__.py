@@ -29,13 +29,24 @@ from app.schemas.result import (
     ResultUploadRequest,
     ResultResponse,
     ResultListResponse,
+    ResultCounts,
+    BulkResultRowReport,
+    BulkResultUploadResponse,
     SendResultSMSRequest,
     SendResultSMSResponse,
+    BulkSendResultSMSRequest,
+    ResultSMSJobResponse,
     ParticipantResultResponse,
     RequestResultOTPResponse,
     ViewResultResponse,
 )
 
+from app.schemas.dashboard import (
+    HourlyBookingCount,
+    EventDashboardStats,
+    AdminDashboardResponse,
+)
+
 
 __all__ = [
     # Auth schemas
@@ -63,9 +74,18 @@ __all__ = [
     "ResultUploadRequest",
     "ResultResponse",
     "ResultListResponse",
+    "ResultCounts",
+    "BulkResultRowReport",
+    "BulkResultUploadResponse",
     "SendResultSMSRequest",
     "SendResultSMSResponse",
+    "BulkSendResultSMSRequest",
+    "ResultSMSJobResponse",
     "ParticipantResultResponse",
     "RequestResultOTPResponse",
     "ViewResultResponse",
+    # Dashboard schemas
+    "HourlyBookingCount",
+    "EventDashboardStats",
+    "AdminDashboardResponse",
 ]
\ No newline at end of file
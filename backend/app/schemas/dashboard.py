@@ -0,0 +1,54 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from uuid import UUID
+
+
+class HourlyBookingCount(BaseModel):
+    """Bookings made within one hour"""
+    hour: datetime
+    bookings: int
+
+
+class EventDashboardStats(BaseModel):
+    """Rollup counters for a single event"""
+    event_id: UUID
+    event_name: str
+    event_date: date
+    total_slots: int
+    available_slots: int
+    confirmed: int
+    cancelled: int
+    checked_in: int
+    results_uploaded: int
+    sms_sent: int
+    booking_velocity: list[HourlyBookingCount]
+
+
+class AdminDashboardResponse(BaseModel):
+    """Response schema for the admin dashboard"""
+    events: list[EventDashboardStats]
+    total_events: int
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "events": [
+                    {
+                        "event_id": "123e4567-e89b-12d3-a456-426614174000",
+                        "event_name": "Free Cervical Cancer Screening - KL",
+                        "event_date": "2025-11-15",
+                        "total_slots": 50,
+                        "available_slots": 23,
+                        "confirmed": 20,
+                        "cancelled": 3,
+                        "checked_in": 7,
+                        "results_uploaded": 5,
+                        "sms_sent": 4,
+                        "booking_velocity": [
+                            {"hour": "2025-11-10T09:00:00", "bookings": 6}
+                        ]
+                    }
+                ],
+                "total_events": 1
+            }
+        }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, field_serializer, model_validator
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
@@ -27,10 +27,18 @@ class ResultResponse(BaseModel):
     result_category: str
     result_notes: Optional[str]
     result_file_url: Optional[str]
+    public_id: Optional[str] = None
+    thumbnail_public_id: Optional[str] = None
+    upload_status: str
+    upload_error: Optional[str] = None
+    file_sha256: Optional[str] = None
+    file_size: Optional[int] = None
     uploaded_by: UUID
     uploaded_at: datetime
     sms_sent: bool
     sms_sent_at: Optional[datetime]
+    sms_delivery_status: Optional[str] = None  # 'sent', 'delivered', 'failed'
+    sms_delivered_at: Optional[datetime] = None
     
     # ✅ Convert UUIDs to strings automatically
     @field_serializer('id', 'booking_id', 'uploaded_by')
@@ -46,6 +54,8 @@ class ResultResponse(BaseModel):
                 "result_category": "Normal",
                 "result_notes": "HPV test negative",
                 "result_file_url": "https://res.cloudinary.com/...",
+                "upload_status": "uploaded",
+                "upload_error": None,
                 "uploaded_by": "admin-uuid",
                 "uploaded_at": "2025-11-18T10:00:00",
                 "sms_sent": True,
@@ -54,10 +64,63 @@ class ResultResponse(BaseModel):
         }
 
 
+class ResultCounts(BaseModel):
+    """Result counts for the selected event scope (from dashboard rollups)"""
+    total: int
+    normal: int
+    abnormal: int
+    sms_sent: int
+    sms_pending: int
+    sms_delivered: int = 0
+    sms_failed: int = 0
+
+
 class ResultListResponse(BaseModel):
     """Response schema for result list"""
     results: list[ResultResponse]
     total: int
+    next_cursor: Optional[str] = None
+    counts: Optional[ResultCounts] = None
+
+
+class BulkResultRowReport(BaseModel):
+    """Outcome of one manifest row in a bulk result upload"""
+    row: int
+    booking_reference: str
+    status: str  # 'created' or 'error'
+    result_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class BulkResultUploadResponse(BaseModel):
+    """Response for a bulk result upload"""
+    created: int
+    failed: int
+    rows: list[BulkResultRowReport]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "created": 1,
+                "failed": 1,
+                "rows": [
+                    {
+                        "row": 1,
+                        "booking_reference": "ROSE-A7B9C2",
+                        "status": "created",
+                        "result_id": "123e4567-e89b-12d3-a456-426614174000",
+                        "error": None
+                    },
+                    {
+                        "row": 2,
+                        "booking_reference": "ROSE-Q2W3E4",
+                        "status": "error",
+                        "result_id": None,
+                        "error": "Participant hasn't checked in"
+                    }
+                ]
+            }
+        }
 
 
 class SendResultSMSRequest(BaseModel):
@@ -86,6 +149,51 @@ class SendResultSMSResponse(BaseModel):
         }
 
 
+class BulkSendResultSMSRequest(BaseModel):
+    """Send notifications for all unsent results of an event, or for specific results"""
+    event_id: Optional[UUID] = None
+    result_ids: Optional[list[UUID]] = Field(None, max_length=1000)
+
+    @model_validator(mode="after")
+    def require_target(self):
+        if not self.event_id and not self.result_ids:
+            raise ValueError("Provide event_id or result_ids")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "event_id": "123e4567-e89b-12d3-a456-426614174000"
+            }
+        }
+
+
+class ResultSMSJobResponse(BaseModel):
+    """Progress of a bulk result-notification job"""
+    job_id: str
+    status: str  # 'pending', 'running', 'completed', 'failed'
+    total: int
+    queued: int  # Handed to the SMS queue; delivery is tracked per result
+    skipped: int  # Already notified, e.g. by a concurrent job
+    failed: int  # Could not be queued
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "9f1c2d3e-4b5a-6789-0abc-def123456789",
+                "status": "running",
+                "total": 180,
+                "queued": 42,
+                "skipped": 0,
+                "failed": 1,
+                "created_at": "2025-11-18T10:00:00",
+                "finished_at": None
+            }
+        }
+
+
 class ParticipantResultResponse(BaseModel):
     """Participant view of their result (limited fields)"""
     id: str
@@ -127,6 +235,8 @@ class ViewResultResponse(BaseModel):
     result_category: str
     result_notes: Optional[str]
     result_file_url: Optional[str]  # Time-limited secure URL
+    thumbnail_url: Optional[str] = None  # First-page preview, when generated
+    download_expires_in_minutes: Optional[int] = None  # Validity of the URLs above
     event_name: str
     event_date: str
     
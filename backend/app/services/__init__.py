@@ -5,7 +5,6 @@ from app.services.otp_service import (
     cleanup_expired_otps,
     invalidate_previous_otps,
 )
-from app.services.sms_service import send_otp_sms
 from app.services.file_upload_service import file_upload_service
 
 __all__ = [
@@ -14,6 +13,5 @@ __all__ = [
     "verify_otp",
     "cleanup_expired_otps",
     "invalidate_previous_otps",
-    "send_otp_sms",
     "file_upload_service",
 ]
\ No newline at end of file
@@ -4,10 +4,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from fastapi import HTTPException
 from app.models import Booking, Event
-from app.services.sms_service import (
-    send_booking_confirmation_sms,
-    send_booking_cancellation_sms,
+from app.services.sms_queue import (
+    queue_booking_confirmation_sms,
+    queue_booking_cancellation_sms,
 )
+from app.services.stats_service import record_booking_created, record_booking_status_change
+from app.services.result_service import invalidate_participant_results
 
 
 def generate_booking_reference(length: int = 6) -> str:
@@ -18,7 +20,7 @@ def generate_booking_reference(length: int = 6) -> str:
 
 def create_booking(db: Session, participant_id: str, participant_phone: str, event_id: str) -> Booking:
     """
-    Create a booking atomically and send mock SMS confirmation.
+    Create a booking atomically and queue its SMS confirmation.
     """
     try:
         # Lock event row to prevent race conditions
@@ -60,20 +62,21 @@ def create_booking(db: Session, participant_id: str, participant_phone: str, eve
             booking_status="confirmed"
         )
         db.add(booking)
-        db.commit()
-        db.refresh(booking)
+        record_booking_created(db, event.id)
 
-        # Send booking confirmation (mock mode)
-        send_booking_confirmation_sms(
+        # Queue booking confirmation in the same transaction (SMS_MODE decides mock vs live)
+        queue_booking_confirmation_sms(
+            db,
             phone=participant_phone,
             booking_details={
                 "event_name": event.name,
                 "date": str(event.event_date),
                 "time": str(event.event_time),
                 "ref": booking_ref,
-            },
-            mock=True  # 👈 if true SMS will only log to console, not send for real
+            }
         )
+        db.commit()
+        db.refresh(booking)
 
         return booking
 
@@ -84,10 +87,11 @@ def create_booking(db: Session, participant_id: str, participant_phone: str, eve
 
 def cancel_booking(db: Session, booking_id: str, participant_phone: str) -> Booking:
     """
-    Cancel a booking atomically and send mock cancellation SMS.
+    Cancel a booking atomically and queue a cancellation SMS.
     """
     try:
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
+        # Lock the booking so concurrent cancels can't both pass the status check
+        booking = db.query(Booking).filter(Booking.id == booking_id).with_for_update().first()
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -99,20 +103,22 @@ def cancel_booking(db: Session, booking_id: str, participant_phone: str) -> Book
             raise HTTPException(status_code=404, detail="Event not found")
 
         # Update booking + release slot
+        record_booking_status_change(db, event.id, booking.booking_status, "cancelled")
         booking.booking_status = "cancelled"
         booking.cancelled_at = func.now()
         event.available_slots += 1
 
-        db.commit()
-        db.refresh(booking)
-
-        # Send cancellation SMS (mock mode)
-        send_booking_cancellation_sms(
+        # Queue cancellation SMS in the same transaction
+        queue_booking_cancellation_sms(
+            db,
             phone=participant_phone,
-            booking_ref=booking.booking_reference,
-            mock=True  # 👈 if true its still mock mode
+            booking_ref=booking.booking_reference
         )
 
+        db.commit()
+        db.refresh(booking)
+        invalidate_participant_results(booking.participant_id)
+
         return booking
 
     except Exception as e:
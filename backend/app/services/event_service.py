@@ -1,12 +1,18 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from datetime import datetime
+from typing import Optional
 import requests
 import os
 
 from app.models.event import Event, EventStatus
+from app.models.booking import Booking
+from app.models.participant import Participant
+from app.models.event_stats import EventStats
 from app.schemas.event import EventCreateRequest
+from app.services.result_service import encode_cursor, decode_cursor
 
 
 class EventService:
@@ -86,20 +92,117 @@ class EventService:
         return event
 
     # ---------------- GET EVENT WITH PARTICIPANTS ----------------
-    def get_event_with_participants(self, event_id: str):
-        event = self.get_event_by_id(event_id)
+    def get_event_with_participants(
+        self,
+        event_id: str,
+        admin_id: str,
+        booking_status: Optional[str] = None,
+        limit: int = 500,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Get a page of an event's participants in a single query.
+        Ownership is enforced in the WHERE clause, only the needed columns are
+        selected, and the total comes from the event_stats rollup instead of a COUNT.
+        Pages are keyset on (booked_at, id); pass next_cursor to get the next one.
+        """
+        booking_join = Booking.event_id == Event.id
+        if booking_status:
+            booking_join = and_(booking_join, Booking.booking_status == booking_status)
+        if cursor:
+            cursor_at, cursor_id = decode_cursor(cursor)
+            # In the join condition, so the event row is still returned past the last page
+            booking_join = and_(booking_join, tuple_(Booking.booked_at, Booking.id) > tuple_(cursor_at, cursor_id))
+
+        event_columns = (
+            Event.id.label("event_id"),
+            Event.name.label("event_name"),
+            Event.event_date,
+            Event.event_time,
+            Event.address,
+            Event.total_slots,
+            Event.available_slots,
+            EventStats.confirmed_count,
+            EventStats.cancelled_count,
+            EventStats.checked_in_count,
+        )
+
+        rows = (
+            self.db.query(
+                *event_columns,
+                Booking.id.label("booking_id"),
+                Booking.booking_reference,
+                Booking.booking_status,
+                Booking.booked_at,
+                Participant.name,
+                Participant.phone_number,
+                Participant.mykad_id,
+            )
+            .select_from(Event)
+            .outerjoin(EventStats, EventStats.event_id == Event.id)
+            .outerjoin(Booking, booking_join)
+            .outerjoin(Participant, Participant.id == Booking.participant_id)
+            .filter(Event.id == event_id, Event.created_by == admin_id)
+            .order_by(Booking.booked_at.asc(), Booking.id.asc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        if rows:
+            first = rows[0]
+        else:
+            # The event isn't this admin's (or doesn't exist)
+            first = (
+                self.db.query(*event_columns)
+                .outerjoin(EventStats, EventStats.event_id == Event.id)
+                .filter(Event.id == event_id, Event.created_by == admin_id)
+                .first()
+            )
+            if not first:
+                raise HTTPException(status_code=404, detail="Event not found")
+
+        counts = {
+            "confirmed": first.confirmed_count or 0,
+            "cancelled": first.cancelled_count or 0,
+            "checked_in": first.checked_in_count or 0,
+        }
+        total = counts.get(booking_status, 0) if booking_status else sum(counts.values())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].booked_at, rows[-1].booking_id)
+
         participants = [
             {
-                "id": booking.participant.id,
-                "name": booking.participant.name,
-                "phone_number": booking.participant.phone_number,
-                "mykad_id": booking.participant.mykad_id,
-                "booking_status": booking.booking_status,
-                "booked_at": booking.booked_at
+                "id": str(row.booking_id),  # Booking ID (used for check-in / results)
+                "booking_id": str(row.booking_id),
+                "booking_reference": row.booking_reference,
+                "booking_status": row.booking_status,
+                "booked_at": row.booked_at.isoformat(),
+                "name": row.name,
+                "phone_number": row.phone_number,
+                "mykad_id": row.mykad_id,
             }
-            for booking in event.bookings
+            for row in rows
+            if row.booking_id is not None
         ]
-        return {"event": event, "participants": participants}
+
+        return {
+            "event": {
+                "id": str(first.event_id),
+                "name": first.event_name,
+                "event_date": str(first.event_date),
+                "event_time": str(first.event_time),
+                "address": first.address,
+                "total_slots": first.total_slots,
+                "available_slots": first.available_slots,
+            },
+            "participants": participants,
+            "total": total,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
 
     # ---------------- PRIVATE ----------------
     def _validate_address(self, address: str):
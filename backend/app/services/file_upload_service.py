@@ -1,111 +1,80 @@
-import cloudinary
-import cloudinary.uploader
-from app.config import settings
-from typing import Optional
-from datetime import datetime, timedelta
-
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True
+import logging
+import os
+from typing import NamedTuple, Optional
+
+from app.services.storage_service import (
+    get_result_storage,
+    result_key,
+    thumbnail_key,
+    sha256_of_file,
 )
 
+logger = logging.getLogger(__name__)
+
+
+class StoredResultFile(NamedTuple):
+    """Where an uploaded result file lives"""
+    public_id: str  # Storage key
+    url: str
+    size: int  # Bytes served on download (plaintext if storage is encrypted)
+
 
 class FileUploadService:
-    """Service for uploading files to Cloudinary"""
-    
-    def upload_result_pdf(
+    """Service for storing result files in the configured storage backend"""
+
+    def upload_result_file(
         self,
-        file_content: bytes,
+        file_path: str,
         booking_id: str,
-        filename: str
-    ) -> str:
+        filename: str,
+        sha256: Optional[str] = None
+    ) -> StoredResultFile:
         """
-        Upload PDF result to Cloudinary
-        
+        Upload a PDF result from disk without reading it fully into memory
+
         Args:
-            file_content: PDF file bytes
-            booking_id: Booking ID (for folder organization)
+            file_path: Path of the PDF on local disk
+            booking_id: Booking ID (kept for logging)
             filename: Original filename
-            
-        Returns:
-            Cloudinary URL of uploaded file
-        """
-        try:
-            # Upload to Cloudinary with organized folder structure
-            upload_result = cloudinary.uploader.upload(
-                file_content,
-                folder=f"test_results/{booking_id}",
-                resource_type="raw",  # For PDFs
-                public_id=filename.replace('.pdf', ''),
-                type="private",  # Not publicly accessible
-                overwrite=True
-            )
-            
-            print(f"✅ File uploaded to Cloudinary: {upload_result['secure_url']}")
-            
-            return upload_result['secure_url']
-            
-        except Exception as e:
-            print(f"❌ Cloudinary upload failed: {e}")
-            raise
-    
-    
-    def generate_signed_url(
-        self,
-        public_id: str,
-        expires_in_hours: int = 1
-    ) -> str:
-        """
-        Generate time-limited signed URL for secure access
-        
-        Args:
-            public_id: Cloudinary public ID
-            expires_in_hours: URL validity period (default 1 hour)
-            
+            sha256: Content hash if already known
+
         Returns:
-            Signed URL valid for specified duration
+            Storage key, URL and size of stored file
         """
+        storage = get_result_storage()
+        key = result_key(sha256 or sha256_of_file(file_path))
+
         try:
-            # Generate signed URL
-            url = cloudinary.utils.private_download_url(
-                public_id,
-                format='pdf',
-                resource_type='raw',
-                expires_at=int((datetime.utcnow() + timedelta(hours=expires_in_hours)).timestamp())
-            )
-            
-            return url
-            
+            # Content-addressed: identical PDFs are stored once
+            if storage.exists(key):
+                logger.info(f"Reusing stored file for booking {booking_id}: {key}")
+                return StoredResultFile(key, storage.url_for(key), storage.object_size(key))
+
+            url = storage.save_file(key, file_path)
+            logger.info(f"File uploaded for booking {booking_id}: {key}")
+            return StoredResultFile(key, url, os.path.getsize(file_path))
+
         except Exception as e:
-            print(f"❌ Failed to generate signed URL: {e}")
+            logger.error(f"Upload failed for booking {booking_id}: {e}")
             raise
-    
-    
-    def delete_file(self, public_id: str) -> bool:
+
+
+    def upload_thumbnail(self, file_path: str, public_id: str) -> StoredResultFile:
         """
-        Delete file from Cloudinary
-        
-        Args:
-            public_id: Cloudinary public ID
-            
+        Store a result's first-page thumbnail next to its PDF
+
         Returns:
-            True if deleted successfully
+            Storage key, URL and size of the thumbnail
         """
-        try:
-            result = cloudinary.uploader.destroy(
-                public_id,
-                resource_type='raw'
-            )
-            
-            return result.get('result') == 'ok'
-            
-        except Exception as e:
-            print(f"❌ Failed to delete file: {e}")
-            return False
+        key = thumbnail_key(public_id)
+        url = get_result_storage().save_file(key, file_path)
+        return StoredResultFile(key, url, os.path.getsize(file_path))
+
+
+    def key_from_url(self, file_url: str) -> Optional[str]:
+        """Recover the storage key from a stored result_file_url"""
+        return get_result_storage().key_from_url(file_url)
 
 
 # Create singleton instance
-file_upload_service = FileUploadService()
\ No newline at end of file
+file_upload_service = FileUploadService()
@@ -0,0 +1,182 @@
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.logging_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+# otp_codes is range-partitioned by created_at, one partition per UTC day
+# named otp_codes_pYYYYMMDD. Retention drops whole partitions, which is
+# constant time and leaves no dead rows, instead of DELETEing from a hot table.
+# A DEFAULT partition catches rows for days maintenance hasn't created yet
+# (e.g. when it hasn't run for longer than OTP_PARTITION_PRECREATE_DAYS).
+
+PARENT_TABLE = "otp_codes"
+PARTITION_PREFIX = "otp_codes_p"
+DEFAULT_PARTITION = "otp_codes_default"
+
+# Advisory lock key, so only one API worker runs maintenance at a time
+MAINTENANCE_LOCK_ID = 0x07C0DE5
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def is_partition(name: str) -> bool:
+    """True for otp_codes partitions, which aren't modelled (see alembic/env.py)"""
+    return name == DEFAULT_PARTITION or _partition_day(name) is not None
+
+
+def _partition_day(name: str) -> Optional[date]:
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def list_partitions(db: Session) -> list[str]:
+    return db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+        ORDER BY child.relname
+    """), {"parent": PARENT_TABLE}).scalars().all()
+
+
+def ensure_partitions(db: Session, days_ahead: int) -> list[str]:
+    """Create daily partitions from today through `days_ahead` days from now"""
+    existing = set(list_partitions(db))
+    today = datetime.utcnow().date()
+    created = []
+
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = partition_name(day)
+        if name in existing:
+            continue
+        # Names and bounds come from dates, never from input. The day's rows
+        # may already be in the default partition, so build the partition
+        # with them and attach it rather than creating it in place.
+        start, end = day.isoformat(), (day + timedelta(days=1)).isoformat()
+        db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+        db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE created_at >= '{start}' AND created_at < '{end}'
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """))
+        db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        created.append(name)
+
+    return created
+
+
+def drop_expired_partitions(db: Session, retention_days: int) -> list[str]:
+    """
+    Drop partitions whose whole day is older than `retention_days`, and
+    delete expired rows that landed in the default partition.
+    """
+    cutoff = datetime.utcnow().date() - timedelta(days=retention_days)
+    dropped = []
+
+    for name in list_partitions(db):
+        day = _partition_day(name)
+        if day is not None and day < cutoff:
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    db.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+        {"cutoff": cutoff}
+    )
+    return dropped
+
+
+def run_partition_maintenance(db: Optional[Session] = None) -> tuple[list[str], list[str]]:
+    """
+    Pre-create upcoming partitions and drop expired ones.
+    Safe to call from every worker: only one holds the lock at a time.
+
+    Returns:
+        (created partition names, dropped partition names)
+    """
+    owns_session = db is None
+    db = db or SessionLocal()
+    try:
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+            {"lock_id": MAINTENANCE_LOCK_ID}
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return [], []
+
+        created = ensure_partitions(db, settings.OTP_PARTITION_PRECREATE_DAYS)
+        dropped = drop_expired_partitions(db, settings.OTP_PARTITION_RETENTION_DAYS)
+        db.commit()
+
+        if created or dropped:
+            logger.info("otp_codes partitions created=%s dropped=%s", created, dropped)
+        return created, dropped
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_session:
+            db.close()
+
+
+# SCHEDULING
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _maintenance_loop() -> None:
+    while True:
+        try:
+            run_partition_maintenance()
+        except Exception:
+            logger.exception("otp_codes partition maintenance failed")
+        if _stop.wait(settings.OTP_PARTITION_MAINTENANCE_INTERVAL_SECONDS):
+            return
+
+
+def start_partition_maintenance() -> None:
+    """Run maintenance now and then periodically in a background thread"""
+    global _thread
+    if _thread is None:
+        _stop.clear()
+        _thread = threading.Thread(target=_maintenance_loop, name="otp-partitions", daemon=True)
+        _thread.start()
+
+
+def stop_partition_maintenance() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+        _thread = None
+
+
+if __name__ == "__main__":
+    # For cron: python -m app.services.otp_partitions
+    setup_logging()
+    created, dropped = run_partition_maintenance()
+    logger.info("otp_codes partition maintenance done", extra={"created": created, "dropped": dropped})
+    shutdown_logging()
@@ -1,54 +1,49 @@
 import random
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from app.models import OTPCode
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.otp_store import (
+    get_otp_store,
+    IssuedOTP,
+    NOT_FOUND,
+    EXPIRED,
+    TOO_MANY_ATTEMPTS,
+    INVALID,
+)
 
 # OTP GENERATION
 def generate_otp() -> str:
     """Generate 6-digit random OTP code"""
     return str(random.randint(100000, 999999))
 
-# OTP DATABASE OPERATIONS
+# OTP STORE OPERATIONS
 def create_otp_record(
     db: Session,
     phone_number: str,
     purpose: str,
     expiry_minutes: int = 10
-) -> OTPCode:
+) -> IssuedOTP:
     """
-    Create OTP record in database
-    
+    Issue a new OTP, invalidating any previous one for this phone and purpose
+
     Args:
-        db: Database session
+        db: Database session (used by the SQL store)
         phone_number: User's phone number
         purpose: 'registration', 'login', or 'result_access'
         expiry_minutes: OTP validity period (default 10 minutes)
-    
+
     Returns:
-        Created OTPCode object
+        Issued OTP (code and expiry)
     """
-    # Generate OTP
-    otp_code = generate_otp()
-    
-    # Calculate expiry time
-    expires_at = datetime.utcnow() + timedelta(minutes=expiry_minutes)
-    
-    # Create record
-    otp_record = OTPCode(
-        phone_number=phone_number,
-        otp_code=otp_code,
-        purpose=purpose,
-        expires_at=expires_at,
-        verified=False,
-        attempts=0
+    return get_otp_store().issue(
+        db,
+        phone_number,
+        purpose,
+        generate_otp(),
+        expiry_minutes * 60
     )
-    
-    db.add(otp_record)
-    db.commit()
-    db.refresh(otp_record)
-    
-    return otp_record
 
 
 def verify_otp(
@@ -60,88 +55,87 @@ def verify_otp(
 ) -> bool:
     """
     Verify OTP code
-    
+
     Args:
-        db: Database session
+        db: Database session (used by the SQL store)
         phone_number: User's phone number
         otp_code: The OTP code to verify
         purpose: 'registration', 'login', or 'result_access'
         max_attempts: Maximum allowed attempts (default 3)
-    
+
     Returns:
         True if OTP is valid
-    
+
     Raises:
         HTTPException: If OTP is invalid, expired, or max attempts exceeded
     """
-    # Find the most recent OTP for this phone and purpose
-    otp_record = db.query(OTPCode).filter(
-        OTPCode.phone_number == phone_number,
-        OTPCode.purpose == purpose,
-        OTPCode.verified == False
-    ).order_by(OTPCode.created_at.desc()).first()
-    
-    if not otp_record:
+    result = get_otp_store().verify(db, phone_number, purpose, otp_code, max_attempts)
+
+    if result.status == NOT_FOUND:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No OTP found. Please request a new one."
         )
-    
-    # Check if already verified
-    if otp_record.verified:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OTP already used"
-        )
-    
-    # Check expiry
-    if datetime.utcnow() > otp_record.expires_at:
+
+    if result.status == EXPIRED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="OTP expired. Please request a new one."
         )
-    
-    # Increment attempts
-    otp_record.attempts += 1
-    
-    # Check max attempts
-    if otp_record.attempts > max_attempts:
-        db.commit()
+
+    if result.status == TOO_MANY_ATTEMPTS:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many attempts. Please request a new OTP."
         )
-    
-    # Verify OTP code
-    if otp_record.otp_code != otp_code:
-        db.commit()
+
+    if result.status == INVALID:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid OTP. {max_attempts - otp_record.attempts} attempts remaining."
+            detail=f"Invalid OTP. {result.attempts_remaining} attempts remaining."
         )
-    
-    # Mark as verified
-    otp_record.verified = True
-    db.commit()
-    
+
     return True
 
 
+# ASYNC HANDLERS
+# The SQL store runs on the request's async session; the Redis and memory
+# stores don't use the session, and Redis calls block, so they go to the threadpool.
+async def create_otp_record_async(
+    db: AsyncSession,
+    phone_number: str,
+    purpose: str,
+    expiry_minutes: int = 10
+) -> IssuedOTP:
+    """create_otp_record for async handlers"""
+    if settings.OTP_STORE_BACKEND == "sql":
+        return await db.run_sync(create_otp_record, phone_number, purpose, expiry_minutes)
+    return await run_in_threadpool(create_otp_record, None, phone_number, purpose, expiry_minutes)
+
+
+async def verify_otp_async(
+    db: AsyncSession,
+    phone_number: str,
+    otp_code: str,
+    purpose: str,
+    max_attempts: int = 3
+) -> bool:
+    """verify_otp for async handlers"""
+    if settings.OTP_STORE_BACKEND == "sql":
+        return await db.run_sync(verify_otp, phone_number, otp_code, purpose, max_attempts)
+    return await run_in_threadpool(verify_otp, None, phone_number, otp_code, purpose, max_attempts)
+
+
 def cleanup_expired_otps(db: Session) -> int:
     """
-    Delete expired OTP codes from database
-    Should be run periodically (e.g., daily cron job)
-    
+    Remove expired OTP codes from the store.
+    With the SQL store this drops old otp_codes partitions; the API also runs
+    this in the background (see otp_partitions.start_partition_maintenance).
+
     Returns:
-        Number of deleted records
+        Number of removed codes (partitions, for the SQL store)
     """
-    deleted = db.query(OTPCode).filter(
-        OTPCode.expires_at < datetime.utcnow()
-    ).delete()
-    
-    db.commit()
-    
-    return deleted
+    return get_otp_store().purge_expired(db)
 
 
 def invalidate_previous_otps(
@@ -150,18 +144,10 @@ def invalidate_previous_otps(
     purpose: str
 ) -> int:
     """
-    Mark all previous unverified OTPs as verified (invalidate them)
-    Useful when generating new OTP to prevent old ones from working
-    
+    Invalidate all outstanding OTPs for this phone and purpose.
+    create_otp_record already does this when issuing a new code.
+
     Returns:
         Number of invalidated OTPs
     """
-    updated = db.query(OTPCode).filter(
-        OTPCode.phone_number == phone_number,
-        OTPCode.purpose == purpose,
-        OTPCode.verified == False
-    ).update({"verified": True})
-    
-    db.commit()
-    
-    return updated
\ No newline at end of file
+    return get_otp_store().invalidate(db, phone_number, purpose)
@@ -0,0 +1,330 @@
+import hmac
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import select, update, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import OTPCode
+from app.services.otp_partitions import drop_expired_partitions
+
+# Verification outcomes
+VERIFIED = "verified"
+NOT_FOUND = "not_found"
+EXPIRED = "expired"
+TOO_MANY_ATTEMPTS = "too_many_attempts"
+INVALID = "invalid"
+
+
+class IssuedOTP(NamedTuple):
+    """A newly issued one-time code"""
+    phone_number: str
+    purpose: str
+    otp_code: str
+    expires_at: datetime
+
+
+class OTPVerification(NamedTuple):
+    status: str
+    attempts_remaining: int = 0
+
+
+class OTPStore(ABC):
+    """
+    Where one-time codes live. Stores own expiry, attempt limits and
+    invalidation; at most one code per (phone number, purpose) is valid.
+
+    `db` is the request's session, used only by the SQL backend.
+    """
+
+    @abstractmethod
+    def issue(self, db: Optional[Session], phone_number: str, purpose: str,
+              otp_code: str, ttl_seconds: int) -> IssuedOTP:
+        """
+        Store a new code, invalidating any previous one for this phone and purpose.
+        The SQL store writes in the caller's transaction; the caller commits.
+        """
+
+    @abstractmethod
+    def verify(self, db: Optional[Session], phone_number: str, purpose: str,
+               otp_code: str, max_attempts: int) -> OTPVerification:
+        """Check a code, counting the attempt; a verified code can't be used again"""
+
+    @abstractmethod
+    def invalidate(self, db: Optional[Session], phone_number: str, purpose: str) -> int:
+        """Invalidate outstanding codes, returning how many there were"""
+
+    @abstractmethod
+    def purge_expired(self, db: Optional[Session]) -> int:
+        """Remove expired codes, returning how many were removed (partitions, for SQL)"""
+
+
+# Codes are short-lived; bounding created_at lets Postgres skip old partitions
+OTP_LOOKBACK = timedelta(days=1)
+
+
+def _unverified_codes(phone_number: str, purpose: str) -> tuple:
+    return (
+        OTPCode.phone_number == phone_number,
+        OTPCode.purpose == purpose,
+        OTPCode.verified == False,
+        OTPCode.created_at > datetime.utcnow() - OTP_LOOKBACK
+    )
+
+
+class SQLOTPStore(OTPStore):
+    """
+    Codes in the otp_codes table. Issue and verify are one statement each,
+    served by ix_otp_codes_lookup; row locks make concurrent verifies safe.
+    """
+
+    def issue(self, db, phone_number, purpose, otp_code, ttl_seconds):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+
+        # WITH invalidated AS (UPDATE ...) INSERT ...: both in one statement
+        invalidated = (
+            update(OTPCode)
+            .where(*_unverified_codes(phone_number, purpose))
+            .values(verified=True)
+            .returning(OTPCode.id)
+            .cte("invalidated")
+        )
+        db.execute(
+            insert(OTPCode)
+            .values(
+                id=uuid.uuid4(),
+                phone_number=phone_number,
+                otp_code=otp_code,
+                purpose=purpose,
+                created_at=now,
+                expires_at=expires_at,
+                verified=False,
+                attempts=0
+            )
+            .add_cte(invalidated)
+        )
+        # Committed by the caller, together with the queued SMS
+
+        return IssuedOTP(phone_number, purpose, otp_code, expires_at)
+
+    def verify(self, db, phone_number, purpose, otp_code, max_attempts):
+        now = datetime.utcnow()
+        newest = (
+            select(OTPCode.id)
+            .where(*_unverified_codes(phone_number, purpose))
+            .order_by(OTPCode.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        # Count the attempt and mark the code used in one guarded UPDATE.
+        # A concurrent verify of the same row waits for our lock, then
+        # re-checks the guards against the updated row, so only one can pass.
+        row = db.execute(
+            update(OTPCode)
+            .where(
+                OTPCode.id == newest,
+                OTPCode.created_at > now - OTP_LOOKBACK,
+                OTPCode.verified == False,
+                OTPCode.expires_at > now,
+                OTPCode.attempts < max_attempts
+            )
+            .values(
+                attempts=OTPCode.attempts + 1,
+                verified=(OTPCode.otp_code == otp_code)
+            )
+            .returning(OTPCode.verified, OTPCode.attempts)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+
+        if row is not None:
+            if row.verified:
+                return OTPVerification(VERIFIED)
+            return OTPVerification(INVALID, max_attempts - row.attempts)
+
+        # Nothing matched the guards: work out which one failed
+        latest = db.query(OTPCode.expires_at, OTPCode.attempts).filter(
+            *_unverified_codes(phone_number, purpose)
+        ).order_by(OTPCode.created_at.desc()).first()
+
+        if latest is None:
+            return OTPVerification(NOT_FOUND)  # Includes losing a race to a correct verify
+        if latest.expires_at <= now:
+            return OTPVerification(EXPIRED)
+        if latest.attempts >= max_attempts:
+            return OTPVerification(TOO_MANY_ATTEMPTS)
+        return OTPVerification(NOT_FOUND)  # A new code was issued meanwhile
+
+    def invalidate(self, db, phone_number, purpose):
+        updated = db.execute(
+            update(OTPCode)
+            .where(*_unverified_codes(phone_number, purpose))
+            .values(verified=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return updated
+
+    def purge_expired(self, db):
+        # otp_codes is partitioned by day: drop old partitions instead of DELETEing
+        dropped = drop_expired_partitions(db, settings.OTP_PARTITION_RETENTION_DAYS)
+        db.commit()
+        return len(dropped)
+
+
+class _MemoryEntry:
+    __slots__ = ("otp_code", "expires_at", "attempts")
+
+    def __init__(self, otp_code: str, expires_at: float):
+        self.otp_code = otp_code
+        self.expires_at = expires_at  # time.monotonic()
+        self.attempts = 0
+
+
+class MemoryOTPStore(OTPStore):
+    """
+    Codes in this process's memory. Only for single-process deployments
+    and development: a code issued by one worker can't be verified by another.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.entries: dict = {}
+        self.lock = threading.Lock()
+
+    def issue(self, db, phone_number, purpose, otp_code, ttl_seconds):
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                self._purge_expired()
+            self.entries[(phone_number, purpose)] = _MemoryEntry(otp_code, time.monotonic() + ttl_seconds)
+
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        return IssuedOTP(phone_number, purpose, otp_code, expires_at)
+
+    def verify(self, db, phone_number, purpose, otp_code, max_attempts):
+        key = (phone_number, purpose)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return OTPVerification(NOT_FOUND)
+
+            if entry.expires_at <= time.monotonic():
+                del self.entries[key]
+                return OTPVerification(EXPIRED)
+
+            if entry.attempts >= max_attempts:
+                return OTPVerification(TOO_MANY_ATTEMPTS)
+
+            entry.attempts += 1
+            if not hmac.compare_digest(entry.otp_code.encode(), otp_code.encode()):
+                return OTPVerification(INVALID, max_attempts - entry.attempts)
+
+            del self.entries[key]
+            return OTPVerification(VERIFIED)
+
+    def invalidate(self, db, phone_number, purpose):
+        with self.lock:
+            return 1 if self.entries.pop((phone_number, purpose), None) else 0
+
+    def _purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, entry in self.entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self.entries[key]
+        return len(expired)
+
+    def purge_expired(self, db):
+        with self.lock:
+            return self._purge_expired()
+
+
+class RedisOTPStore(OTPStore):
+    """
+    Codes in Redis, or anything speaking its protocol (Valkey, KeyDB,
+    fakeredis for tests). Each code is a hash with a TTL, so expiry is free.
+    Verification uses WATCH/MULTI rather than Lua so simple stand-ins work.
+
+    Args:
+        client: redis-py compatible client created with decode_responses=True;
+            one is created from OTP_REDIS_URL if omitted
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("OTP_STORE_BACKEND=redis requires the redis package")
+            client = redis.Redis.from_url(settings.OTP_REDIS_URL, decode_responses=True)
+        self.client = client
+
+    @staticmethod
+    def _key(phone_number: str, purpose: str) -> str:
+        return f"otp:{purpose}:{phone_number}"
+
+    def issue(self, db, phone_number, purpose, otp_code, ttl_seconds):
+        key = self._key(phone_number, purpose)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping={"code": otp_code, "attempts": 0})
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        return IssuedOTP(phone_number, purpose, otp_code, expires_at)
+
+    def verify(self, db, phone_number, purpose, otp_code, max_attempts):
+        key = self._key(phone_number, purpose)
+
+        def check(pipe) -> OTPVerification:
+            # Retried by redis-py if the key changes between WATCH and EXEC
+            entry = pipe.hgetall(key)
+            if not entry:
+                return OTPVerification(NOT_FOUND)  # Expired keys are gone
+
+            attempts = int(entry["attempts"])
+            if attempts >= max_attempts:
+                return OTPVerification(TOO_MANY_ATTEMPTS)
+
+            attempts += 1
+            pipe.multi()
+            if hmac.compare_digest(entry["code"].encode(), otp_code.encode()):
+                pipe.delete(key)
+                return OTPVerification(VERIFIED)
+
+            pipe.hset(key, "attempts", attempts)
+            return OTPVerification(INVALID, max_attempts - attempts)
+
+        return self.client.transaction(check, key, value_from_callable=True)
+
+    def invalidate(self, db, phone_number, purpose):
+        return self.client.delete(self._key(phone_number, purpose))
+
+    def purge_expired(self, db):
+        return 0  # Keys expire on their own
+
+
+# BACKEND SELECTION
+_store: Optional[OTPStore] = None
+
+
+def get_otp_store() -> OTPStore:
+    """OTP store selected by OTP_STORE_BACKEND, created on first use"""
+    global _store
+    if _store is None:
+        backend = settings.OTP_STORE_BACKEND
+        if backend == "sql":
+            _store = SQLOTPStore()
+        elif backend == "memory":
+            _store = MemoryOTPStore()
+        elif backend == "redis":
+            _store = RedisOTPStore()
+        else:
+            raise RuntimeError(f"Unknown OTP_STORE_BACKEND: {backend}")
+    return _store
@@ -0,0 +1,128 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import Optional
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.utils.security import build_password_context
+
+# bcrypt takes ~250 ms of CPU at cost 12. Running it in sync handlers ties up
+# threadpool workers, so a burst of logins starves every other endpoint.
+# Hashing runs in a small process pool instead; when it is saturated callers
+# get a fast 503 rather than queueing indefinitely.
+
+# In-flight hashes across the pool: running plus waiting
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_PENDING)
+
+# Created on first use so API workers that never hash passwords don't start one
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Per-process contexts, keyed by bcrypt cost
+_contexts: dict = {}
+
+
+def _context(rounds: int):
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = build_password_context(rounds)
+    return context
+
+
+def _hash_in_worker(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_in_worker(password: str, password_hash: str, rounds: int) -> tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, password_hash)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # forkserver: forking a threaded API worker can copy held locks into the child
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _executor
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
+def _submit(fn, *args):
+    """Start fn in the pool, or fail fast if it is saturated"""
+    if not _slots.acquire(blocking=False):
+        raise _busy()
+
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _run(fn, *args):
+    """Run fn in the pool, blocking the calling thread (not the CPU) until it finishes"""
+    future = _submit(fn, *args)
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise _busy()
+
+
+async def _run_async(fn, *args):
+    """Run fn in the pool without blocking the event loop"""
+    future = _submit(fn, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise _busy()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured bcrypt cost, off the request thread
+
+    Raises:
+        HTTPException: 503 if the hashing pool is saturated
+    """
+    return _run(_hash_in_worker, password, settings.BCRYPT_ROUNDS)
+
+
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password, off the request thread
+
+    Returns:
+        (valid, new_hash) - new_hash is set when the stored hash uses a
+        different cost than BCRYPT_ROUNDS and should be replaced
+
+    Raises:
+        HTTPException: 503 if the hashing pool is saturated
+    """
+    return _run(_verify_in_worker, password, password_hash, settings.BCRYPT_ROUNDS)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password for async handlers"""
+    return await _run_async(_hash_in_worker, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_and_update_password_async(password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+    """verify_and_update_password for async handlers"""
+    return await _run_async(_verify_in_worker, password, password_hash, settings.BCRYPT_ROUNDS)
+
+
+def shutdown_password_pool() -> None:
+    if _executor is not None:
+        _executor.shutdown(wait=True)
@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import NamedTuple, Optional
+
+from app.config import settings
+
+# The optimisation and thumbnail steps use optional packages:
+#   pikepdf    - structural validation, recompression and linearization
+#   pypdfium2  - first-page thumbnail rendering (with Pillow)
+# Without them the pipeline still validates the PDF header and trailer.
+
+PDF_HEADER = b"%PDF-"
+PDF_TRAILER = b"%%EOF"
+TRAILER_SEARCH_BYTES = 2048
+
+
+class InvalidPDFError(Exception):
+    """The uploaded file is not a readable PDF"""
+
+
+class PreprocessedPDF(NamedTuple):
+    """Outputs of the preprocessing pipeline"""
+    pdf_path: str  # Optimised PDF, or the original if it couldn't be improved
+    thumbnail_path: Optional[str]
+
+
+def _validate_pdf(path: str) -> None:
+    with open(path, "rb") as f:
+        if f.read(len(PDF_HEADER)) != PDF_HEADER:
+            raise InvalidPDFError("File is not a PDF")
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - TRAILER_SEARCH_BYTES, 0))
+        if PDF_TRAILER not in f.read():
+            raise InvalidPDFError("PDF is truncated or corrupt")
+
+
+def _optimise_pdf(path: str) -> str:
+    """Recompress and linearize for fast first-page display; returns the path to use"""
+    try:
+        import pikepdf
+    except ImportError:
+        return path
+
+    optimised_path = f"{path}.optimised.pdf"
+    try:
+        with pikepdf.open(path) as pdf:
+            pdf.save(
+                optimised_path,
+                linearize=True,
+                compress_streams=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate
+            )
+    except pikepdf.PdfError as e:
+        raise InvalidPDFError(f"PDF could not be parsed: {e}")
+
+    # Linearizing an already-compact file can grow it; keep whichever is smaller
+    if os.path.getsize(optimised_path) >= os.path.getsize(path):
+        os.remove(optimised_path)
+        return path
+    return optimised_path
+
+
+def _render_thumbnail(path: str) -> Optional[str]:
+    """Render the first page as a small PNG, if the renderer is installed"""
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+
+    thumbnail_path = f"{path}.thumb.png"
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        if len(pdf) == 0:
+            return None
+        page = pdf[0]
+        width = page.get_width()
+        scale = settings.PDF_THUMBNAIL_WIDTH / width if width else 1
+        image = page.render(scale=scale).to_pil()
+        image.save(thumbnail_path, format="PNG", optimize=True)
+        return thumbnail_path
+    finally:
+        pdf.close()
+
+
+def _run_pipeline(path: str) -> PreprocessedPDF:
+    """Runs inside a worker process"""
+    _validate_pdf(path)
+    pdf_path = _optimise_pdf(path)
+    thumbnail_path = _render_thumbnail(pdf_path)
+    return PreprocessedPDF(pdf_path, thumbnail_path)
+
+
+# Created on first use so API workers that never preprocess don't start one
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Forking a threaded API worker can copy held locks (DB pool, logging)
+        # into the child; forkserver children start from a clean process
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_PIPELINE_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _executor
+
+
+def preprocess_pdf(path: str) -> PreprocessedPDF:
+    """
+    Validate, optimise and thumbnail a PDF in the process pool.
+    Blocks the calling (background) thread, never the event loop.
+
+    Raises:
+        InvalidPDFError: If the file isn't a usable PDF, or takes longer than
+            PDF_PIPELINE_TIMEOUT_SECONDS to process
+    """
+    future = _get_executor().submit(_run_pipeline, path)
+    try:
+        return future.result(timeout=settings.PDF_PIPELINE_TIMEOUT_SECONDS)
+    except TimeoutError:
+        # The worker process isn't killed: a running job keeps its pool slot
+        # until it finishes. cancel() only drops it if it never started.
+        future.cancel()
+        raise InvalidPDFError(
+            f"PDF took longer than {settings.PDF_PIPELINE_TIMEOUT_SECONDS}s to process"
+        )
+
+
+def cleanup_outputs(original_path: str, processed: PreprocessedPDF) -> None:
+    """Remove intermediate files produced by the pipeline"""
+    for path in (processed.pdf_path, processed.thumbnail_path):
+        if path and path != original_path and os.path.exists(path):
+            os.remove(path)
+
+
+def shutdown_pipeline() -> None:
+    if _executor is not None:
+        _executor.shutdown(wait=True)
@@ -0,0 +1,192 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+otp_requests_total = counter(
+    "otp_requests_total",
+    "OTP requests that passed the rate limiter",
+    ["purpose"]
+)
+otp_rate_limited_total = counter(
+    "otp_rate_limited_total",
+    "OTP requests rejected by the rate limiter",
+    ["purpose", "scope"]
+)
+
+
+class SlidingWindowLimiter(ABC):
+    """Sliding-log rate limiter: at most `limit` hits per key in any `window_seconds`"""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window_seconds: float) -> float:
+        """
+        Record a hit if it is allowed.
+
+        Returns:
+            0 if allowed, otherwise seconds until the next hit would be
+        """
+
+
+class MemorySlidingWindowLimiter(SlidingWindowLimiter):
+    """
+    Per-process limiter; with several workers each enforces its own limit.
+    Holds at most `max_keys` keys: idle keys are swept first, then the least
+    recently hit keys are evicted (which forgets their hits).
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.windows: OrderedDict = OrderedDict()  # key -> (window_seconds, hit times), oldest hit first
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, window_seconds):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.windows.get(key)
+            if entry is None:
+                if len(self.windows) >= self.max_keys:
+                    self._sweep(now)
+                entry = self.windows[key] = (window_seconds, deque())
+            else:
+                self.windows.move_to_end(key)
+            hits = entry[1]
+
+            while hits and hits[0] <= now - window_seconds:
+                hits.popleft()
+
+            if len(hits) >= limit:
+                return hits[0] + window_seconds - now
+
+            hits.append(now)
+            return 0
+
+    def _sweep(self, now: float) -> None:
+        """Drop keys idle for their own window, then the least recently hit until there is room"""
+        idle = [
+            key for key, (window_seconds, hits) in self.windows.items()
+            if not hits or hits[-1] <= now - window_seconds
+        ]
+        for key in idle:
+            del self.windows[key]
+        while len(self.windows) >= self.max_keys:
+            self.windows.popitem(last=False)
+
+
+class RedisSlidingWindowLimiter(SlidingWindowLimiter):
+    """
+    Limiter shared by all workers, as one sorted set of hit times per key.
+    Works with Redis or anything speaking its protocol.
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+            client = redis.Redis.from_url(
+                settings.RATE_LIMIT_REDIS_URL or settings.OTP_REDIS_URL,
+                decode_responses=True
+            )
+        self.client = client
+
+    def hit(self, key, limit, window_seconds):
+        now = time.time()
+        member = f"{now}:{uuid.uuid4().hex}"
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(key, 0, now - window_seconds)
+        pipe.zadd(key, {member: now})
+        pipe.zcard(key)
+        pipe.expire(key, math.ceil(window_seconds))
+        _, _, count, _ = pipe.execute()
+
+        if count <= limit:
+            return 0
+
+        # Over the limit: rejected hits don't count against the window
+        self.client.zrem(key, member)
+        oldest = self.client.zrange(key, 0, 0, withscores=True)
+        if not oldest:
+            return window_seconds
+        return max(oldest[0][1] + window_seconds - now, 0.001)
+
+
+# BACKEND SELECTION
+_limiter: Optional[SlidingWindowLimiter] = None
+
+
+def get_rate_limiter() -> SlidingWindowLimiter:
+    """Limiter selected by RATE_LIMIT_BACKEND, created on first use"""
+    global _limiter
+    if _limiter is None:
+        backend = settings.RATE_LIMIT_BACKEND
+        if backend == "memory":
+            _limiter = MemorySlidingWindowLimiter()
+        elif backend == "redis":
+            _limiter = RedisSlidingWindowLimiter()
+        else:
+            raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+    return _limiter
+
+
+# OTP LIMITS
+def client_ip(request: Request) -> str:
+    """Caller's IP; X-Forwarded-For is only trusted behind a known proxy"""
+    if settings.TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_otp_rate_limit(request: Request, phone_number: str, purpose: str) -> None:
+    """
+    Limit OTP issuance per client IP and per phone number.
+    Call before any database work or SMS sending.
+
+    Raises:
+        HTTPException: 429 with Retry-After when a limit is exceeded
+    """
+    checks = (
+        ("ip", client_ip(request), settings.OTP_RATE_LIMIT_PER_IP, settings.OTP_RATE_LIMIT_IP_WINDOW_SECONDS),
+        ("phone", phone_number, settings.OTP_RATE_LIMIT_PER_PHONE, settings.OTP_RATE_LIMIT_PHONE_WINDOW_SECONDS),
+    )
+
+    for scope, key, limit, window_seconds in checks:
+        try:
+            retry_after = get_rate_limiter().hit(f"ratelimit:otp:{scope}:{key}", limit, window_seconds)
+        except Exception as e:
+            # A shared-store outage shouldn't lock everyone out of logging in
+            logger.warning(f"OTP rate limiter unavailable, allowing request: {e}")
+            continue
+
+        if retry_after:
+            otp_rate_limited_total.inc(purpose=purpose, scope=scope)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many verification codes requested. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    otp_requests_total.inc(purpose=purpose)
+
+
+async def enforce_otp_rate_limit_async(request: Request, phone_number: str, purpose: str) -> None:
+    """enforce_otp_rate_limit for async handlers; Redis round trips run in the threadpool"""
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        enforce_otp_rate_limit(request, phone_number, purpose)
+    else:
+        await run_in_threadpool(enforce_otp_rate_limit, request, phone_number, purpose)
@@ -0,0 +1,83 @@
+import os
+from datetime import timedelta
+from typing import Optional
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.services.storage_service import get_result_storage, file_format
+from app.utils.file_response import ranged_file_response, ranged_stream_response
+from app.utils.security import create_access_token, verify_token
+
+# Download tokens open one result's files only; get_current_user rejects this role
+DOWNLOAD_TOKEN_ROLE = "result_download"
+
+
+def issue_download_token(result_id, participant_id) -> str:
+    """Short-lived token for one result's files, issued after OTP verification"""
+    return create_access_token(
+        data={
+            "sub": str(participant_id),
+            "role": DOWNLOAD_TOKEN_ROLE,
+            "result_id": str(result_id)
+        },
+        expires_delta=timedelta(minutes=settings.RESULT_DOWNLOAD_TOKEN_MINUTES)
+    )
+
+
+def verify_download_token(token: str, result_id) -> dict:
+    """
+    Raises:
+        HTTPException: 401 if the token is invalid or expired, 403 if it is for another result
+    """
+    payload = verify_token(token)
+    if payload.get("role") != DOWNLOAD_TOKEN_ROLE or payload.get("result_id") != str(result_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid download token")
+    return payload
+
+
+def download_url(result_id, token: str, variant: str = "pdf") -> str:
+    """API URL for downloading a result file (or its thumbnail) with a download token"""
+    url = f"{settings.PUBLIC_API_URL}/participant/results/{result_id}/download?token={token}"
+    return url if variant == "pdf" else f"{url}&variant={variant}"
+
+
+def stored_file_response(
+    key: str,
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+    filename: Optional[str] = None,
+    size: Optional[int] = None
+):
+    """
+    Stream a stored object through the API, honouring a single byte range.
+    Encrypted objects are decrypted chunk by chunk, so a range only reads
+    the chunks that cover it. Pass the size recorded at upload to skip
+    asking the storage backend for it.
+
+    Raises:
+        HTTPException: 404 if the object doesn't exist
+    """
+    storage = get_result_storage()
+    media_type = "image/png" if file_format(key) == "png" else "application/pdf"
+
+    # Plain local files can be served straight from disk
+    path = storage.local_path(key)
+    if path:
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="File not found")
+        return ranged_file_response(path, range_header, media_type=media_type, filename=filename)
+
+    if size is None:
+        size = storage.object_size(key)
+    if size is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return ranged_stream_response(
+        size,
+        lambda start, end: storage.read_range(key, start, end),
+        range_header,
+        media_type=media_type,
+        filename=filename,
+        etag=f'"{key.rsplit("/", 1)[-1]}"',  # Keys are content hashes
+        if_range=if_range
+    )
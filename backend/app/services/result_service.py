@@ -0,0 +1,444 @@
+import base64
+import csv
+import hashlib
+import io
+import os
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import tuple_, insert
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.models import Booking, Event, TestResult
+from app.utils.cache import TTLCache
+from app.services.result_upload_service import store_result_file, SPOOL_CHUNK_BYTES
+from app.services.stats_service import record_result_uploaded
+
+RESULT_CATEGORIES = ("Normal", "Abnormal - follow up required")
+MANIFEST_REQUIRED_COLUMNS = {"booking_reference", "result_category", "filename"}
+
+# Participant result lists, invalidated when a result is uploaded or a booking changes
+_participant_results_cache = TTLCache(
+    max_entries=settings.PARTICIPANT_RESULTS_CACHE_SIZE,
+    ttl_seconds=settings.PARTICIPANT_RESULTS_CACHE_TTL_SECONDS
+)
+
+
+# KEYSET CURSORS
+def encode_cursor(uploaded_at: datetime, result_id: UUID) -> str:
+    """Encode the last row's sort key as an opaque cursor"""
+    raw = f"{uploaded_at.isoformat()}|{result_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        uploaded_at, result_id = raw.split("|", 1)
+        return datetime.fromisoformat(uploaded_at), UUID(result_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+# PARTICIPANT VIEW
+def get_participant_results(db: Session, participant_id) -> list[dict]:
+    """
+    Results (or pending placeholders) for every event the participant attended.
+    Served from one outer-joined, column-only query and cached per participant.
+    """
+    cached = _participant_results_cache.get(participant_id)
+    if cached is not None:
+        return cached
+
+    rows = (
+        db.query(
+            Booking.id.label("booking_id"),
+            Booking.booked_at,
+            Event.name.label("event_name"),
+            Event.event_date,
+            TestResult.id.label("result_id"),
+            TestResult.result_category,
+            TestResult.uploaded_at,
+            TestResult.upload_status,
+        )
+        .join(Event, Event.id == Booking.event_id)
+        .outerjoin(TestResult, TestResult.booking_id == Booking.id)
+        .filter(
+            Booking.participant_id == participant_id,
+            Booking.booking_status == "checked_in"  # Only attended events
+        )
+        .order_by(Event.event_date.desc())
+        .all()
+    )
+
+    results = []
+    for row in rows:
+        if row.result_id and row.upload_status == "uploaded":
+            # Result available
+            results.append({
+                "id": str(row.result_id),
+                "event_name": row.event_name,
+                "event_date": str(row.event_date),
+                "result_category": row.result_category,
+                "result_available": True,
+                "uploaded_at": row.uploaded_at,
+            })
+        else:
+            # Result pending (not uploaded yet, or its file is still on its way to storage)
+            results.append({
+                "id": str(row.booking_id),
+                "event_name": row.event_name,
+                "event_date": str(row.event_date),
+                "result_category": "Pending",
+                "result_available": False,
+                "uploaded_at": row.booked_at,
+            })
+
+    _participant_results_cache.set(participant_id, results)
+    return results
+
+
+def invalidate_participant_results(*participant_ids) -> None:
+    """Drop cached result lists after a participant's results or attendance change"""
+    for participant_id in participant_ids:
+        _participant_results_cache.invalidate(participant_id)
+
+
+# LISTING
+def _admin_results_query(
+    db: Session,
+    admin_id,
+    event_id: Optional[UUID] = None,
+    result_category: Optional[str] = None,
+    sms_sent: Optional[bool] = None,
+    sms_delivery_status: Optional[str] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None
+):
+    """Results of the admin's events matching the listing filters"""
+    query = (
+        db.query(TestResult)
+        .join(Booking, Booking.id == TestResult.booking_id)
+        .join(Event, Event.id == Booking.event_id)
+        .filter(Event.created_by == admin_id)
+    )
+
+    if event_id:
+        query = query.filter(Booking.event_id == event_id)
+    if result_category:
+        query = query.filter(TestResult.result_category == result_category)
+    if sms_sent is not None:
+        query = query.filter(TestResult.sms_sent == sms_sent)
+    if sms_delivery_status:
+        query = query.filter(TestResult.sms_delivery_status == sms_delivery_status)
+    if uploaded_from:
+        query = query.filter(TestResult.uploaded_at >= uploaded_from)
+    if uploaded_to:
+        query = query.filter(TestResult.uploaded_at < uploaded_to)
+    return query
+
+
+def count_admin_results(db: Session, admin_id, **filters) -> int:
+    """
+    COUNT of results matching the listing filters. For filter combinations
+    the event_stats rollups can't answer (see get_all_results).
+    """
+    return _admin_results_query(db, admin_id, **filters).order_by(None).count()
+
+
+def list_admin_results(
+    db: Session,
+    admin_id,
+    event_id: Optional[UUID] = None,
+    result_category: Optional[str] = None,
+    sms_sent: Optional[bool] = None,
+    sms_delivery_status: Optional[str] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> tuple[list[TestResult], Optional[str]]:
+    """
+    Page through results for the admin's events, newest first.
+
+    Uses keyset pagination on (uploaded_at, id), so every page costs the same
+    regardless of how deep into the listing the admin is.
+
+    Returns:
+        (results, next_cursor) - next_cursor is None on the last page
+    """
+    query = _admin_results_query(
+        db,
+        admin_id,
+        event_id=event_id,
+        result_category=result_category,
+        sms_sent=sms_sent,
+        sms_delivery_status=sms_delivery_status,
+        uploaded_from=uploaded_from,
+        uploaded_to=uploaded_to
+    )
+    if cursor:
+        cursor_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(TestResult.uploaded_at, TestResult.id) < tuple_(cursor_at, cursor_id)
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    results = (
+        query
+        .order_by(TestResult.uploaded_at.desc(), TestResult.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor(last.uploaded_at, last.id)
+
+    return results, next_cursor
+
+
+# BULK INGESTION
+def _parse_manifest(manifest: bytes) -> list[dict]:
+    """Parse the CSV manifest into row dicts (1-based row numbers, header excluded)"""
+    try:
+        text = manifest.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Manifest must be UTF-8 encoded CSV"
+        )
+
+    reader = csv.DictReader(io.StringIO(text))
+    missing = MANIFEST_REQUIRED_COLUMNS - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Manifest is missing columns: {', '.join(sorted(missing))}"
+        )
+
+    rows = []
+    for row_number, row in enumerate(reader, start=1):
+        rows.append({
+            "row": row_number,
+            "booking_reference": (row.get("booking_reference") or "").strip().upper(),
+            "result_category": (row.get("result_category") or "").strip(),
+            "result_notes": (row.get("result_notes") or "").strip() or None,
+            "filename": (row.get("filename") or "").strip(),
+        })
+
+    if len(rows) > settings.BULK_RESULT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Manifest has more than {settings.BULK_RESULT_MAX_ROWS} rows"
+        )
+    return rows
+
+
+def _validate_manifest_rows(db: Session, admin_id, rows: list[dict], archive_sizes: dict) -> None:
+    """
+    Validate every manifest row, setting row["error"] on failures and
+    row["booking_id"] / row["event_id"] on success.
+    All bookings are checked with a single set-based query.
+    """
+    seen_refs = set()
+    for row in rows:
+        row["error"] = None
+        if not row["booking_reference"]:
+            row["error"] = "Missing booking_reference"
+        elif row["booking_reference"] in seen_refs:
+            row["error"] = "Duplicate booking_reference in manifest"
+        elif row["result_category"] not in RESULT_CATEGORIES:
+            row["error"] = f"Invalid result_category: {row['result_category']!r}"
+        elif not row["filename"].lower().endswith(".pdf"):
+            row["error"] = "filename must be a PDF"
+        elif row["filename"] not in archive_sizes:
+            row["error"] = f"File not found in ZIP: {row['filename']}"
+        elif archive_sizes[row["filename"]] > settings.RESULT_MAX_FILE_BYTES:
+            row["error"] = "File exceeds the size limit"
+        seen_refs.add(row["booking_reference"])
+
+    references = [row["booking_reference"] for row in rows if not row["error"]]
+    if not references:
+        return
+
+    bookings = {
+        booking.booking_reference: booking
+        for booking in (
+            db.query(
+                Booking.id,
+                Booking.booking_reference,
+                Booking.booking_status,
+                Booking.event_id,
+                Booking.participant_id,
+                TestResult.id.label("result_id"),
+            )
+            .join(Event, Event.id == Booking.event_id)
+            .outerjoin(TestResult, TestResult.booking_id == Booking.id)
+            .filter(
+                Booking.booking_reference.in_(references),
+                Event.created_by == admin_id
+            )
+            .all()
+        )
+    }
+
+    for row in rows:
+        if row["error"]:
+            continue
+        booking = bookings.get(row["booking_reference"])
+        if not booking:
+            row["error"] = "Booking not found"
+        elif booking.booking_status != "checked_in":
+            row["error"] = "Participant hasn't checked in"
+        elif booking.result_id:
+            row["error"] = "Result already uploaded for this booking"
+        else:
+            row["booking_id"] = booking.id
+            row["event_id"] = booking.event_id
+            row["participant_id"] = booking.participant_id
+
+
+def _upload_archive_member(archive: zipfile.ZipFile, row: dict) -> None:
+    """Upload one PDF from the archive, recording the storage location or the error on the row"""
+    os.makedirs(settings.RESULT_SPOOL_DIR, exist_ok=True)
+    path = os.path.join(settings.RESULT_SPOOL_DIR, f"bulk-{uuid.uuid4()}.pdf")
+    try:
+        # Stream the member to disk rather than holding it in memory
+        hasher = hashlib.sha256()
+        with archive.open(row["filename"]) as source, open(path, "wb") as destination:
+            for chunk in iter(lambda: source.read(SPOOL_CHUNK_BYTES), b""):
+                # Same header check as single uploads (spool_result_file)
+                if destination.tell() == 0 and not chunk.startswith(b"%PDF-"):
+                    row["error"] = "File must be a PDF"
+                    return
+                hasher.update(chunk)
+                destination.write(chunk)
+
+        if os.path.getsize(path) == 0:
+            row["error"] = "File must be a PDF"
+            return
+
+        stored, thumbnail = store_result_file(
+            path,
+            sha256=hasher.hexdigest(),
+            booking_id=str(row["booking_id"]),
+            filename=row["filename"].rsplit("/", 1)[-1]
+        )
+        row["file_url"] = stored.url
+        row["public_id"] = stored.public_id
+        row["stored_file_size"] = stored.size
+        row["thumbnail_public_id"] = thumbnail.public_id if thumbnail else None
+        row["thumbnail_file_size"] = thumbnail.size if thumbnail else None
+        row["file_sha256"] = hasher.hexdigest()
+        row["file_size"] = os.path.getsize(path)
+    except Exception as e:
+        row["error"] = f"Upload failed: {e}"
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _insert_result_batch(db: Session, admin_id, batch: list[dict]) -> None:
+    """Insert a batch of results and their rollup increments in one transaction"""
+    uploaded_at = datetime.utcnow()
+    for row in batch:
+        row["result_id"] = uuid.uuid4()
+
+    try:
+        db.execute(
+            insert(TestResult),
+            [
+                {
+                    "id": row["result_id"],
+                    "booking_id": row["booking_id"],
+                    "result_category": row["result_category"],
+                    "result_notes": row["result_notes"],
+                    "result_file_url": row["file_url"],
+                    "public_id": row["public_id"],
+                    "thumbnail_public_id": row["thumbnail_public_id"],
+                    "stored_file_size": row["stored_file_size"],
+                    "thumbnail_file_size": row["thumbnail_file_size"],
+                    "file_sha256": row["file_sha256"],
+                    "file_size": row["file_size"],
+                    "upload_status": "uploaded",
+                    "uploaded_by": admin_id,
+                    "uploaded_at": uploaded_at,
+                    "sms_sent": False,
+                }
+                for row in batch
+            ]
+        )
+
+        per_event_category: dict = {}
+        for row in batch:
+            key = (row["event_id"], row["result_category"])
+            per_event_category[key] = per_event_category.get(key, 0) + 1
+        for (event_id, result_category), count in per_event_category.items():
+            record_result_uploaded(db, event_id, result_category, count=count)
+
+        db.commit()
+        invalidate_participant_results(*(row["participant_id"] for row in batch))
+    except SQLAlchemyError as e:
+        db.rollback()
+        for row in batch:
+            row["result_id"] = None
+            row["error"] = f"Database error: {e.__class__.__name__}"
+
+
+def bulk_ingest_results(db: Session, admin_id, archive_file: BinaryIO, manifest: bytes) -> list[dict]:
+    """
+    Ingest many results from a ZIP of PDFs plus a CSV manifest.
+
+    Manifest columns: booking_reference, result_category, filename, result_notes (optional).
+    Valid rows are uploaded in parallel through a bounded worker pool and
+    inserted in batches. Invalid rows are reported and skipped.
+
+    Returns:
+        Per-row report in manifest order
+    """
+    rows = _parse_manifest(manifest)
+
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded archive is not a valid ZIP file"
+        )
+
+    with archive:
+        archive_sizes = {info.filename: info.file_size for info in archive.infolist() if not info.is_dir()}
+        _validate_manifest_rows(db, admin_id, rows, archive_sizes)
+
+        valid_rows = [row for row in rows if not row["error"]]
+        with ThreadPoolExecutor(max_workers=settings.RESULT_UPLOAD_WORKERS) as pool:
+            list(pool.map(lambda row: _upload_archive_member(archive, row), valid_rows))
+
+    uploaded_rows = [row for row in valid_rows if not row["error"]]
+    batch_size = settings.RESULT_INSERT_BATCH_SIZE
+    for start in range(0, len(uploaded_rows), batch_size):
+        _insert_result_batch(db, admin_id, uploaded_rows[start:start + batch_size])
+
+    return [
+        {
+            "row": row["row"],
+            "booking_reference": row["booking_reference"],
+            "status": "error" if row["error"] else "created",
+            "result_id": row.get("result_id"),
+            "error": row["error"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,181 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Booking, Event, Participant, ResultSMSJob, TestResult
+from app.services.sms_queue import queue_result_notification_sms
+from app.services.short_link_service import result_short_urls
+from app.services.stats_service import record_result_sms_sent
+
+logger = logging.getLogger(__name__)
+
+
+def get_job(db: Session, job_id: str, admin_id) -> Optional[ResultSMSJob]:
+    """Get a job owned by this admin"""
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return None
+    return db.query(ResultSMSJob).filter(
+        ResultSMSJob.id == job_uuid,
+        ResultSMSJob.admin_id == admin_id
+    ).first()
+
+
+def select_unsent_results(
+    db: Session,
+    admin_id,
+    event_id=None,
+    result_ids: Optional[list] = None
+) -> list:
+    """
+    Select everything needed to notify unsent results in one query.
+    Only results for the admin's own events are returned.
+    """
+    query = (
+        db.query(
+            TestResult.id,
+            TestResult.result_category,
+            Booking.booking_reference,
+            Booking.event_id,
+            Participant.name,
+            Participant.phone_number,
+        )
+        .join(Booking, Booking.id == TestResult.booking_id)
+        .join(Event, Event.id == Booking.event_id)
+        .join(Participant, Participant.id == Booking.participant_id)
+        .filter(
+            Event.created_by == admin_id,
+            TestResult.sms_sent == False,
+            TestResult.upload_status == "uploaded"
+        )
+    )
+    if event_id:
+        query = query.filter(Booking.event_id == event_id)
+    if result_ids:
+        query = query.filter(TestResult.id.in_(result_ids))
+
+    return query.all()
+
+
+def create_job(db: Session, admin_id, total: int) -> ResultSMSJob:
+    job = ResultSMSJob(admin_id=admin_id, status="pending", total=total, queued=0, skipped=0, failed=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _update_job(db: Session, job_id, **values) -> None:
+    db.execute(
+        update(ResultSMSJob)
+        .where(ResultSMSJob.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _mark_sent(db: Session, rows: list) -> list:
+    """
+    Mark a batch of results as notified with one UPDATE per event.
+    Returns the rows this call marked, so results claimed by a concurrent
+    job aren't queued twice. sms_sent_at is set once the provider accepts
+    the message (sms_receipts.record_result_sent).
+    """
+    by_event: dict = {}
+    for row in rows:
+        by_event.setdefault(row.event_id, []).append(row.id)
+
+    marked_ids = set()
+    for event_id, ids in by_event.items():
+        updated = db.execute(
+            update(TestResult)
+            .where(TestResult.id.in_(ids), TestResult.sms_sent == False)
+            .values(sms_sent=True)
+            .returning(TestResult.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if updated:
+            record_result_sms_sent(db, event_id, count=len(updated))
+            marked_ids.update(updated)
+
+    return [row for row in rows if row.id in marked_ids]
+
+
+def _queue_batch(db: Session, rows: list) -> tuple[int, int]:
+    """
+    Mark and queue a batch of notifications; the caller commits.
+
+    Returns:
+        (queued, skipped) - skipped rows were already marked by another job
+    """
+    marked = _mark_sent(db, rows)
+    urls = result_short_urls(db, [row.id for row in marked]) if marked else {}
+    for row in marked:
+        queue_result_notification_sms(
+            db,
+            phone=row.phone_number,
+            result_category=row.result_category,
+            booking_reference=row.booking_reference,
+            participant_name=row.name,
+            result_id=row.id,
+            result_url=urls[row.id]
+        )
+    return len(marked), len(rows) - len(marked)
+
+
+def run_job(job_id, rows: list) -> None:
+    """
+    Queue all notifications for a job, one transaction per batch.
+    A batch that fails is rolled back and counted as failed; the job goes on
+    with the next one. Delivery (priority, rate limits, retries) is up to the
+    SMS queue workers.
+    Runs as a background task with its own DB session.
+    """
+    db = SessionLocal()
+    processed = 0
+    try:
+        _update_job(db, job_id, status="running")
+        db.commit()
+
+        batch_size = settings.SMS_DISPATCH_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                queued, skipped = _queue_batch(db, batch)
+                # Progress is committed with the batch it counts
+                _update_job(
+                    db,
+                    job_id,
+                    queued=ResultSMSJob.queued + queued,
+                    skipped=ResultSMSJob.skipped + skipped
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Result SMS job {job_id}: batch of {len(batch)} failed: {e}")
+                _update_job(db, job_id, failed=ResultSMSJob.failed + len(batch))
+                db.commit()
+            processed += len(batch)
+
+        _update_job(db, job_id, status="completed", finished_at=datetime.utcnow())
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Result SMS job {job_id} failed: {e}")
+        # Rows the job never got to count as failed
+        _update_job(
+            db,
+            job_id,
+            status="failed",
+            failed=ResultSMSJob.failed + len(rows) - processed,
+            finished_at=datetime.utcnow()
+        )
+        db.commit()
+    finally:
+        db.close()
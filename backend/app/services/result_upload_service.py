@@ -0,0 +1,352 @@
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import BinaryIO, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Booking, TestResult
+from app.services.file_upload_service import file_upload_service, StoredResultFile
+from app.services.storage_service import get_result_storage, sha256_of_file
+from app.services.pdf_pipeline import InvalidPDFError, preprocess_pdf, cleanup_outputs
+
+logger = logging.getLogger(__name__)
+
+# Read size for streaming uploads to the spool file
+SPOOL_CHUNK_BYTES = 64 * 1024
+
+# Managed pool for storage uploads, so request handlers never wait on Cloudinary
+_executor = ThreadPoolExecutor(
+    max_workers=settings.RESULT_UPLOAD_WORKERS,
+    thread_name_prefix="result-upload"
+)
+
+
+def _spool_path(result_id) -> str:
+    return os.path.join(settings.RESULT_SPOOL_DIR, f"{result_id}.pdf")
+
+
+def spool_result_file(result_id, source: BinaryIO) -> tuple[str, int]:
+    """
+    Stream an uploaded PDF to the local spool directory in chunks,
+    hashing it on the way and enforcing RESULT_MAX_FILE_BYTES.
+
+    Returns:
+        (sha256 hex digest, size in bytes)
+
+    Raises:
+        HTTPException: 400 if the file isn't a PDF, 413 if it is larger than the limit
+    """
+    os.makedirs(settings.RESULT_SPOOL_DIR, exist_ok=True)
+    path = _spool_path(result_id)
+    hasher = hashlib.sha256()
+    size = 0
+    is_pdf = False
+
+    with open(path, "wb") as destination:
+        while True:
+            chunk = source.read(SPOOL_CHUNK_BYTES)
+            if not chunk:
+                break
+            if size == 0:
+                is_pdf = chunk.startswith(b"%PDF-")
+                if not is_pdf:
+                    break
+            size += len(chunk)
+            if size > settings.RESULT_MAX_FILE_BYTES:
+                break
+            hasher.update(chunk)
+            destination.write(chunk)
+
+    if not is_pdf:
+        discard_spooled_file(result_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a PDF"
+        )
+
+    if size > settings.RESULT_MAX_FILE_BYTES:
+        discard_spooled_file(result_id)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {settings.RESULT_MAX_FILE_BYTES // (1024 * 1024)} MB limit"
+        )
+
+    return hasher.hexdigest(), size
+
+
+def discard_spooled_file(result_id) -> None:
+    """Remove a spooled file that will never be uploaded"""
+    try:
+        os.remove(_spool_path(result_id))
+    except FileNotFoundError:
+        pass
+
+
+def _find_uploaded(sha256: str) -> Optional[tuple[StoredResultFile, Optional[StoredResultFile]]]:
+    """An already-uploaded result with this content hash, from the database rather than storage"""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(
+                TestResult.public_id,
+                TestResult.result_file_url,
+                TestResult.stored_file_size,
+                TestResult.thumbnail_public_id,
+                TestResult.thumbnail_file_size,
+            )
+            .filter(
+                TestResult.file_sha256 == sha256,
+                TestResult.upload_status == "uploaded",
+                TestResult.public_id.isnot(None)
+            )
+            .first()
+        )
+    finally:
+        db.close()
+    if not row:
+        return None
+
+    storage = get_result_storage()
+    # Rows stored before sizes were recorded are measured once here
+    stored = StoredResultFile(
+        row.public_id,
+        row.result_file_url,
+        row.stored_file_size if row.stored_file_size is not None else storage.object_size(row.public_id)
+    )
+    thumbnail = None
+    if row.thumbnail_public_id:
+        thumbnail = StoredResultFile(
+            row.thumbnail_public_id,
+            storage.url_for(row.thumbnail_public_id),
+            row.thumbnail_file_size if row.thumbnail_file_size is not None else storage.object_size(row.thumbnail_public_id)
+        )
+    return stored, thumbnail
+
+
+def store_result_file(
+    path: str,
+    sha256: Optional[str],
+    booking_id: str,
+    filename: str
+) -> tuple[StoredResultFile, Optional[StoredResultFile]]:
+    """
+    Store a result PDF from local disk, running the preprocessing pipeline
+    first when enabled. Identical PDFs are stored once, so duplicates skip
+    preprocessing and storage entirely.
+
+    Returns:
+        (stored file, stored thumbnail or None)
+
+    Raises:
+        InvalidPDFError: If preprocessing rejects the file
+    """
+    existing = _find_uploaded(sha256) if sha256 else None
+    if existing:
+        return existing
+
+    processed = None
+    try:
+        upload_path = path
+        if settings.PDF_PIPELINE_ENABLED:
+            processed = preprocess_pdf(path)
+            upload_path = processed.pdf_path
+
+        stored = file_upload_service.upload_result_file(
+            file_path=upload_path,
+            booking_id=booking_id,
+            filename=filename,
+            sha256=sha256 or sha256_of_file(path)
+        )
+
+        thumbnail = None
+        if processed and processed.thumbnail_path:
+            thumbnail = file_upload_service.upload_thumbnail(
+                processed.thumbnail_path,
+                stored.public_id
+            )
+        return stored, thumbnail
+    finally:
+        if processed:
+            cleanup_outputs(path, processed)
+
+
+def _store_with_retries(path: str, sha256: Optional[str], booking_id: str, filename: str):
+    """store_result_file, retrying storage errors with exponential backoff"""
+    attempt = 1
+    while True:
+        try:
+            return store_result_file(path, sha256=sha256, booking_id=booking_id, filename=filename)
+        except InvalidPDFError:
+            raise
+        except Exception as e:
+            if attempt >= settings.RESULT_UPLOAD_MAX_ATTEMPTS:
+                raise
+            delay = settings.RESULT_UPLOAD_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"Result upload attempt {attempt} failed, retrying in {delay:.0f}s: {e}")
+            time.sleep(delay)
+            attempt += 1
+
+
+def _claimable(now: datetime):
+    """Rows waiting for an upload job: pending, or claimed by a job that has died"""
+    return or_(
+        TestResult.upload_status == "pending",
+        and_(
+            TestResult.upload_status == "uploading",
+            TestResult.upload_claimed_at < now - timedelta(seconds=settings.RESULT_UPLOAD_LEASE_SECONDS)
+        )
+    )
+
+
+def _claim_upload(result_id) -> Optional[tuple[datetime, Optional[str]]]:
+    """
+    Mark the row 'uploading' and commit, so no other job takes it.
+
+    Returns:
+        (claim time, file hash), or None if the row isn't waiting for an upload
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            update(TestResult)
+            .where(TestResult.id == result_id, _claimable(now))
+            .values(upload_status="uploading", upload_claimed_at=now)
+            .returning(TestResult.file_sha256)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            exists = db.query(TestResult.id).filter(TestResult.id == result_id).first()
+            db.rollback()
+            if not exists:
+                discard_spooled_file(result_id)
+            return None
+        db.commit()
+        return now, row.file_sha256
+    finally:
+        db.close()
+
+
+def _settle_upload(result_id, claimed_at: datetime, **values) -> None:
+    """Record the outcome, if the claim is still ours, and drop the participant's cached results"""
+    # Imported here: result_service imports this module
+    from app.services.result_service import invalidate_participant_results
+
+    db = SessionLocal()
+    try:
+        booking_id = db.execute(
+            update(TestResult)
+            .where(
+                TestResult.id == result_id,
+                TestResult.upload_status == "uploading",
+                TestResult.upload_claimed_at == claimed_at
+            )
+            .values(**values)
+            .returning(TestResult.booking_id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        db.commit()
+        participant_id = None
+        if booking_id is not None:
+            participant_id = db.query(Booking.participant_id).filter(Booking.id == booking_id).scalar()
+    finally:
+        db.close()
+
+    if participant_id is not None:
+        invalidate_participant_results(participant_id)
+
+
+def _upload_spooled_result(result_id, booking_id: str, filename: str) -> None:
+    """
+    Upload a spooled PDF to storage and record the outcome on the result row.
+    The row is claimed ('uploading') in its own short transaction, so no
+    lock or connection is held during the upload, and a duplicate job for it
+    (e.g. from another worker's resume_pending_uploads) does nothing.
+    """
+    claim = _claim_upload(result_id)
+    if claim is None:
+        return
+    claimed_at, sha256 = claim
+
+    try:
+        stored, thumbnail = _store_with_retries(
+            _spool_path(result_id),
+            sha256=sha256,
+            booking_id=booking_id,
+            filename=filename
+        )
+    except Exception as e:
+        if not isinstance(e, InvalidPDFError):
+            logger.error(f"Result upload failed for {result_id}: {e}")
+        # Terminal: the admin can upload the result again (see upload_result)
+        _settle_upload(result_id, claimed_at, upload_status="failed", upload_error=str(e))
+        discard_spooled_file(result_id)
+        return
+
+    _settle_upload(
+        result_id,
+        claimed_at,
+        result_file_url=stored.url,
+        public_id=stored.public_id,
+        stored_file_size=stored.size,
+        thumbnail_public_id=thumbnail.public_id if thumbnail else None,
+        thumbnail_file_size=thumbnail.size if thumbnail else None,
+        upload_status="uploaded",
+        upload_error=None
+    )
+    discard_spooled_file(result_id)
+
+
+def enqueue_result_upload(result_id, booking_id: str, filename: str) -> None:
+    """Schedule a spooled result file for upload on the managed pool"""
+    _executor.submit(_upload_spooled_result, result_id, str(booking_id), filename)
+
+
+def resume_pending_uploads() -> int:
+    """
+    Re-queue uploads that were pending when the process last stopped, and
+    uploads whose job died mid-way ('uploading' past RESULT_UPLOAD_LEASE_SECONDS).
+    Rows whose spooled file is gone are marked failed. Runs in every worker
+    at startup; a row re-queued twice is only uploaded once (see _claim_upload).
+
+    Returns:
+        Number of re-queued uploads
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        rows = db.query(TestResult.id, TestResult.booking_id).filter(_claimable(now)).all()
+
+        requeue = []
+        missing = []
+        for row in rows:
+            if os.path.exists(_spool_path(row.id)):
+                requeue.append(row)
+            else:
+                missing.append(row.id)
+
+        if missing:
+            db.execute(
+                update(TestResult)
+                .where(TestResult.id.in_(missing), _claimable(now))
+                .values(upload_status="failed", upload_error="Spooled file missing after restart")
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    for row in requeue:
+        enqueue_result_upload(row.id, row.booking_id, "result.pdf")
+    return len(requeue)
+
+
+def shutdown_upload_pool() -> None:
+    """Let in-flight uploads finish before the process exits"""
+    _executor.shutdown(wait=True)
@@ -0,0 +1,236 @@
+import logging
+import secrets
+import string
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ShortLink
+from app.utils.cache import TTLCache
+from app.utils.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# Result SMS link to {SHORT_LINK_BASE_URL}/{code} instead of the full result
+# page URL, which saves most of a line in every message. Redirects are served
+# from a per-process cache; clicks are counted in memory and added to
+# short_links in one UPDATE every SHORT_LINK_CLICK_FLUSH_SECONDS.
+
+CODE_ALPHABET = string.ascii_letters + string.digits
+MAX_CODE_ATTEMPTS = 5
+
+short_link_redirects_total = counter(
+    "short_link_redirects_total",
+    "Short link lookups",
+    ["outcome"]  # 'hit' (cache), 'miss' (database), 'not_found'
+)
+short_link_pending_clicks = gauge("short_link_pending_clicks", "Clicks waiting to be written")
+
+# code -> target URL, or None for unknown codes (cached briefly)
+_target_cache = TTLCache(
+    max_entries=settings.SHORT_LINK_CACHE_SIZE,
+    ttl_seconds=settings.SHORT_LINK_CACHE_TTL_SECONDS
+)
+NOT_FOUND_TTL_SECONDS = 60
+NOT_CACHED = object()
+
+
+def generate_code(length: Optional[int] = None) -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(length or settings.SHORT_LINK_CODE_LENGTH))
+
+
+def short_url(code: str) -> str:
+    base_url = settings.SHORT_LINK_BASE_URL or f"{settings.PUBLIC_API_URL.rstrip('/')}/r"
+    return f"{base_url.rstrip('/')}/{code}"
+
+
+def result_page_url(result_id) -> str:
+    return settings.RESULT_PAGE_URL.format(result_id=result_id)
+
+
+# CREATION
+def result_short_urls(db: Session, result_ids: list) -> dict:
+    """
+    Short URLs for a batch of results, creating the missing links with one
+    INSERT (in the caller's transaction). Existing links are reused.
+
+    Returns:
+        {result_id: short URL}
+    """
+    codes = dict(db.execute(
+        select(ShortLink.result_id, ShortLink.code).where(ShortLink.result_id.in_(result_ids))
+    ).all())
+
+    missing = [result_id for result_id in dict.fromkeys(result_ids) if result_id not in codes]
+    for _ in range(MAX_CODE_ATTEMPTS):
+        if not missing:
+            break
+        created_at = datetime.utcnow()
+        # Code collisions and links added concurrently for the same result are
+        # both skipped here; the next pass picks them up
+        inserted = db.execute(
+            pg_insert(ShortLink)
+            .values([
+                {
+                    "code": generate_code(),
+                    "target_url": result_page_url(result_id),
+                    "result_id": result_id,
+                    "click_count": 0,
+                    "created_at": created_at,
+                }
+                for result_id in missing
+            ])
+            .on_conflict_do_nothing()
+            .returning(ShortLink.result_id, ShortLink.code)
+        ).all()
+        codes.update(inserted)
+
+        missing = [result_id for result_id in missing if result_id not in codes]
+        if missing:
+            codes.update(db.execute(
+                select(ShortLink.result_id, ShortLink.code).where(ShortLink.result_id.in_(missing))
+            ).all())
+            missing = [result_id for result_id in missing if result_id not in codes]
+
+    if missing:
+        raise RuntimeError("Could not allocate unique short link codes")
+    return {result_id: short_url(code) for result_id, code in codes.items()}
+
+
+def result_short_url(db: Session, result_id) -> str:
+    return result_short_urls(db, [result_id])[result_id]
+
+
+# REDIRECTS
+def cached_target(code: str):
+    """Target URL from the cache: a URL, None for a known-bad code, or NOT_CACHED"""
+    target = _target_cache.get(code, NOT_CACHED)
+    if target is not NOT_CACHED:
+        short_link_redirects_total.inc(outcome="hit" if target else "not_found")
+    return target
+
+
+def load_target(code: str) -> Optional[str]:
+    """Look a code up in the database and cache the answer. Opens its own session."""
+    db = SessionLocal()
+    try:
+        target = db.execute(select(ShortLink.target_url).where(ShortLink.code == code)).scalar()
+    finally:
+        db.close()
+
+    if target is None:
+        _target_cache.set(code, None, ttl_seconds=NOT_FOUND_TTL_SECONDS)
+        short_link_redirects_total.inc(outcome="not_found")
+    else:
+        _target_cache.set(code, target)
+        short_link_redirects_total.inc(outcome="miss")
+    return target
+
+
+# CLICK COUNTING
+class ClickCounter:
+    """Clicks per code since the last flush"""
+
+    def __init__(self):
+        self.pending: Counter = Counter()
+        self.last_clicked_at: dict[str, datetime] = {}
+        self.lock = threading.Lock()
+
+    def add(self, code: str) -> None:
+        with self.lock:
+            self.pending[code] += 1
+            self.last_clicked_at[code] = datetime.utcnow()
+            size = len(self.pending)
+        short_link_pending_clicks.set(size)
+
+    def drain(self) -> tuple[Counter, dict]:
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            last_clicked_at, self.last_clicked_at = self.last_clicked_at, {}
+        short_link_pending_clicks.set(0)
+        return pending, last_clicked_at
+
+    def restore(self, pending: Counter, last_clicked_at: dict) -> None:
+        """Put back the clicks of a failed flush"""
+        with self.lock:
+            self.pending.update(pending)
+            for code, clicked_at in last_clicked_at.items():
+                if code not in self.last_clicked_at or self.last_clicked_at[code] < clicked_at:
+                    self.last_clicked_at[code] = clicked_at
+            size = len(self.pending)
+        short_link_pending_clicks.set(size)
+
+
+click_counter = ClickCounter()
+
+
+def flush_clicks() -> int:
+    """Add the buffered clicks to short_links in one UPDATE. Returns codes updated."""
+    pending, last_clicked_at = click_counter.drain()
+    if not pending:
+        return 0
+
+    codes = list(pending)
+    db = SessionLocal()
+    try:
+        db.execute(text("""
+            UPDATE short_links s
+            SET click_count = s.click_count + c.clicks,
+                last_clicked_at = GREATEST(s.last_clicked_at, c.clicked_at)
+            FROM unnest(CAST(:codes AS text[]), CAST(:clicks AS integer[]), CAST(:clicked_at AS timestamp[]))
+                AS c(code, clicks, clicked_at)
+            WHERE s.code = c.code
+        """), {
+            "codes": codes,
+            "clicks": [pending[code] for code in codes],
+            "clicked_at": [last_clicked_at[code] for code in codes],
+        })
+        db.commit()
+    except Exception:
+        db.rollback()
+        click_counter.restore(pending, last_clicked_at)
+        raise
+    finally:
+        db.close()
+    return len(codes)
+
+
+# SCHEDULING
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _flush_loop() -> None:
+    while not _stop.wait(settings.SHORT_LINK_CLICK_FLUSH_SECONDS):
+        try:
+            flush_clicks()
+        except Exception:
+            logger.exception("Failed to write short link clicks")
+
+
+def start_click_flusher() -> None:
+    """Write buffered clicks every SHORT_LINK_CLICK_FLUSH_SECONDS"""
+    global _thread
+    if _thread is None:
+        _stop.clear()
+        _thread = threading.Thread(target=_flush_loop, name="short-link-clicks", daemon=True)
+        _thread.start()
+
+
+def stop_click_flusher() -> None:
+    """Stop the flusher and write what's left"""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
+    try:
+        flush_clicks()
+    except Exception:
+        logger.exception("Failed to write short link clicks on shutdown")
@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import threading
+from typing import Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+
+class SMSSendError(Exception):
+    """The provider rejected a message or couldn't be reached"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class SMSClient:
+    """
+    Client for the provider's Messages API (Twilio's REST format), shared by
+    the whole process so HTTP connections are kept alive and reused.
+
+    The sync path uses a pooled requests.Session; the async path uses an
+    aiohttp session per event loop. `base_url` can point at a local fake
+    provider (see benchmarks/fake_sms_provider.py).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        account_sid: str,
+        auth_token: str,
+        from_number: str,
+        pool_size: int = 10,
+        timeout_seconds: float = 10.0,
+        status_callback: Optional[str] = None
+    ):
+        self.messages_url = f"{base_url.rstrip('/')}/2010-04-01/Accounts/{account_sid}/Messages.json"
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.status_callback = status_callback
+
+        self.session = requests.Session()
+        self.session.auth = (account_sid, auth_token)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._async_sessions: dict = {}
+        self._async_lock = threading.Lock()
+
+    def _form(self, to: str, body: str) -> dict:
+        form = {"To": to, "From": self.from_number, "Body": body}
+        if self.status_callback:
+            form["StatusCallback"] = self.status_callback
+        return form
+
+    @staticmethod
+    def _result(status_code: int, payload: dict) -> str:
+        if status_code >= 400:
+            raise SMSSendError(
+                payload.get("message") or f"Provider returned HTTP {status_code}",
+                status_code=status_code,
+                retryable=_is_retryable(status_code)
+            )
+        return payload["sid"]
+
+    def send(self, to: str, body: str) -> str:
+        """
+        Send one message, returning the provider's message SID
+
+        Raises:
+            SMSSendError: If the provider rejects the message or can't be reached
+        """
+        try:
+            response = self.session.post(self.messages_url, data=self._form(to, body), timeout=self.timeout_seconds)
+            payload = response.json() if response.content else {}
+        except (requests.RequestException, ValueError) as e:
+            raise SMSSendError(str(e), retryable=True)
+        return self._result(response.status_code, payload)
+
+    def _async_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            session = self._async_sessions.get(loop)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    auth=aiohttp.BasicAuth(self.account_sid, self.auth_token),
+                    connector=aiohttp.TCPConnector(limit=self.pool_size),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+                )
+                self._async_sessions[loop] = session
+            return session
+
+    async def send_async(self, to: str, body: str) -> str:
+        """
+        Send one message without blocking the event loop
+
+        Raises:
+            SMSSendError: If the provider rejects the message or can't be reached
+        """
+        try:
+            async with self._async_session().post(self.messages_url, data=self._form(to, body)) as response:
+                payload = await response.json(content_type=None) if response.content_length != 0 else {}
+                status_code = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise SMSSendError(str(e) or type(e).__name__, retryable=True)
+        return self._result(status_code, payload or {})
+
+    async def aclose(self) -> None:
+        """Close the async session for the running loop"""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            session = self._async_sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def status_callback_url() -> str:
+    """Where the provider posts delivery receipts (also the URL signatures are computed over)"""
+    return settings.SMS_STATUS_CALLBACK_URL or f"{settings.PUBLIC_API_URL.rstrip('/')}/sms/status-callback"
+
+
+def request_signature(auth_token: str, url: str, params: dict) -> str:
+    """
+    Signature the way Twilio computes it: HMAC-SHA1 over the URL followed by
+    each POST parameter name and value, sorted by name, base64 encoded.
+    """
+    payload = url + "".join(f"{name}{params[name]}" for name in sorted(params))
+    digest = hmac.new(auth_token.encode(), payload.encode(), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode()
+
+
+def valid_signature(auth_token: str, url: str, params: dict, signature: str) -> bool:
+    return hmac.compare_digest(request_signature(auth_token, url, params).encode(), (signature or "").encode())
+
+
+# Process-wide client, created on first live send
+_client: Optional[SMSClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sms_client() -> SMSClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SMSClient(
+                base_url=settings.SMS_PROVIDER_BASE_URL,
+                account_sid=settings.TWILIO_ACCOUNT_SID,
+                auth_token=settings.TWILIO_AUTH_TOKEN,
+                from_number=settings.TWILIO_PHONE_NUMBER,
+                pool_size=settings.SMS_HTTP_POOL_SIZE,
+                timeout_seconds=settings.SMS_HTTP_TIMEOUT_SECONDS,
+                status_callback=status_callback_url() if settings.SMS_STATUS_CALLBACK_ENABLED else None
+            )
+        return _client
+
+
+def close_sms_client() -> None:
+    if _client is not None:
+        _client.close()
+
+
+async def aclose_sms_client() -> None:
+    """Close the async session for the running loop, if one was opened"""
+    if _client is not None:
+        await _client.aclose()
@@ -0,0 +1,606 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import event, func, select, update, delete
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SMSMessage, SMSDeadLetter
+from app.services.sms_client import SMSSendError, aclose_sms_client
+from app.services.sms_receipts import record_result_sent, set_result_delivery_status, DELIVERY_FAILED
+from app.services.sms_service import (
+    DEFAULT_PROVIDER,
+    get_provider_rate_limiter,
+    get_sms_service,
+    build_otp_message,
+    build_booking_confirmation_message,
+    build_booking_cancellation_message,
+    build_result_notification_message,
+)
+from app.utils.metrics import counter, gauge, histogram
+from app.utils.logging_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+# Every SMS goes through the sms_queue table. Messages are queued in the
+# caller's transaction and sent by per-provider workers that claim one row at
+# a time with FOR UPDATE SKIP LOCKED, lowest priority number first, so OTPs
+# are never stuck behind a bulk result notification run.
+
+# Tries at recording an accepted send before settling it without its SID
+MARK_SENT_ATTEMPTS = 3
+
+# OTP bodies hold the code in plaintext; they are replaced with this once settled
+REDACTED_BODY = "[redacted]"
+
+PRIORITY_OTP = 0
+PRIORITY_BOOKING = 1
+PRIORITY_RESULT = 2
+
+KIND_PRIORITIES = {
+    "otp": PRIORITY_OTP,
+    "booking_confirmation": PRIORITY_BOOKING,
+    "booking_cancellation": PRIORITY_BOOKING,
+    "result_notification": PRIORITY_RESULT,
+}
+
+sms_queue_depth = gauge(
+    "sms_queue_depth",
+    "Messages waiting to be sent",
+    ["provider", "kind"]
+)
+sms_send_duration_seconds = histogram(
+    "sms_send_duration_seconds",
+    "Provider API call duration",
+    ["provider", "outcome"]
+)
+sms_queue_latency_seconds = histogram(
+    "sms_queue_latency_seconds",
+    "Time from queueing to acceptance by the provider",
+    ["kind"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+sms_sent_total = counter("sms_sent_total", "Messages accepted by the provider", ["provider", "kind"])
+sms_retries_total = counter("sms_retries_total", "Failed sends scheduled for retry", ["provider", "kind"])
+sms_dead_lettered_total = counter(
+    "sms_dead_lettered_total",
+    "Messages moved to sms_dead_letters",
+    ["provider", "kind", "reason"]
+)
+
+
+# QUEUEING
+def enqueue_sms(
+    db: Session,
+    phone_number: str,
+    body: str,
+    kind: str,
+    provider: str = DEFAULT_PROVIDER,
+    result_id: Optional[UUID] = None,
+    expires_at: Optional[datetime] = None
+) -> SMSMessage:
+    """
+    Queue a message in the caller's transaction.
+    Nothing is sent until the caller commits; workers are woken on commit.
+    """
+    now = datetime.utcnow()
+    message = SMSMessage(
+        kind=kind,
+        priority=KIND_PRIORITIES[kind],
+        provider=provider,
+        phone_number=phone_number,
+        body=body,
+        status="queued",
+        attempts=0,
+        next_attempt_at=now,
+        expires_at=expires_at,
+        result_id=result_id,
+        created_at=now
+    )
+    db.add(message)
+    db.info["sms_queued"] = True
+    return message
+
+
+def queue_otp_sms(db: Session, phone: str, otp_code: str, expires_at: datetime) -> Optional[SMSMessage]:
+    """
+    Queue an OTP; it is dropped rather than sent once the code has expired.
+    With a Redis or memory OTP store the code is kept out of Postgres: it is
+    sent from an in-process pool instead of through the sms_queue table.
+    """
+    body = build_otp_message(otp_code)
+    if settings.OTP_STORE_BACKEND != "sql":
+        _get_otp_executor().submit(_send_otp_directly, phone, body, expires_at)
+        return None
+    return enqueue_sms(db, phone, body, "otp", expires_at=expires_at)
+
+
+def queue_booking_confirmation_sms(db: Session, phone: str, booking_details: dict) -> SMSMessage:
+    return enqueue_sms(db, phone, build_booking_confirmation_message(booking_details), "booking_confirmation")
+
+
+def queue_booking_cancellation_sms(db: Session, phone: str, booking_ref: str) -> SMSMessage:
+    return enqueue_sms(db, phone, build_booking_cancellation_message(booking_ref), "booking_cancellation")
+
+
+def queue_result_notification_sms(
+    db: Session,
+    phone: str,
+    result_category: str,
+    booking_reference: str,
+    participant_name: str,
+    result_id: UUID,
+    result_url: Optional[str] = None
+) -> SMSMessage:
+    body = build_result_notification_message(result_category, booking_reference, participant_name, result_url)
+    return enqueue_sms(db, phone, body, "result_notification", result_id=result_id)
+
+
+# On Session rather than SessionLocal so commits through the async engine
+# (whose sessions wrap a plain Session) wake the workers too
+@event.listens_for(Session, "after_commit")
+def _wake_workers_after_commit(session):
+    if session.info.pop("sms_queued", False):
+        wake_sms_workers()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_messages(session):
+    session.info.pop("sms_queued", None)
+
+
+# CLAIMING AND SETTLING
+class ClaimedSMS(NamedTuple):
+    id: UUID
+    kind: str
+    provider: str
+    phone_number: str
+    body: str
+    attempts: int
+    expires_at: Optional[datetime]
+    result_id: Optional[UUID]
+    created_at: datetime
+
+
+def claim_next(db: Session, provider: str) -> Optional[ClaimedSMS]:
+    """
+    Claim the most urgent due message for a provider and commit the claim.
+    The claim is a lease: if the worker dies, the row is due again after
+    SMS_QUEUE_LEASE_SECONDS and another worker picks it up. A message whose
+    leases keep running out (e.g. it crashes the worker) is dead-lettered
+    once it has used SMS_QUEUE_MAX_ATTEMPTS.
+    """
+    while True:
+        message = _claim(db, provider)
+        if message is None or message.attempts <= settings.SMS_QUEUE_MAX_ATTEMPTS:
+            return message
+        dead_letter(db, message, f"Lease expired after {message.attempts - 1} attempts", "lease_expired")
+
+
+def _claim(db: Session, provider: str) -> Optional[ClaimedSMS]:
+    now = datetime.utcnow()
+    next_id = (
+        select(SMSMessage.id)
+        .where(
+            SMSMessage.provider == provider,
+            SMSMessage.status.in_(("queued", "sending")),
+            SMSMessage.next_attempt_at <= now
+        )
+        .order_by(SMSMessage.priority, SMSMessage.next_attempt_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        update(SMSMessage)
+        .where(SMSMessage.id == next_id)
+        .values(
+            status="sending",
+            attempts=SMSMessage.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.SMS_QUEUE_LEASE_SECONDS)
+        )
+        .returning(*(getattr(SMSMessage, field) for field in ClaimedSMS._fields))
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return ClaimedSMS(*row) if row else None
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped"""
+    delay = min(
+        settings.SMS_QUEUE_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.SMS_QUEUE_RETRY_MAX_SECONDS
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _settled_body(message: ClaimedSMS) -> str:
+    """Body to keep once a message is settled: OTP codes aren't kept"""
+    return REDACTED_BODY if message.kind == "otp" else message.body
+
+
+def mark_sent(db: Session, message: ClaimedSMS, provider_sid: Optional[str]) -> None:
+    """
+    Settle a message the provider accepted. Without a provider_sid the
+    message is settled but can't be matched to delivery receipts.
+    """
+    sent_at = datetime.utcnow()
+    db.execute(
+        update(SMSMessage)
+        .where(SMSMessage.id == message.id)
+        .values(
+            status="sent",
+            provider_sid=provider_sid,
+            sent_at=sent_at,
+            last_error=None,
+            body=_settled_body(message)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if message.result_id is not None and provider_sid is not None:
+        record_result_sent(db, message.result_id, provider_sid)
+    db.commit()
+
+    sms_sent_total.inc(provider=message.provider, kind=message.kind)
+    sms_queue_latency_seconds.observe((sent_at - message.created_at).total_seconds(), kind=message.kind)
+
+
+def schedule_retry(db: Session, message: ClaimedSMS, error: str) -> None:
+    # Only if our claim is still current (the lease may have run out)
+    db.execute(
+        update(SMSMessage)
+        .where(SMSMessage.id == message.id, SMSMessage.attempts == message.attempts)
+        .values(
+            status="queued",
+            next_attempt_at=datetime.utcnow() + timedelta(seconds=retry_delay(message.attempts)),
+            last_error=error
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    sms_retries_total.inc(provider=message.provider, kind=message.kind)
+
+
+def dead_letter(db: Session, message: ClaimedSMS, error: str, reason: str) -> None:
+    """Move a message out of the queue into sms_dead_letters"""
+    removed = db.execute(
+        delete(SMSMessage)
+        .where(SMSMessage.id == message.id, SMSMessage.attempts == message.attempts)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not removed:
+        # Reclaimed by another worker after our lease ran out; it settles the message
+        db.rollback()
+        return
+
+    db.add(SMSDeadLetter(
+        id=message.id,
+        kind=message.kind,
+        provider=message.provider,
+        phone_number=message.phone_number,
+        body=_settled_body(message),
+        attempts=message.attempts,
+        last_error=error,
+        result_id=message.result_id,
+        created_at=message.created_at,
+        failed_at=datetime.utcnow()
+    ))
+    if message.result_id is not None:
+        set_result_delivery_status(db, message.result_id, DELIVERY_FAILED)
+    db.commit()
+
+    sms_dead_lettered_total.inc(provider=message.provider, kind=message.kind, reason=reason)
+    logger.warning(f"SMS {message.id} ({message.kind}) dead-lettered after {message.attempts} attempts: {error}")
+
+
+def record_failure(db: Session, message: ClaimedSMS, error: SMSSendError) -> None:
+    """Retry transient failures with backoff; dead-letter the rest"""
+    if not error.retryable:
+        dead_letter(db, message, str(error), "rejected")
+    elif message.attempts >= settings.SMS_QUEUE_MAX_ATTEMPTS:
+        dead_letter(db, message, str(error), "max_attempts")
+    else:
+        schedule_retry(db, message, str(error))
+
+
+def queue_depth(db: Session, provider: str) -> dict[str, int]:
+    rows = db.execute(
+        select(SMSMessage.kind, func.count())
+        .where(SMSMessage.provider == provider, SMSMessage.status.in_(("queued", "sending")))
+        .group_by(SMSMessage.kind)
+    ).all()
+    return {kind: count for kind, count in rows}
+
+
+def purge_settled(db: Session, provider: str) -> tuple[int, int]:
+    """
+    Delete sent messages and dead letters past their retention period.
+
+    Returns:
+        (sent messages deleted, dead letters deleted)
+    """
+    now = datetime.utcnow()
+    sent = db.execute(
+        delete(SMSMessage)
+        .where(
+            SMSMessage.provider == provider,
+            SMSMessage.status == "sent",
+            SMSMessage.sent_at < now - timedelta(days=settings.SMS_QUEUE_RETENTION_DAYS)
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    dead = db.execute(
+        delete(SMSDeadLetter)
+        .where(
+            SMSDeadLetter.provider == provider,
+            SMSDeadLetter.failed_at < now - timedelta(days=settings.SMS_DEAD_LETTER_RETENTION_DAYS)
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return sent, dead
+
+
+def _in_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# DIRECT OTP SENDS
+# Used instead of the queue when OTPs live in Redis or memory, so the
+# plaintext code is never written to Postgres
+_otp_executor: Optional[ThreadPoolExecutor] = None
+_otp_executor_lock = threading.Lock()
+
+
+def _get_otp_executor() -> ThreadPoolExecutor:
+    global _otp_executor
+    with _otp_executor_lock:
+        if _otp_executor is None:
+            _otp_executor = ThreadPoolExecutor(
+                max_workers=settings.SMS_DISPATCH_CONCURRENCY,
+                thread_name_prefix="sms-otp"
+            )
+        return _otp_executor
+
+
+def _send_otp_directly(phone: str, body: str, expires_at: datetime) -> None:
+    """Send an OTP with the queue's retry policy, giving up once the code expires"""
+    service = get_sms_service(settings.SMS_MODE != "live")
+    limiter = get_provider_rate_limiter(DEFAULT_PROVIDER)
+    created_at = datetime.utcnow()
+    attempts = 0
+
+    while True:
+        attempts += 1
+        limiter.acquire()
+        started = time.perf_counter()
+        try:
+            sid = service.deliver(phone, body)
+        except SMSSendError as e:
+            sms_send_duration_seconds.observe(time.perf_counter() - started, provider=DEFAULT_PROVIDER, outcome="error")
+            delay = retry_delay(attempts)
+            if not e.retryable:
+                reason = "rejected"
+            elif attempts >= settings.SMS_QUEUE_MAX_ATTEMPTS:
+                reason = "max_attempts"
+            elif datetime.utcnow() + timedelta(seconds=delay) >= expires_at:
+                reason = "expired"
+            else:
+                sms_retries_total.inc(provider=DEFAULT_PROVIDER, kind="otp")
+                time.sleep(delay)
+                continue
+            sms_dead_lettered_total.inc(provider=DEFAULT_PROVIDER, kind="otp", reason=reason)
+            logger.error(f"Failed to send OTP SMS after {attempts} attempts: {e}", extra={"event": "sms_failed", "kind": "otp", "to": phone})
+            return
+        except Exception:
+            logger.exception("Failed to send OTP SMS")
+            return
+
+        sent_at = datetime.utcnow()
+        sms_send_duration_seconds.observe(time.perf_counter() - started, provider=DEFAULT_PROVIDER, outcome="sent")
+        sms_sent_total.inc(provider=DEFAULT_PROVIDER, kind="otp")
+        sms_queue_latency_seconds.observe((sent_at - created_at).total_seconds(), kind="otp")
+        logger.info("SMS sent", extra={"event": "sms_sent", "kind": "otp", "to": phone, "sid": sid})
+        return
+
+
+# WORKERS
+class SMSQueueWorker:
+    """
+    Sends one provider's queued messages from a background thread running its
+    own event loop, with SMS_DISPATCH_CONCURRENCY sends in flight. Database
+    calls run in the loop's default thread pool.
+    """
+
+    def __init__(self, provider: str, concurrency: int, mock: bool):
+        self.provider = provider
+        self.concurrency = concurrency
+        self.service = get_sms_service(mock, provider)
+        self.limiter = get_provider_rate_limiter(provider)
+        self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.stopping: Optional[asyncio.Event] = None
+        self.started = threading.Event()
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self._run, name=f"sms-{self.provider}", daemon=True)
+        self.thread.start()
+        self.started.wait(timeout=5)
+
+    def wake(self) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def stop(self, timeout: float = 10) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        asyncio.run(self._main())
+
+    async def _main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.started.set()
+
+        tasks = [asyncio.create_task(self._sender()) for _ in range(self.concurrency)]
+        tasks.append(asyncio.create_task(self._report_depth()))
+        tasks.append(asyncio.create_task(self._purge()))
+        try:
+            await self.stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await aclose_sms_client()
+            self.loop = None
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+    async def _sender(self) -> None:
+        while True:
+            try:
+                message = await asyncio.to_thread(_in_session, claim_next, self.provider)
+                if message is None:
+                    await self._idle(settings.SMS_QUEUE_POLL_SECONDS)
+                    continue
+                await self._send(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"SMS worker for {self.provider} failed")
+                await self._idle(settings.SMS_QUEUE_POLL_SECONDS)
+
+    async def _send(self, message: ClaimedSMS) -> None:
+        if message.expires_at is not None and message.expires_at <= datetime.utcnow():
+            await asyncio.to_thread(_in_session, dead_letter, message, "Expired before it could be sent", "expired")
+            return
+
+        # One token per message actually sent; idle polls and expired rows take none
+        await self.limiter.acquire_async()
+        started = time.perf_counter()
+        try:
+            sid = await self.service.deliver_async(message.phone_number, message.body)
+        except SMSSendError as e:
+            sms_send_duration_seconds.observe(time.perf_counter() - started, provider=self.provider, outcome="error")
+            logger.error(
+                f"Failed to send SMS {message.id}: {e}",
+                extra={"event": "sms_failed", "kind": message.kind, "to": message.phone_number}
+            )
+            await asyncio.to_thread(_in_session, record_failure, message, e)
+            return
+
+        sms_send_duration_seconds.observe(time.perf_counter() - started, provider=self.provider, outcome="sent")
+        await self._settle_sent(message, sid)
+        logger.info("SMS sent", extra={"event": "sms_sent", "kind": message.kind, "to": message.phone_number, "sid": sid})
+
+    async def _settle_sent(self, message: ClaimedSMS, sid: str) -> None:
+        """
+        Record a send the provider accepted. A row left 'sending' would be
+        sent again when its lease runs out, so failures are retried, and as
+        a last resort the row is settled without its SID.
+        """
+        for attempt in range(MARK_SENT_ATTEMPTS):
+            try:
+                await asyncio.to_thread(_in_session, mark_sent, message, sid)
+                return
+            except Exception:
+                logger.exception(f"Failed to mark SMS {message.id} as sent (attempt {attempt + 1})")
+                await asyncio.sleep(2 ** attempt)
+        try:
+            await asyncio.to_thread(_in_session, mark_sent, message, None)
+        except Exception:
+            logger.exception(f"SMS {message.id} was sent but couldn't be settled; it may be sent again")
+
+    async def _report_depth(self) -> None:
+        while True:
+            try:
+                depth = await asyncio.to_thread(_in_session, queue_depth, self.provider)
+                for kind in KIND_PRIORITIES:
+                    sms_queue_depth.set(depth.get(kind, 0), provider=self.provider, kind=kind)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to read SMS queue depth")
+            await asyncio.sleep(settings.SMS_QUEUE_METRICS_INTERVAL_SECONDS)
+
+
+    async def _purge(self) -> None:
+        while True:
+            try:
+                sent, dead = await asyncio.to_thread(_in_session, purge_settled, self.provider)
+                if sent or dead:
+                    logger.info(f"Purged {sent} sent SMS and {dead} dead letters for {self.provider}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to purge settled SMS")
+            await asyncio.sleep(settings.SMS_QUEUE_PURGE_INTERVAL_SECONDS)
+
+
+_workers: dict[str, SMSQueueWorker] = {}
+
+
+def queue_providers() -> list[str]:
+    return sorted({DEFAULT_PROVIDER, *settings.SMS_PROVIDER_RATE_LIMITS})
+
+
+def start_sms_workers() -> None:
+    """Start one worker per provider (safe to run in every API process)"""
+    mock = settings.SMS_MODE != "live"
+    for provider in queue_providers():
+        if provider not in _workers:
+            worker = _workers[provider] = SMSQueueWorker(provider, settings.SMS_DISPATCH_CONCURRENCY, mock)
+            worker.start()
+
+
+def stop_sms_workers() -> None:
+    global _otp_executor
+    for worker in _workers.values():
+        worker.stop()
+    _workers.clear()
+    with _otp_executor_lock:
+        if _otp_executor is not None:
+            _otp_executor.shutdown(wait=True)
+            _otp_executor = None
+
+
+def wake_sms_workers() -> None:
+    """Tell this process's workers new messages are committed (others find them by polling)"""
+    for worker in list(_workers.values()):
+        worker.wake()
+
+
+if __name__ == "__main__":
+    # Dedicated worker process: python -m app.services.sms_queue
+    setup_logging()
+    start_sms_workers()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop_sms_workers()
+        shutdown_logging()
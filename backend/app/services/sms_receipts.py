@@ -0,0 +1,307 @@
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SMSDeliveryReceipt
+from app.services.stats_service import record_sms_delivery_change
+from app.utils.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+# Delivery receipts (status callbacks) are buffered in memory per process and
+# written in batches: one upsert into sms_delivery_receipts, then one UPDATE
+# carrying the outcome over to test_results. Receipts still in the buffer
+# when a process dies are lost; the provider's own logs remain the record.
+
+# Provider status -> delivery status kept on test_results
+DELIVERED_STATUSES = ("delivered", "read")
+FAILED_STATUSES = ("undelivered", "failed", "canceled")
+FINAL_STATUSES = DELIVERED_STATUSES + FAILED_STATUSES
+
+DELIVERY_SENT = "sent"
+DELIVERY_DELIVERED = "delivered"
+DELIVERY_FAILED = "failed"
+
+sms_delivery_receipts_total = counter(
+    "sms_delivery_receipts_total",
+    "Delivery receipts accepted by the status callback",
+    ["status"]
+)
+sms_receipts_unmatched_total = counter(
+    "sms_receipts_unmatched_total",
+    "Delivery receipts matching no queued message or result when written"
+)
+sms_receipt_buffer_size = gauge("sms_receipt_buffer_size", "Delivery receipts waiting to be written")
+sms_receipt_flush_seconds = histogram("sms_receipt_flush_seconds", "Time to write one batch of delivery receipts")
+
+
+def delivery_status(provider_status: str) -> str:
+    if provider_status in DELIVERED_STATUSES:
+        return DELIVERY_DELIVERED
+    if provider_status in FAILED_STATUSES:
+        return DELIVERY_FAILED
+    return DELIVERY_SENT
+
+
+class Receipt(NamedTuple):
+    status: str
+    error_code: Optional[str]
+    received_at: datetime
+
+
+class ReceiptBuffer:
+    """
+    Latest receipt per message SID, waiting to be flushed.
+    A final status is never replaced by an earlier one arriving late.
+    """
+
+    def __init__(self, max_size: int, flush_size: int):
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.pending: dict[str, Receipt] = {}
+        self.lock = threading.Lock()
+        self.flush_wanted = threading.Event()
+
+    def _merge(self, sid: str, receipt: Receipt) -> None:
+        existing = self.pending.get(sid)
+        if existing is None or existing.status not in FINAL_STATUSES or receipt.status in FINAL_STATUSES:
+            self.pending[sid] = receipt
+
+    def add(self, sid: str, status: str, error_code: Optional[str] = None) -> bool:
+        """Buffer a receipt; False if the buffer is full (the caller should answer 503)"""
+        with self.lock:
+            if sid not in self.pending and len(self.pending) >= self.max_size:
+                return False
+            self._merge(sid, Receipt(status, error_code, datetime.utcnow()))
+            size = len(self.pending)
+        sms_receipt_buffer_size.set(size)
+        if size >= self.flush_size:
+            self.flush_wanted.set()
+        return True
+
+    def drain(self) -> dict[str, Receipt]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        sms_receipt_buffer_size.set(0)
+        return pending
+
+    def restore(self, receipts: dict[str, Receipt]) -> None:
+        """Put back receipts from a failed flush, without overriding newer ones"""
+        with self.lock:
+            for sid, receipt in receipts.items():
+                if sid not in self.pending:
+                    self.pending[sid] = receipt
+            size = len(self.pending)
+        sms_receipt_buffer_size.set(size)
+
+
+receipt_buffer = ReceiptBuffer(settings.SMS_RECEIPT_BUFFER_MAX, settings.SMS_RECEIPT_BATCH_SIZE)
+
+
+# WRITES
+def _record_changes(db: Session, rows) -> None:
+    """Move rollup counts for results whose delivery status changed"""
+    changes = Counter((row.event_id, row.old_status, row.new_status) for row in rows)
+    for (event_id, old_status, new_status), count in changes.items():
+        record_sms_delivery_change(db, event_id, old_status, new_status, count=count)
+
+
+def apply_receipts_to_results(db: Session, sids: list[str]) -> int:
+    """
+    Carry receipts over to the results they notified, matched on the SID
+    stored on the result (sms_queue rows are purged after a few days).
+    Results already at a final status aren't moved back to 'sent'.
+
+    Returns:
+        Number of results whose delivery status changed
+    """
+    rows = db.execute(text("""
+        UPDATE test_results t
+        SET sms_delivery_status = c.new_status,
+            sms_delivered_at = CASE WHEN c.new_status = :delivered THEN c.received_at ELSE t.sms_delivered_at END
+        FROM (
+            SELECT r.id, r.sms_delivery_status AS old_status, b.event_id, rc.received_at,
+                   CASE
+                       WHEN rc.status = ANY(:delivered_statuses) THEN :delivered
+                       WHEN rc.status = ANY(:failed_statuses) THEN :failed
+                       ELSE :sent
+                   END AS new_status
+            FROM sms_delivery_receipts rc
+            JOIN test_results r ON r.sms_provider_sid = rc.provider_sid
+            JOIN bookings b ON b.id = r.booking_id
+            WHERE rc.provider_sid = ANY(:sids)
+            FOR UPDATE OF r
+        ) c
+        WHERE t.id = c.id
+          AND t.sms_delivery_status IS DISTINCT FROM c.new_status
+          AND NOT (c.new_status = :sent AND t.sms_delivery_status IN (:delivered, :failed))
+        RETURNING c.event_id, c.old_status, c.new_status
+    """), {
+        "sids": sids,
+        "delivered_statuses": list(DELIVERED_STATUSES),
+        "failed_statuses": list(FAILED_STATUSES),
+        "delivered": DELIVERY_DELIVERED,
+        "failed": DELIVERY_FAILED,
+        "sent": DELIVERY_SENT,
+    }).all()
+
+    _record_changes(db, rows)
+    return len(rows)
+
+
+def set_result_delivery_status(db: Session, result_id, status: str) -> None:
+    """Set one result's delivery status (e.g. 'failed' when its SMS is dead-lettered)"""
+    rows = db.execute(text("""
+        UPDATE test_results t
+        SET sms_delivery_status = :status
+        FROM (
+            SELECT r.id, r.sms_delivery_status AS old_status, b.event_id
+            FROM test_results r
+            JOIN bookings b ON b.id = r.booking_id
+            WHERE r.id = :result_id
+            FOR UPDATE OF r
+        ) c
+        WHERE t.id = c.id AND t.sms_delivery_status IS DISTINCT FROM :status
+        RETURNING c.event_id, c.old_status, t.sms_delivery_status AS new_status
+    """), {"result_id": result_id, "status": status}).all()
+    _record_changes(db, rows)
+
+
+def record_result_sent(db: Session, result_id, provider_sid: str) -> None:
+    """
+    The result's SMS was accepted by the provider: stamp sms_sent_at, keep
+    the SID for later receipts, and apply any receipt that already arrived
+    for it, otherwise mark it 'sent'.
+    """
+    db.execute(text("""
+        UPDATE test_results
+        SET sms_sent_at = COALESCE(sms_sent_at, :now),
+            sms_provider_sid = :provider_sid
+        WHERE id = :result_id
+    """), {"result_id": result_id, "now": datetime.utcnow(), "provider_sid": provider_sid})
+    apply_receipts_to_results(db, [provider_sid])
+    db.execute(text("""
+        UPDATE test_results
+        SET sms_delivery_status = COALESCE(sms_delivery_status, :sent)
+        WHERE id = :result_id
+    """), {"result_id": result_id, "sent": DELIVERY_SENT})
+
+
+def count_unmatched(db: Session, sids: list[str]) -> int:
+    """
+    Receipts that match no queued message and no result: sent rows purged
+    before a late callback, or (briefly) a receipt that beat the worker's
+    settle, which record_result_sent applies when it lands.
+    """
+    return db.execute(text("""
+        SELECT count(*)
+        FROM unnest(CAST(:sids AS text[])) AS s(sid)
+        WHERE NOT EXISTS (SELECT 1 FROM sms_queue q WHERE q.provider_sid = s.sid)
+          AND NOT EXISTS (SELECT 1 FROM test_results r WHERE r.sms_provider_sid = s.sid)
+    """), {"sids": sids}).scalar()
+
+
+def flush_receipts(db: Session, receipts: dict[str, Receipt]) -> None:
+    """Upsert a batch of receipts and update the affected results, in one transaction"""
+    table = SMSDeliveryReceipt.__table__
+    stmt = pg_insert(table).values([
+        {
+            "provider_sid": sid,
+            "status": receipt.status,
+            "error_code": receipt.error_code,
+            "received_at": receipt.received_at,
+        }
+        for sid, receipt in receipts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.provider_sid],
+        set_={
+            "status": stmt.excluded.status,
+            "error_code": stmt.excluded.error_code,
+            "received_at": stmt.excluded.received_at,
+        },
+        # A late 'sent' must not overwrite 'delivered'
+        where=table.c.status.notin_(FINAL_STATUSES) | stmt.excluded.status.in_(FINAL_STATUSES)
+    )
+    db.execute(stmt)
+    apply_receipts_to_results(db, list(receipts))
+    unmatched = count_unmatched(db, list(receipts))
+    db.commit()
+
+    if unmatched:
+        sms_receipts_unmatched_total.inc(unmatched)
+        logger.warning(f"{unmatched} of {len(receipts)} delivery receipts matched no message or result")
+
+
+def flush_buffer() -> int:
+    """Write everything buffered so far, in batches. Returns receipts written."""
+    pending = receipt_buffer.drain()
+    if not pending:
+        return 0
+
+    items = list(pending.items())
+    batch_size = settings.SMS_RECEIPT_BATCH_SIZE
+    written = 0
+    db = SessionLocal()
+    try:
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            started = time.perf_counter()
+            flush_receipts(db, batch)
+            sms_receipt_flush_seconds.observe(time.perf_counter() - started)
+            written += len(batch)
+    except Exception:
+        db.rollback()
+        receipt_buffer.restore(dict(items[written:]))
+        raise
+    finally:
+        db.close()
+    return written
+
+
+# SCHEDULING
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _flush_loop() -> None:
+    while not _stop.is_set():
+        receipt_buffer.flush_wanted.wait(settings.SMS_RECEIPT_FLUSH_SECONDS)
+        receipt_buffer.flush_wanted.clear()
+        try:
+            flush_buffer()
+        except Exception:
+            logger.exception("Failed to write SMS delivery receipts")
+            # Back off instead of retrying on every new receipt
+            _stop.wait(settings.SMS_RECEIPT_FLUSH_SECONDS)
+
+
+def start_receipt_flusher() -> None:
+    """Flush receipts every SMS_RECEIPT_FLUSH_SECONDS, or sooner when a batch fills up"""
+    global _thread
+    if _thread is None:
+        _stop.clear()
+        _thread = threading.Thread(target=_flush_loop, name="sms-receipts", daemon=True)
+        _thread.start()
+
+
+def stop_receipt_flusher() -> None:
+    """Stop the flusher and write what's left"""
+    global _thread
+    _stop.set()
+    receipt_buffer.flush_wanted.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
+    try:
+        flush_buffer()
+    except Exception:
+        logger.exception("Failed to write SMS delivery receipts on shutdown")
@@ -1,136 +1,176 @@
+import asyncio
 import logging
+import threading
+import time
+import uuid
 from typing import Optional
 
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
-
 from app.config import settings
+from app.services.sms_templates import (
+    OTP,
+    BOOKING_CONFIRMATION,
+    BOOKING_CANCELLATION,
+    RESULT_NORMAL,
+    RESULT_ABNORMAL,
+)
+from app.services.sms_client import get_sms_client, SMSSendError
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+    Shared by every sender in the process so bulk sends respect the provider's rate limit.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, otherwise return seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available"""
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait for a token without blocking the event loop"""
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+
+DEFAULT_PROVIDER = "twilio"
+
+# One limiter per provider, shared by every sender in the process
+_provider_rate_limiters: dict[str, RateLimiter] = {}
+_provider_rate_limiters_lock = threading.Lock()
+
+
+def get_provider_rate_limiter(provider: str = DEFAULT_PROVIDER) -> RateLimiter:
+    """Limiter for a provider; SMS_PROVIDER_RATE_LIMITS overrides SMS_RATE_LIMIT_PER_SECOND"""
+    with _provider_rate_limiters_lock:
+        limiter = _provider_rate_limiters.get(provider)
+        if limiter is None:
+            rate = settings.SMS_PROVIDER_RATE_LIMITS.get(provider, settings.SMS_RATE_LIMIT_PER_SECOND)
+            limiter = _provider_rate_limiters[provider] = RateLimiter(rate)
+        return limiter
 
 
 class TwilioSMSService:
     def __init__(self, mock: bool = True):
         """
-        Initialize Twilio SMS client.
+        Initialize Twilio SMS service.
         If mock=True, messages won't actually be sent (useful for local testing).
+        Live sends go through the process-wide pooled client (see sms_client).
         """
         self.mock = mock
 
         if not mock:
-            self.client = Client(
-                settings.TWILIO_ACCOUNT_SID,
-                settings.TWILIO_AUTH_TOKEN
-            )
+            self.client = get_sms_client()
             self.from_number = settings.TWILIO_PHONE_NUMBER
         else:
             self.client = None
             self.from_number = "mock-number"
 
+    def _mock_send(self, to: str, message: str) -> str:
+        # Codes in the body are masked unless LOG_REDACT is off (local development)
+        logger.info("Mock SMS", extra={"event": "sms_mock_sent", "to": to, "body": message})
+        # Unique, since provider_sid is (ix_sms_queue_provider_sid)
+        return f"mock-{uuid.uuid4().hex}"
+
+    def deliver(self, to: str, message: str) -> str:
+        """
+        Send a message (or mock it), returning its SID
+
+        Raises:
+            SMSSendError: If the provider rejects the message or can't be reached
+        """
+        if self.mock:
+            return self._mock_send(to, message)
+        return self.client.send(to, message)
+
+    async def deliver_async(self, to: str, message: str) -> str:
+        """
+        Async variant of deliver, for sending many messages concurrently
+
+        Raises:
+            SMSSendError: If the provider rejects the message or can't be reached
+        """
+        if self.mock:
+            return self._mock_send(to, message)
+        return await self.client.send_async(to, message)
+
     def send_sms(self, to: str, message: str) -> Optional[str]:
         """
         Send a generic SMS message via Twilio or mock it.
         Returns message SID if sent successfully.
         """
-        if self.mock:
-            print("=" * 60)
-            print("[MOCK SMS]")
-            print(f"To: {to}")
-            print(f"Message:\n{message}")
-            print("=" * 60)
-            
-            logger.info(f"[MOCK SMS] To: {to} | Message: {message}")
-            return "mock-sid"
-
         try:
-            msg = self.client.messages.create(
-                body=message,
-                from_=self.from_number,
-                to=to
-            )
-            logger.info(f"SMS sent successfully to {to} | SID: {msg.sid}")
-            return msg.sid
-
-        except TwilioRestException as e:
-            logger.error(f"Failed to send SMS to {to}: {e.msg}")
+            sid = self.deliver(to, message)
+            logger.info("SMS sent", extra={"event": "sms_sent", "to": to, "sid": sid})
+            return sid
+
+        except SMSSendError as e:
+            logger.error(f"Failed to send SMS: {e}", extra={"event": "sms_failed", "to": to})
             return None
 
 
-def send_otp_sms(phone: str, otp_code: str, mock: bool = True):
-    """Send OTP verification code via SMS"""
-    sms_service = TwilioSMSService(mock=mock)
-    message = f"Your verification code is: {otp_code}. It will expire in 10 minutes."
-    result = sms_service.send_sms(phone, message)
-    return result
+# One service per mode, reused by every send
+_services: dict[bool, TwilioSMSService] = {}
+_services_lock = threading.Lock()
 
 
-def send_booking_confirmation_sms(phone: str, booking_details: dict, mock: bool = True):
-    """
-    Send booking confirmation SMS.
-    booking_details example:
-    {
-        "event_name": "Concert Night",
-        "date": "2025-11-10",
-        "time": "7:30 PM",
-        "ref": "ABC123"
-    }
-    """
-    sms_service = TwilioSMSService(mock=mock)
-    message = (
-        f"Booking confirmed for {booking_details['event_name']} "
-        f"on {booking_details['date']} at {booking_details['time']}.\n"
-        f"Ref: {booking_details['ref']}."
-    )
-    return sms_service.send_sms(phone, message)
-
-
-def send_booking_cancellation_sms(phone: str, booking_ref: str, mock: bool = True):
-    """Send booking cancellation SMS"""
-    sms_service = TwilioSMSService(mock=mock)
-    message = (
-        f"Your booking with reference {booking_ref} has been cancelled. "
-        "If this wasn't you, please contact support immediately."
-    )
-    return sms_service.send_sms(phone, message)
-
-
-def send_result_notification_sms(
-    phone: str,
+def get_sms_service(mock: bool = True, provider: str = DEFAULT_PROVIDER) -> TwilioSMSService:
+    if provider != DEFAULT_PROVIDER:
+        raise RuntimeError(f"Unknown SMS provider: {provider}")
+    with _services_lock:
+        service = _services.get(mock)
+        if service is None:
+            service = _services[mock] = TwilioSMSService(mock=mock)
+        return service
+
+
+def build_otp_message(otp_code: str) -> str:
+    return OTP.render(otp_code=otp_code).body
+
+
+def build_booking_confirmation_message(booking_details: dict) -> str:
+    return BOOKING_CONFIRMATION.render(
+        event_name=booking_details["event_name"],
+        date=booking_details["date"],
+        time=booking_details["time"],
+        ref=booking_details["ref"]
+    ).body
+
+
+def build_booking_cancellation_message(booking_ref: str) -> str:
+    return BOOKING_CANCELLATION.render(ref=booking_ref).body
+
+
+def build_result_notification_message(
     result_category: str,
     booking_reference: str,
     participant_name: str,
-    result_url: Optional[str] = None,
-    mock: bool = True
-) -> dict:
-    """
-    Send test result notification SMS.
-    Different templates for Normal vs Abnormal results.
-    """
-    sms_service = TwilioSMSService(mock=mock)
-    
-    if result_category == "Normal":
-        message = (
-            f"Dear {participant_name},\n\n"
-            f"Your screening test results are ready.\n\n"
-            f"Result: Normal\n"
-            f"Booking Ref: {booking_reference}\n\n"
-            f"No further action needed.\n"
-            f"View full results: {result_url or 'Login to view'}\n\n"
-            f"- ROSE Foundation\n"
-            f"Cervical Cancer Screening Program"
-        )
-    else:
-        message = (
-            f"Dear {participant_name},\n\n"
-            f"Your screening test results are ready.\n\n"
-            f"Result: Abnormal - Follow-up Required\n"
-            f"Booking Ref: {booking_reference}\n\n"
-            f"IMPORTANT: Please contact ROSE Foundation:\n"
-            f"Phone: +60-XXX-XXXX\n"
-            f"Email: support@rose.org\n\n"
-            f"View full results: {result_url or 'Login to view'}\n\n"
-            f"- ROSE Foundation"
-        )
-    
-    return sms_service.send_sms(phone, message)
\ No newline at end of file
+    result_url: Optional[str] = None
+) -> str:
+    """Different templates for Normal vs Abnormal results, shortened to fit the segment budget"""
+    template_set = RESULT_NORMAL if result_category == "Normal" else RESULT_ABNORMAL
+    return template_set.render(
+        name=participant_name,
+        ref=booking_reference,
+        url=result_url or "Login to view"
+    ).body
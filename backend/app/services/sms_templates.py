@@ -0,0 +1,216 @@
+from string import Formatter
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.utils.metrics import histogram
+
+# Billing is per segment. A message that fits the GSM-7 alphabet gets 160
+# characters in one segment (153 per segment once split); a single character
+# outside it switches the whole message to UCS-2, with 70 (67) per segment.
+
+GSM7 = "GSM-7"
+UCS2 = "UCS-2"
+
+GSM7_SINGLE_SEGMENT = 160
+GSM7_MULTI_SEGMENT = 153
+UCS2_SINGLE_SEGMENT = 70
+UCS2_MULTI_SEGMENT = 67
+
+# GSM 03.38 default alphabet, and the extension table (two septets each)
+GSM7_BASIC = frozenset(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENDED = frozenset("^{}\\[]~|€\f")
+
+# Common lookalikes in user-entered values that would otherwise force UCS-2
+_GSM7_LOOKALIKES = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "′": "'",
+    "“": '"', "”": '"', "„": '"',
+    "–": "-", "—": "-", "−": "-",
+    "…": "...",
+    "\u00a0": " ", "\t": " ",
+})
+
+sms_message_segments = histogram(
+    "sms_message_segments",
+    "Billable segments per rendered message",
+    ["kind", "encoding"],
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10)
+)
+
+
+def gsm7_septets(text: str) -> Optional[int]:
+    """Length of text in GSM-7 septets, or None if it needs UCS-2"""
+    septets = 0
+    for char in text:
+        if char in GSM7_BASIC:
+            septets += 1
+        elif char in GSM7_EXTENDED:
+            septets += 2
+        else:
+            return None
+    return septets
+
+
+def ucs2_units(text: str) -> int:
+    """Length of text in UTF-16 code units (characters outside the BMP take two)"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def segment_count(units: int, encoding: str) -> int:
+    single, multi = (
+        (GSM7_SINGLE_SEGMENT, GSM7_MULTI_SEGMENT) if encoding == GSM7
+        else (UCS2_SINGLE_SEGMENT, UCS2_MULTI_SEGMENT)
+    )
+    if units <= single:
+        return 1
+    return -(-units // multi)
+
+
+class SMSMeasure(NamedTuple):
+    encoding: str
+    units: int  # Septets for GSM-7, UTF-16 code units for UCS-2
+    segments: int
+
+
+def measure(text: str) -> SMSMeasure:
+    """Encoding and billable segments of a message"""
+    septets = gsm7_septets(text)
+    if septets is not None:
+        return SMSMeasure(GSM7, septets, segment_count(septets, GSM7))
+    units = ucs2_units(text)
+    return SMSMeasure(UCS2, units, segment_count(units, UCS2))
+
+
+class RenderedSMS(NamedTuple):
+    body: str
+    kind: str
+    variant: int  # Index into the template set, 0 = full version
+    encoding: str
+    segments: int
+
+
+class SMSTemplate:
+    """
+    A message template with `{name}` placeholders, parsed once.
+    The literal text is measured at compile time, so rendering only has to
+    measure the substituted values.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts: list[tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if spec or conversion:
+                raise ValueError(f"SMS templates only support plain {{name}} fields: {source!r}")
+            self.parts.append((literal, field))
+
+        literals = "".join(literal for literal, _ in self.parts)
+        self.literal_septets = gsm7_septets(literals)
+        self.literal_ucs2_units = ucs2_units(literals)
+        self.fields = frozenset(field for _, field in self.parts if field is not None)
+
+    def render(self, values: dict) -> tuple[str, SMSMeasure]:
+        chunks = []
+        septets = self.literal_septets
+        units = self.literal_ucs2_units
+        for literal, field in self.parts:
+            chunks.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            chunks.append(value)
+            units += ucs2_units(value)
+            if septets is not None:
+                value_septets = gsm7_septets(value)
+                septets = None if value_septets is None else septets + value_septets
+
+        body = "".join(chunks)
+        if septets is not None:
+            return body, SMSMeasure(GSM7, septets, segment_count(septets, GSM7))
+        return body, SMSMeasure(UCS2, units, segment_count(units, UCS2))
+
+
+class SMSTemplateSet:
+    """
+    Variants of one message, longest first. Rendering picks the first variant
+    that fits the segment budget, or the cheapest one if none does.
+    The budget can be overridden per kind with SMS_SEGMENT_BUDGETS.
+    """
+
+    def __init__(self, kind: str, variants: list[str], max_segments: int):
+        if not variants:
+            raise ValueError(f"SMS template set {kind} has no variants")
+        self.kind = kind
+        self.variants = [SMSTemplate(source) for source in variants]
+        self.max_segments = max_segments
+
+    @property
+    def budget(self) -> int:
+        return settings.SMS_SEGMENT_BUDGETS.get(self.kind, self.max_segments)
+
+    def render(self, **values) -> RenderedSMS:
+        values = {name: str(value).translate(_GSM7_LOOKALIKES) for name, value in values.items()}
+        budget = self.budget
+
+        best = None
+        for index, template in enumerate(self.variants):
+            body, size = template.render(values)
+            rendered = RenderedSMS(body, self.kind, index, size.encoding, size.segments)
+            if size.segments <= budget:
+                best = rendered
+                break
+            if best is None or rendered.segments < best.segments:
+                best = rendered
+
+        sms_message_segments.observe(best.segments, kind=self.kind, encoding=best.encoding)
+        return best
+
+
+# TEMPLATES
+OTP = SMSTemplateSet("otp", [
+    "Your verification code is: {otp_code}. It will expire in 10 minutes.",
+    "Code: {otp_code} (valid 10 min)",
+], max_segments=1)
+
+BOOKING_CONFIRMATION = SMSTemplateSet("booking_confirmation", [
+    "Booking confirmed for {event_name} on {date} at {time}.\nRef: {ref}.",
+    "Booking {ref} confirmed: {event_name}, {date} {time}.",
+    "Booking {ref} confirmed for {date} {time}.",
+], max_segments=1)
+
+BOOKING_CANCELLATION = SMSTemplateSet("booking_cancellation", [
+    "Your booking with reference {ref} has been cancelled. "
+    "If this wasn't you, please contact support immediately.",
+    "Booking {ref} cancelled. Not you? Contact support now.",
+], max_segments=1)
+
+RESULT_NORMAL = SMSTemplateSet("result_normal", [
+    "Dear {name},\n\n"
+    "Your screening test results are ready.\n\n"
+    "Result: Normal\n"
+    "Booking Ref: {ref}\n\n"
+    "No further action needed.\n"
+    "View full results: {url}\n\n"
+    "- ROSE Foundation\n"
+    "Cervical Cancer Screening Program",
+    "Dear {name}, your screening result (Ref {ref}) is Normal. "
+    "No further action needed. View: {url} - ROSE Foundation",
+    "ROSE: Your screening result ({ref}) is Normal. View: {url}",
+], max_segments=2)
+
+RESULT_ABNORMAL = SMSTemplateSet("result_abnormal", [
+    "Dear {name},\n\n"
+    "Your screening test results are ready.\n\n"
+    "Result: Abnormal - Follow-up Required\n"
+    "Booking Ref: {ref}\n\n"
+    "IMPORTANT: Please contact ROSE Foundation:\n"
+    "Phone: +60-XXX-XXXX\n"
+    "Email: support@rose.org\n\n"
+    "View full results: {url}\n\n"
+    "- ROSE Foundation",
+    "Dear {name}, your screening result (Ref {ref}) needs follow-up. "
+    "Please contact ROSE Foundation: +60-XXX-XXXX. View: {url}",
+    "ROSE: Your result ({ref}) needs follow-up. Call +60-XXX-XXXX. View: {url}",
+], max_segments=2)
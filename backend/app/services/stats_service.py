@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import Event, EventStats, EventBookingHourly
+
+# Booking status -> rollup counter column
+STATUS_COUNTERS = {
+    "confirmed": "confirmed_count",
+    "cancelled": "cancelled_count",
+    "checked_in": "checked_in_count",
+}
+
+
+# Result SMS delivery status -> rollup counter column
+DELIVERY_COUNTERS = {
+    "delivered": "sms_delivered_count",
+    "failed": "sms_failed_count",
+}
+
+
+# ROLLUP WRITES
+# These only stage the upsert on the session. The caller commits it together
+# with the booking/result change so the counters never drift.
+def _bump_event_stats(db: Session, event_id, **deltas: int) -> None:
+    """Atomically add deltas to an event's rollup row, creating it if missing"""
+    table = EventStats.__table__
+    stmt = pg_insert(table).values(
+        event_id=event_id,
+        updated_at=datetime.utcnow(),
+        **{column: max(delta, 0) for column, delta in deltas.items()}
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.event_id],
+        set_={
+            "updated_at": stmt.excluded.updated_at,
+            **{column: table.c[column] + delta for column, delta in deltas.items()}
+        }
+    )
+    db.execute(stmt)
+
+
+def record_booking_created(db: Session, event_id, booked_at: Optional[datetime] = None) -> None:
+    """Count a new confirmed booking and add it to the hourly velocity bucket"""
+    _bump_event_stats(db, event_id, confirmed_count=1)
+
+    hour = (booked_at or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    table = EventBookingHourly.__table__
+    stmt = pg_insert(table).values(event_id=event_id, hour=hour, bookings_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.event_id, table.c.hour],
+        set_={"bookings_count": table.c.bookings_count + 1}
+    )
+    db.execute(stmt)
+
+
+def record_booking_status_change(db: Session, event_id, old_status: str, new_status: str) -> None:
+    """Move one booking from one status counter to another (cancel, check-in)"""
+    if old_status == new_status:
+        return
+
+    deltas = {}
+    if old_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[old_status]] = -1
+    if new_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[new_status]] = 1
+
+    if deltas:
+        _bump_event_stats(db, event_id, **deltas)
+
+
+def record_result_uploaded(db: Session, event_id, result_category: str, count: int = 1) -> None:
+    """Count uploaded test results for an event"""
+    deltas = {"results_uploaded_count": count}
+    if result_category != "Normal":
+        deltas["abnormal_results_count"] = count
+    _bump_event_stats(db, event_id, **deltas)
+
+
+def record_result_sms_sent(db: Session, event_id, count: int = 1) -> None:
+    """Count result notification SMS sent for an event"""
+    _bump_event_stats(db, event_id, sms_sent_count=count)
+
+
+def record_sms_delivery_change(db: Session, event_id, old_status: Optional[str], new_status: str, count: int = 1) -> None:
+    """Move result notifications between the delivered / failed counters"""
+    if old_status == new_status:
+        return
+
+    deltas = {}
+    if old_status in DELIVERY_COUNTERS:
+        deltas[DELIVERY_COUNTERS[old_status]] = -count
+    if new_status in DELIVERY_COUNTERS:
+        deltas[DELIVERY_COUNTERS[new_status]] = count
+
+    if deltas:
+        _bump_event_stats(db, event_id, **deltas)
+
+
+# DASHBOARD READS
+def get_admin_dashboard(db: Session, admin_id, velocity_hours: int = 24) -> list[dict]:
+    """
+    Build per-event dashboard stats for an admin's events.
+    Reads only events + rollup tables; bookings and test_results are never scanned.
+    """
+    rows = (
+        db.query(
+            Event.id,
+            Event.name,
+            Event.event_date,
+            Event.total_slots,
+            Event.available_slots,
+            EventStats.confirmed_count,
+            EventStats.cancelled_count,
+            EventStats.checked_in_count,
+            EventStats.results_uploaded_count,
+            EventStats.sms_sent_count,
+        )
+        .outerjoin(EventStats, EventStats.event_id == Event.id)
+        .filter(Event.created_by == admin_id)
+        .order_by(Event.event_date.desc())
+        .all()
+    )
+
+    since = (datetime.utcnow() - timedelta(hours=velocity_hours)).replace(minute=0, second=0, microsecond=0)
+    velocity_rows = (
+        db.query(EventBookingHourly.event_id, EventBookingHourly.hour, EventBookingHourly.bookings_count)
+        .join(Event, Event.id == EventBookingHourly.event_id)
+        .filter(Event.created_by == admin_id, EventBookingHourly.hour >= since)
+        .order_by(EventBookingHourly.hour.asc())
+        .all()
+    )
+
+    velocity: dict = {}
+    for event_id, hour, bookings_count in velocity_rows:
+        velocity.setdefault(event_id, []).append({"hour": hour, "bookings": bookings_count})
+
+    return [
+        {
+            "event_id": row.id,
+            "event_name": row.name,
+            "event_date": row.event_date,
+            "total_slots": row.total_slots,
+            "available_slots": row.available_slots,
+            "confirmed": row.confirmed_count or 0,
+            "cancelled": row.cancelled_count or 0,
+            "checked_in": row.checked_in_count or 0,
+            "results_uploaded": row.results_uploaded_count or 0,
+            "sms_sent": row.sms_sent_count or 0,
+            "booking_velocity": velocity.get(row.id, []),
+        }
+        for row in rows
+    ]
+
+
+def get_result_counts(db: Session, admin_id, event_id=None) -> dict:
+    """
+    Result counts for an admin's events (optionally a single event), read from
+    the rollups. Used to show per-filter totals next to the results listing.
+    """
+    query = (
+        db.query(
+            func.coalesce(func.sum(EventStats.results_uploaded_count), 0),
+            func.coalesce(func.sum(EventStats.abnormal_results_count), 0),
+            func.coalesce(func.sum(EventStats.sms_sent_count), 0),
+            func.coalesce(func.sum(EventStats.sms_delivered_count), 0),
+            func.coalesce(func.sum(EventStats.sms_failed_count), 0),
+        )
+        .join(Event, Event.id == EventStats.event_id)
+        .filter(Event.created_by == admin_id)
+    )
+    if event_id:
+        query = query.filter(Event.id == event_id)
+
+    total, abnormal, sms_sent, sms_delivered, sms_failed = query.one()
+    return {
+        "total": total,
+        "normal": total - abnormal,
+        "abnormal": abnormal,
+        "sms_sent": sms_sent,
+        "sms_pending": total - sms_sent,
+        "sms_delivered": sms_delivered,
+        "sms_failed": sms_failed,
+    }
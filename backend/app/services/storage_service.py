@@ -0,0 +1,439 @@
+import hashlib
+import hmac
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.file_encryption import (
+    HEADER_SIZE,
+    EncryptedFileHeader,
+    ciphertext_range,
+    derive_file_key,
+    encrypt_file,
+    iter_decrypted_range,
+    parse_header,
+)
+
+# Content-addressed keys: identical PDFs map to the same stored object
+RESULT_KEY_PREFIX = "test_results"
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def result_key(sha256: str) -> str:
+    """Storage key for a result file with the given content hash"""
+    return f"{RESULT_KEY_PREFIX}/{sha256}"
+
+
+def thumbnail_key(public_id: str) -> str:
+    """Storage key of the first-page PNG thumbnail for a stored PDF"""
+    return f"{public_id}.thumb.png"
+
+
+def file_format(key: str) -> str:
+    """File format of a stored object: thumbnails are PNG, everything else PDF"""
+    return "png" if key.endswith(".png") else "pdf"
+
+
+def sha256_of_file(path: str, chunk_size: int = 64 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResultStorage(ABC):
+    """Storage backend for result PDFs, addressed by key"""
+
+    # URL scheme used in result_file_url for objects in this backend
+    url_scheme: str = ""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an object is already stored under this key"""
+
+    @abstractmethod
+    def save_file(self, key: str, file_path: str) -> str:
+        """Store a local file under key, returning its URL"""
+
+    @abstractmethod
+    def signed_url(self, key: str, expires_in_seconds: int) -> str:
+        """Time-limited URL for downloading the object"""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete the object; True if it was removed"""
+
+    @abstractmethod
+    def object_size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None if there is no such object"""
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        """Stream bytes start..end (inclusive) of the object"""
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_scheme}://{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Recover the key from a URL produced by this backend"""
+        prefix = f"{self.url_scheme}://"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path on local disk, for backends that can serve files directly"""
+        return None
+
+
+class CloudinaryStorage(ResultStorage):
+    """Private raw uploads on Cloudinary (configured on first use)"""
+
+    url_scheme = "https"
+
+    def __init__(self):
+        import cloudinary
+        import cloudinary.api
+        import cloudinary.uploader
+        import cloudinary.utils
+
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET,
+            secure=True
+        )
+        self.cloudinary = cloudinary
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.cloudinary.api.resource(key, resource_type="raw", type="private")
+            return True
+        except self.cloudinary.exceptions.NotFound:
+            return False
+
+    def save_file(self, key: str, file_path: str) -> str:
+        upload_result = self.cloudinary.uploader.upload_large(
+            file_path,
+            public_id=key,
+            resource_type="raw",
+            type="private",
+            overwrite=False,
+            chunk_size=settings.RESULT_UPLOAD_CHUNK_BYTES
+        )
+        return upload_result["secure_url"]
+
+    def signed_url(self, key: str, expires_in_seconds: int) -> str:
+        return self.cloudinary.utils.private_download_url(
+            key,
+            format=file_format(key),
+            resource_type="raw",
+            expires_at=int(time.time()) + expires_in_seconds
+        )
+
+    def delete(self, key: str) -> bool:
+        result = self.cloudinary.uploader.destroy(key, resource_type="raw", type="private")
+        return result.get("result") == "ok"
+
+    def object_size(self, key: str) -> Optional[int]:
+        try:
+            return self.cloudinary.api.resource(key, resource_type="raw", type="private")["bytes"]
+        except self.cloudinary.exceptions.NotFound:
+            return None
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        import requests
+
+        with requests.get(
+            self.signed_url(key, 300),
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+            timeout=30
+        ) as response:
+            response.raise_for_status()
+            if response.status_code == 206:
+                yield from response.iter_content(READ_CHUNK_BYTES)
+                return
+
+            # The CDN ignored the Range header and sent the whole file: slice it
+            skip = start
+            remaining = end - start + 1
+            for chunk in response.iter_content(READ_CHUNK_BYTES):
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                chunk = chunk[skip:skip + remaining]
+                skip = 0
+                remaining -= len(chunk)
+                yield chunk
+                if remaining <= 0:
+                    break
+
+    def url_for(self, key: str) -> str:
+        return f"https://res.cloudinary.com/{settings.CLOUDINARY_CLOUD_NAME}/raw/private/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        # Format: https://res.cloudinary.com/{cloud}/raw/{upload|private}/v123/{public_id}[.pdf]
+        for marker in ("/upload/", "/private/"):
+            if marker in url:
+                path = url.split(marker, 1)[1]
+                segments = path.split("/")
+                if segments[0].startswith("v") and segments[0][1:].isdigit():
+                    segments = segments[1:]
+                return "/".join(segments).rsplit(".pdf", 1)[0]
+        return None
+
+
+class LocalStorage(ResultStorage):
+    """
+    Files on local disk, for clinics without cloud storage and for tests.
+    Downloads go through the API, which supports range requests.
+    """
+
+    url_scheme = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        filename = key if file_format(key) == "png" else key + ".pdf"
+        path = os.path.abspath(os.path.join(self.root, filename))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError("Invalid storage key")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def save_file(self, key: str, file_path: str) -> str:
+        destination = self.local_path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Unique per call: threads of one worker can save the same key concurrently
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, open(file_path, "rb") as source:
+                shutil.copyfileobj(source, f)
+            os.replace(tmp_path, destination)  # Atomic: readers never see a partial file
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.url_for(key)
+
+    def signed_url(self, key: str, expires_in_seconds: int) -> str:
+        return proxy_signed_url(key, expires_in_seconds)
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self.local_path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def object_size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.local_path(key))
+        except FileNotFoundError:
+            return None
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self.local_path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class S3Storage(ResultStorage):
+    """S3-compatible object storage (AWS S3, MinIO and similar); requires boto3"""
+
+    url_scheme = "s3"
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("RESULT_STORAGE_BACKEND=s3 requires the boto3 package")
+
+        self.bucket = settings.S3_BUCKET
+        self.client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            region_name=settings.S3_REGION
+        )
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self.client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def save_file(self, key: str, file_path: str) -> str:
+        # upload_file streams from disk, switching to multipart for large files
+        self.client.upload_file(
+            file_path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": f"{'image' if file_format(key) == 'png' else 'application'}/{file_format(key)}"}
+        )
+        return self.url_for(key)
+
+    def signed_url(self, key: str, expires_in_seconds: int) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in_seconds
+        )
+
+    def delete(self, key: str) -> bool:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+    def object_size(self, key: str) -> Optional[int]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except self.client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        yield from response["Body"].iter_chunks(READ_CHUNK_BYTES)
+
+
+class EncryptedStorage(ResultStorage):
+    """
+    Encrypts objects at rest with chunked AES-GCM on top of another backend.
+    Each object has its own key, derived from RESULT_ENCRYPTION_KEY and the
+    object key. Reads return plaintext; objects stored before encryption was
+    enabled are passed through unchanged.
+    """
+
+    def __init__(self, backend: ResultStorage, master_key: str):
+        self.backend = backend
+        self.master_key = master_key
+        self.url_scheme = backend.url_scheme
+        # Stored objects are immutable (content-addressed), so headers can be cached
+        self.headers = TTLCache(max_entries=10000, ttl_seconds=300)
+
+    def exists(self, key: str) -> bool:
+        return self.backend.exists(key)
+
+    def save_file(self, key: str, file_path: str) -> str:
+        encrypted_path = f"{file_path}.enc"
+        try:
+            with open(file_path, "rb") as source, open(encrypted_path, "wb") as destination:
+                encrypt_file(
+                    source,
+                    destination,
+                    os.path.getsize(file_path),
+                    derive_file_key(self.master_key, key)
+                )
+            return self.backend.save_file(key, encrypted_path)
+        finally:
+            if os.path.exists(encrypted_path):
+                os.remove(encrypted_path)
+
+    def signed_url(self, key: str, expires_in_seconds: int) -> str:
+        # The backend only holds ciphertext, so downloads must go through the API
+        return proxy_signed_url(key, expires_in_seconds)
+
+    def delete(self, key: str) -> bool:
+        self.headers.invalidate(key)
+        return self.backend.delete(key)
+
+    def url_for(self, key: str) -> str:
+        return self.backend.url_for(key)
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        return self.backend.key_from_url(url)
+
+    def _header(self, key: str) -> Optional[EncryptedFileHeader]:
+        """Encryption header of the object, or None for plaintext objects"""
+        cached = self.headers.get(key)
+        if cached is not None:
+            return cached[0]
+        header = parse_header(b"".join(self.backend.read_range(key, 0, HEADER_SIZE - 1)))
+        self.headers.set(key, (header,))
+        return header
+
+    def object_size(self, key: str) -> Optional[int]:
+        size = self.backend.object_size(key)
+        if not size:
+            return size
+        header = self._header(key)
+        return header.plaintext_size if header else size
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        header = self._header(key)
+        if header is None:
+            yield from self.backend.read_range(key, start, end)
+            return
+
+        first_chunk, cipher_start, cipher_end = ciphertext_range(header, start, end)
+        yield from iter_decrypted_range(
+            header,
+            derive_file_key(self.master_key, key),
+            self.backend.read_range(key, cipher_start, cipher_end),
+            first_chunk,
+            start,
+            end
+        )
+
+
+# SIGNED PROXY DOWNLOADS
+def proxy_signed_url(key: str, expires_in_seconds: int) -> str:
+    """Expiring URL for downloading an object through the API"""
+    expires = int(time.time()) + expires_in_seconds
+    signature = sign_file_key(key, expires)
+    return f"{settings.PUBLIC_API_URL}/results/files/{quote(key)}?expires={expires}&signature={signature}"
+
+
+def sign_file_key(key: str, expires: int) -> str:
+    message = f"{key}:{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_file_signature(key: str, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_file_key(key, expires).encode(), signature.encode())
+
+
+# BACKEND SELECTION
+_storage: Optional[ResultStorage] = None
+
+
+def get_result_storage() -> ResultStorage:
+    """Storage backend selected by RESULT_STORAGE_BACKEND, created on first use"""
+    global _storage
+    if _storage is None:
+        backend = settings.RESULT_STORAGE_BACKEND
+        if backend == "cloudinary":
+            _storage = CloudinaryStorage()
+        elif backend == "local":
+            _storage = LocalStorage(settings.LOCAL_STORAGE_DIR)
+        elif backend == "s3":
+            _storage = S3Storage()
+        else:
+            raise RuntimeError(f"Unknown RESULT_STORAGE_BACKEND: {backend}")
+        if settings.RESULT_ENCRYPTION_KEY:
+            _storage = EncryptedStorage(_storage, settings.RESULT_ENCRYPTION_KEY)
+    return _storage
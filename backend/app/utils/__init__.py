@@ -6,6 +6,14 @@ from app.utils.security import (
     get_current_user,
     get_current_participant,
     get_current_admin,
+    get_current_claims,
+    get_current_participant_claims,
+    get_current_admin_claims,
+    get_current_user_async,
+    get_current_participant_async,
+    get_current_admin_async,
+    invalidate_principal,
+    TokenClaims,
 )
 
 __all__ = [
@@ -16,4 +24,12 @@ __all__ = [
     "get_current_user",
     "get_current_participant",
     "get_current_admin",
+    "get_current_claims",
+    "get_current_participant_claims",
+    "get_current_admin_claims",
+    "get_current_user_async",
+    "get_current_participant_async",
+    "get_current_admin_async",
+    "invalidate_principal",
+    "TokenClaims",
 ]
\ No newline at end of file
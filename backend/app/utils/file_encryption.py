@@ -0,0 +1,129 @@
+import base64
+import os
+import struct
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Chunked AES-GCM file format
+#
+#   header: MAGIC (8) | chunk_size (u32) | plaintext_size (u64) | nonce_prefix (4)
+#   body:   chunk 0 | chunk 1 | ...  each = ciphertext (<= chunk_size) + 16-byte tag
+#
+# Chunk i uses nonce = nonce_prefix + i (u64) and AAD = i (u64) + is_last (u8),
+# so chunks can't be reordered or the file truncated unnoticed. Any byte range
+# can be served by decrypting only the chunks it covers.
+
+MAGIC = b"ROSEENC1"
+HEADER_FORMAT = ">8sIQ4s"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class EncryptedFileHeader(NamedTuple):
+    chunk_size: int
+    plaintext_size: int
+    nonce_prefix: bytes
+
+    @property
+    def chunk_count(self) -> int:
+        return max((self.plaintext_size + self.chunk_size - 1) // self.chunk_size, 1)
+
+    def ciphertext_offset(self, chunk_index: int) -> int:
+        return HEADER_SIZE + chunk_index * (self.chunk_size + TAG_SIZE)
+
+
+def derive_file_key(master_key_b64: str, key_id: str) -> bytes:
+    """Per-file AES-256 key derived from the master key and the file's storage key"""
+    master_key = base64.urlsafe_b64decode(master_key_b64)
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"rose-result-file:" + key_id.encode()
+    ).derive(master_key)
+
+
+def parse_header(data: bytes):
+    """Parse an encrypted-file header, or return None if the data isn't one"""
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        return None
+    _, chunk_size, plaintext_size, nonce_prefix = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
+    return EncryptedFileHeader(chunk_size, plaintext_size, nonce_prefix)
+
+
+def _nonce(header: EncryptedFileHeader, chunk_index: int) -> bytes:
+    return header.nonce_prefix + struct.pack(">Q", chunk_index)
+
+
+def _aad(header: EncryptedFileHeader, chunk_index: int) -> bytes:
+    is_last = chunk_index == header.chunk_count - 1
+    return struct.pack(">QB", chunk_index, is_last)
+
+
+def encrypt_file(source: BinaryIO, destination: BinaryIO, plaintext_size: int, key: bytes,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Encrypt a file chunk by chunk; memory use is bounded by chunk_size"""
+    header = EncryptedFileHeader(chunk_size, plaintext_size, os.urandom(4))
+    destination.write(struct.pack(HEADER_FORMAT, MAGIC, *header))
+
+    aesgcm = AESGCM(key)
+    for chunk_index in range(header.chunk_count):
+        chunk = source.read(chunk_size)
+        destination.write(aesgcm.encrypt(_nonce(header, chunk_index), chunk, _aad(header, chunk_index)))
+
+
+def ciphertext_range(header: EncryptedFileHeader, start: int, end: int) -> tuple[int, int, int]:
+    """
+    Map an inclusive plaintext range to the ciphertext that covers it.
+
+    Returns:
+        (first chunk index, ciphertext start offset, ciphertext end offset inclusive)
+    """
+    first_chunk = start // header.chunk_size
+    last_chunk = end // header.chunk_size
+    cipher_start = header.ciphertext_offset(first_chunk)
+    last_chunk_plain = min(header.chunk_size, header.plaintext_size - last_chunk * header.chunk_size)
+    cipher_end = header.ciphertext_offset(last_chunk) + last_chunk_plain + TAG_SIZE - 1
+    return first_chunk, cipher_start, cipher_end
+
+
+def iter_decrypted_range(
+    header: EncryptedFileHeader,
+    key: bytes,
+    ciphertext: Iterable[bytes],
+    first_chunk: int,
+    start: int,
+    end: int
+) -> Iterator[bytes]:
+    """
+    Decrypt a stream of ciphertext starting at `first_chunk`, yielding only
+    plaintext bytes start..end (inclusive).
+    """
+    aesgcm = AESGCM(key)
+    chunk_index = first_chunk
+    buffer = b""
+
+    def chunk_length(index: int) -> int:
+        plain = min(header.chunk_size, header.plaintext_size - index * header.chunk_size)
+        return max(plain, 0) + TAG_SIZE
+
+    for data in ciphertext:
+        buffer += data
+        while len(buffer) >= chunk_length(chunk_index):
+            length = chunk_length(chunk_index)
+            plaintext = aesgcm.decrypt(_nonce(header, chunk_index), buffer[:length], _aad(header, chunk_index))
+            buffer = buffer[length:]
+
+            chunk_start = chunk_index * header.chunk_size
+            lower = max(start - chunk_start, 0)
+            upper = min(end - chunk_start + 1, len(plaintext))
+            if lower < upper:
+                yield plaintext[lower:upper]
+
+            if chunk_start + header.chunk_size > end:
+                return
+            chunk_index += 1
@@ -0,0 +1,131 @@
+import os
+import re
+from typing import Callable, Iterator, Optional
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into inclusive (start, end) offsets.
+
+    Returns:
+        None if there is no usable range (serve the whole file)
+
+    Raises:
+        HTTPException: 416 if the range can't be satisfied
+    """
+    if not range_header:
+        return None
+
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None  # Multi-range or malformed: fall back to a full response
+
+    start_text, end_text = match.groups()
+    if start_text:
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    elif end_text:
+        # Suffix range: last N bytes
+        start = max(size - int(end_text), 0)
+        end = size - 1
+    else:
+        return None
+
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _iter_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(
+    path: str,
+    range_header: Optional[str],
+    media_type: str = "application/pdf",
+    filename: Optional[str] = None
+):
+    """
+    Serve a local file, honouring a single byte range.
+    Full reads use FileResponse; partial reads stream only the requested bytes.
+    """
+    size = os.path.getsize(path)
+    headers = {"Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'inline; filename="{filename}"'
+
+    byte_range = parse_range_header(range_header, size)
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def ranged_stream_response(
+    size: int,
+    read_range: Callable[[int, int], Iterator[bytes]],
+    range_header: Optional[str],
+    media_type: str = "application/pdf",
+    filename: Optional[str] = None,
+    etag: Optional[str] = None,
+    if_range: Optional[str] = None
+):
+    """
+    Serve content that isn't a local file (remote or encrypted storage),
+    honouring a single byte range. `read_range(start, end)` streams inclusive offsets.
+    """
+    headers = {"Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    if etag:
+        headers["ETag"] = etag
+
+    # A stale If-Range means the client's partial copy is of another version
+    byte_range = None
+    if if_range is None or if_range == etag:
+        byte_range = parse_range_header(range_header, size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            read_range(0, size - 1) if size else iter(()),
+            media_type=media_type,
+            headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        read_range(start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,198 @@
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config import settings
+from app.utils.metrics import counter
+
+# Request threads only put records on a bounded in-memory queue; a listener
+# thread redacts, formats (one JSON object per line) and writes them. When
+# the queue is full, records are dropped and counted rather than blocking.
+
+log_records_dropped_total = counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full"
+)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# REDACTION
+PHONE_FIELDS = frozenset({"phone", "phone_number", "to"})
+SECRET_FIELDS = frozenset({"otp", "otp_code", "code", "password", "token"})
+
+# Phone numbers: 9-15 digits, optionally with a leading +
+_PHONE_PATTERN = re.compile(r"(?<![\w+])\+?\d{9,15}(?!\w)")
+# Codes following an OTP-ish word: "code is: 123456", "otp_code=123456"
+_OTP_PATTERN = re.compile(r"(?i)\b(otp|code|passcode|pin)(\w*\W{1,5}(?:is\W{1,3})?)(\d{4,8})\b")
+# Credentials in URL query strings, e.g. result download links in access logs
+_QUERY_SECRET_PATTERN = re.compile(r"(?i)([?&](?:token|access_token|signature)=)[^&\s\"']+")
+
+
+def mask_phone(value: str) -> str:
+    """Keep the country prefix shape and last 3 digits: +60*******789"""
+    digits = sum(char.isdigit() for char in value)
+    seen = 0
+    masked = []
+    for char in value:
+        if char.isdigit():
+            seen += 1
+            masked.append(char if seen > digits - 3 else "*")
+        else:
+            masked.append(char)
+    return "".join(masked)
+
+
+def redact_text(text: str) -> str:
+    text = _QUERY_SECRET_PATTERN.sub(lambda match: f"{match.group(1)}[REDACTED]", text)
+    text = _OTP_PATTERN.sub(lambda match: f"{match.group(1)}{match.group(2)}******", text)
+    return _PHONE_PATTERN.sub(lambda match: mask_phone(match.group(0)), text)
+
+
+def redact_value(key: str, value):
+    if key in SECRET_FIELDS:
+        return "[REDACTED]"
+    if isinstance(value, str):
+        if key in PHONE_FIELDS:
+            return mask_phone(value)
+        return redact_text(value)
+    return value
+
+
+class RedactionFilter(logging.Filter):
+    """Mask phone numbers and OTP codes in the message and `extra` fields"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact_text(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact_text(record.exc_text)
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRIBUTES:
+                setattr(record, key, redact_value(key, value))
+        return True
+
+
+# SAMPLING
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of high-volume records. Records are matched by their
+    `event` extra, then by logger name; warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rates.get(getattr(record, "event", None))
+        if rate is None:
+            rate = self.rates.get(record.name)
+        if rate is None or rate >= 1:
+            return True
+        return random.random() < rate
+
+
+# FORMATTING
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking on a full queue"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare, but keeps the traceback separate from the
+        # message so the formatter can put it in its own field
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+
+# SETUP
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route all logging through the queue. Levels come from LOG_LEVEL and the
+    per-logger LOG_LEVELS; sampling from LOG_SAMPLE_RATES. Safe to call twice.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter())
+    if settings.LOG_REDACT:
+        output.addFilter(RedactionFilter())
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # uvicorn installs its own stream handlers (and stops propagation) before
+    # the app is imported; send its records through the queue too, so access
+    # logs are redacted and never block on stdout
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for existing in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(existing)
+        uvicorn_logger.propagate = True
+
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
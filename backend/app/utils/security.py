@@ -1,16 +1,34 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import NamedTuple, Optional, Union
+from uuid import UUID
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import Participant, Admin
+from app.utils.cache import TTLCache
+
+def build_password_context(rounds: int) -> CryptContext:
+    """
+    bcrypt context at a fixed cost. Hashes made at any other cost still verify,
+    but are reported as needing an update so they can be rehashed on login.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_password_context(settings.BCRYPT_ROUNDS)
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
@@ -91,17 +109,59 @@ def verify_token(token: str) -> dict:
 
 
 
+# PRINCIPAL CACHE
+ROLE_MODELS = {"participant": Participant, "admin": Admin}
+
+# Column values of resolved users, keyed by (role, subject). Per process, so
+# other workers may serve a stale user for up to the TTL after a change.
+_principal_cache = TTLCache(
+    max_entries=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(role: str, user_id) -> None:
+    """Drop a cached user after it is updated or deleted"""
+    _principal_cache.invalidate((role, str(user_id)))
+
+
+def _register_principal_invalidation(model, role: str) -> None:
+    # Fires on ORM flushes; bulk query.update()/delete() must invalidate explicitly
+    def invalidate(mapper, connection, target):
+        invalidate_principal(role, target.id)
+
+    event.listen(model, "after_update", invalidate)
+    event.listen(model, "after_delete", invalidate)
+
+
+for _role, _model in ROLE_MODELS.items():
+    _register_principal_invalidation(_model, _role)
+
+
+def _snapshot(user) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs}
+
+
+def _detached_from_snapshot(model, values: dict):
+    user = model(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def _from_snapshot(db: Session, model, values: dict):
+    """Attach a copy of a cached user to this request's session without a SELECT"""
+    return db.merge(_detached_from_snapshot(model, values), load=False)
+
+
+class TokenClaims(NamedTuple):
+    """Identity from a verified token, for routes that don't need the user row"""
+    id: UUID
+    role: str
+
+
 # AUTHENTICATION DEPENDENCIES
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Union[Participant, Admin]:
-    """
-    Get current authenticated user from JWT token
-    Works for both participants and admins
-    """
-    token = credentials.credentials
-    payload = verify_token(token)
+def _claims_from_credentials(credentials: HTTPAuthorizationCredentials) -> TokenClaims:
+    payload = verify_token(credentials.credentials)
     
     user_id: str = payload.get("sub")
     role: str = payload.get("role")
@@ -112,26 +172,59 @@ def get_current_user(
             detail="Invalid authentication credentials"
         )
     
-    # Query based on role
-    if role == "participant":
-        user = db.query(Participant).filter(Participant.id == user_id).first()
-    elif role == "admin":
-        user = db.query(Admin).filter(Admin.id == user_id).first()
-    else:
+    if role not in ROLE_MODELS:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid role"
         )
     
+    try:
+        return TokenClaims(UUID(user_id), role)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Union[Participant, Admin]:
+    """
+    Get current authenticated user from JWT token
+    Works for both participants and admins
+    """
+    claims = _claims_from_credentials(credentials)
+    model = ROLE_MODELS[claims.role]
+    cache_key = (claims.role, str(claims.id))
+    
+    cached = _principal_cache.get(cache_key)
+    if cached is not None:
+        return _from_snapshot(db, model, cached)
+    
+    user = db.query(model).filter(model.id == claims.id).first()
+    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    _principal_cache.set(cache_key, _snapshot(user))
     return user
 
 
+def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenClaims:
+    """
+    Get the verified token's identity without touching the database.
+    The user is not re-checked, so a deleted user's token works until it expires.
+    """
+    return _claims_from_credentials(credentials)
+
+
 def get_current_participant(
     current_user: Union[Participant, Admin] = Depends(get_current_user)
 ) -> Participant:
@@ -159,4 +252,74 @@ def get_current_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def get_current_participant_claims(
+    claims: TokenClaims = Depends(get_current_claims)
+) -> TokenClaims:
+    """
+    Claims-only variant of get_current_participant
+    Raises 403 if the token is not a participant's
+    """
+    if claims.role != "participant":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Participant access required"
+        )
+    return claims
+
+
+def get_current_admin_claims(
+    claims: TokenClaims = Depends(get_current_claims)
+) -> TokenClaims:
+    """
+    Claims-only variant of get_current_admin
+    Raises 403 if the token is not an admin's
+    """
+    if claims.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return claims
+
+
+# ASYNC AUTHENTICATION DEPENDENCIES (routers on the async engine)
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[Participant, Admin]:
+    """get_current_user on the async engine, sharing its principal cache"""
+    claims = _claims_from_credentials(credentials)
+    model = ROLE_MODELS[claims.role]
+    cache_key = (claims.role, str(claims.id))
+
+    cached = _principal_cache.get(cache_key)
+    if cached is not None:
+        return await db.merge(_detached_from_snapshot(model, cached), load=False)
+
+    user = await db.get(model, claims.id)
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    _principal_cache.set(cache_key, _snapshot(user))
+    return user
+
+
+async def get_current_participant_async(
+    current_user: Union[Participant, Admin] = Depends(get_current_user_async)
+) -> Participant:
+    """get_current_participant on the async engine"""
+    return get_current_participant(current_user)
+
+
+async def get_current_admin_async(
+    current_user: Union[Participant, Admin] = Depends(get_current_user_async)
+) -> Admin:
+    """get_current_admin on the async engine"""
+    return get_current_admin(current_user)
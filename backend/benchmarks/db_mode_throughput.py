@@ -0,0 +1,103 @@
+"""
+Compare request throughput of the sync and async database modes side by side.
+
+Start two API servers on the same database, one per mode, e.g.:
+
+    uvicorn app.main:app --port 8000
+    ASYNC_DB_ENABLED=true uvicorn app.main:app --port 8001
+
+Each endpoint is then hit by `--concurrency` clients for `--duration`
+seconds on one server and then the other, and throughput and latency are
+printed next to each other. Pass a participant token to include
+GET /participant/bookings and /participant/profile.
+
+Usage:
+    python benchmarks/db_mode_throughput.py --concurrency 200 --token <participant JWT>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+
+
+async def client_loop(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: dict,
+    deadline: float,
+    statuses: Counter,
+    latencies: list[float]
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers) as response:
+                await response.read()
+                statuses[response.status] += 1
+                if response.status == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+        except aiohttp.ClientError:
+            statuses["error"] += 1
+
+
+async def run_endpoint(base_url: str, path: str, headers: dict, args) -> dict:
+    statuses: Counter = Counter()
+    latencies: list[float] = []
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Warm the connection pools before measuring
+        async with session.get(f"{base_url}{path}", headers=headers) as response:
+            await response.read()
+
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            client_loop(session, f"{base_url}{path}", headers, deadline, statuses, latencies)
+            for _ in range(args.concurrency)
+        ))
+
+    latencies.sort()
+    return {
+        "rps": statuses[200] / args.duration,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else max(latencies, default=0.0),
+        "failed": sum(count for status, count in statuses.items() if status != 200),
+    }
+
+
+def row(label: str, result: dict) -> str:
+    return (
+        f"{label:<6} {result['rps']:8.0f} req/s  p50={result['p50']:7.1f}ms  "
+        f"p95={result['p95']:7.1f}ms  failed={result['failed']}"
+    )
+
+
+async def main(args) -> None:
+    endpoints = [("/events/", {})]
+    if args.event_id:
+        endpoints.append((f"/events/{args.event_id}", {}))
+    if args.token:
+        auth = {"Authorization": f"Bearer {args.token}"}
+        endpoints += [("/participant/bookings", auth), ("/participant/profile", auth)]
+
+    for path, headers in endpoints:
+        print(f"GET {path}  (concurrency {args.concurrency}, {args.duration:.0f}s each)")
+        sync_result = await run_endpoint(args.sync_url, path, headers, args)
+        async_result = await run_endpoint(args.async_url, path, headers, args)
+        print("  " + row("sync", sync_result))
+        print("  " + row("async", async_result))
+        if sync_result["rps"]:
+            print(f"  async/sync throughput: {async_result['rps'] / sync_result['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", default="http://localhost:8000")
+    parser.add_argument("--async-url", default="http://localhost:8001")
+    parser.add_argument("--event-id", help="Also benchmark GET /events/{event_id}")
+    parser.add_argument("--token", help="Participant JWT for the /participant endpoints")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent clients per endpoint")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint and mode")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the SMS provider's Messages API, for offline benchmarks.
+
+Accepts POST /2010-04-01/Accounts/{sid}/Messages.json like Twilio does,
+waits `--latency-ms` and answers 201 with a message SID. A fraction of
+requests can fail with `--error-rate` (half 429, half 503) to exercise
+retries. Point the API at it with:
+
+    SMS_PROVIDER_BASE_URL=http://127.0.0.1:8025
+
+When a message carries a StatusCallback URL, the fake posts signed 'sent'
+and then 'delivered' (or 'undelivered', see `--undelivered-rate`) receipts
+to it, like the real provider. Sign with the API's TWILIO_AUTH_TOKEN.
+
+Usage:
+    python benchmarks/fake_sms_provider.py --port 8025 --latency-ms 80 --auth-token $TWILIO_AUTH_TOKEN
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import random
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+
+def sign(auth_token: str, url: str, params: dict) -> str:
+    payload = url + "".join(f"{name}{params[name]}" for name in sorted(params))
+    return base64.b64encode(hmac.new(auth_token.encode(), payload.encode(), hashlib.sha1).digest()).decode()
+
+
+def make_app(args) -> web.Application:
+    stats = {"accepted": 0, "rejected": 0, "callbacks": 0, "callback_errors": 0}
+    callbacks: set = set()
+
+    async def post_receipts(url: str, params: dict) -> None:
+        final = "undelivered" if random.random() < args.undelivered_rate else "delivered"
+        for message_status in ("sent", final):
+            await asyncio.sleep(args.callback_delay_ms / 1000)
+            form = {**params, "MessageStatus": message_status}
+            if final == "undelivered" and message_status == final:
+                form["ErrorCode"] = "30003"
+            headers = {"X-Twilio-Signature": sign(args.auth_token, url, form)}
+            try:
+                async with app["http"].post(url, data=form, headers=headers) as response:
+                    stats["callbacks" if response.status < 300 else "callback_errors"] += 1
+            except aiohttp.ClientError:
+                stats["callback_errors"] += 1
+
+    async def create_message(request: web.Request) -> web.Response:
+        form = await request.post()
+        if args.latency_ms:
+            await asyncio.sleep(args.latency_ms / 1000)
+
+        if random.random() < args.error_rate:
+            stats["rejected"] += 1
+            status = random.choice((429, 503))
+            return web.json_response(
+                {"code": 20429 if status == 429 else 20503, "message": "Simulated provider error", "status": status},
+                status=status
+            )
+
+        if not form.get("To") or not form.get("Body"):
+            stats["rejected"] += 1
+            return web.json_response(
+                {"code": 21604, "message": "A 'To' phone number and 'Body' are required", "status": 400},
+                status=400
+            )
+
+        stats["accepted"] += 1
+        sid = f"SM{uuid.uuid4().hex}"
+        account_sid = request.match_info["account_sid"]
+
+        if form.get("StatusCallback"):
+            params = {"MessageSid": sid, "AccountSid": account_sid, "To": form["To"], "From": form.get("From", "")}
+            task = asyncio.create_task(post_receipts(form["StatusCallback"], params))
+            callbacks.add(task)
+            task.add_done_callback(callbacks.discard)
+
+        return web.json_response({
+            "sid": sid,
+            "account_sid": account_sid,
+            "to": form["To"],
+            "from": form.get("From"),
+            "body": form["Body"],
+            "status": "queued",
+        }, status=201)
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    async def http_session(app: web.Application):
+        app["http"] = aiohttp.ClientSession()
+        yield
+        await app["http"].close()
+
+    app = web.Application()
+    app.cleanup_ctx.append(http_session)
+    app.router.add_post("/2010-04-01/Accounts/{account_sid}/Messages.json", create_message)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=80, help="Simulated provider response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests to fail (0-1)")
+    parser.add_argument("--auth-token", default="benchmark", help="Signs status callbacks")
+    parser.add_argument("--callback-delay-ms", type=float, default=500, help="Delay before each receipt")
+    parser.add_argument("--undelivered-rate", type=float, default=0.02, help="Fraction reported undelivered")
+    args = parser.parse_args()
+    web.run_app(make_app(args), host=args.host, port=args.port)
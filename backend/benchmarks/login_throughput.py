@@ -0,0 +1,98 @@
+"""
+Measure admin login throughput, and the latency of a cheap endpoint during a login burst.
+
+Runs against a live server. `--concurrency` clients log in back-to-back for
+`--duration` seconds while GET /events/ is sampled. With bcrypt off the request
+threads, probe latency should stay close to idle. Logins beyond the hashing
+pool's capacity are rejected with 503 instead of queueing.
+
+Usage:
+    python benchmarks/login_throughput.py \\
+        --email admin@example.com --password '<password>' --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+
+
+async def sample_latency(session: aiohttp.ClientSession, url: str, duration: float) -> list[float]:
+    """Hit url back-to-back for `duration` seconds, returning latencies in ms"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def login_loop(
+    session: aiohttp.ClientSession,
+    url: str,
+    credentials: dict,
+    duration: float,
+    statuses: Counter,
+    latencies: list[float]
+) -> None:
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.post(url, json=credentials) as response:
+            await response.read()
+            statuses[response.status] += 1
+            if response.status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            elif response.status == 503:
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+
+def summarize(label: str, latencies: list[float]) -> None:
+    if not latencies:
+        print(f"{label:<18} n=0")
+        return
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else max(latencies)
+    print(
+        f"{label:<18} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.1f}ms  "
+        f"p95={p95:7.1f}ms  max={max(latencies):7.1f}ms"
+    )
+
+
+async def main(args) -> None:
+    probe_url = f"{args.base_url}/events/"
+    login_url = f"{args.base_url}/admin/auth/login"
+    credentials = {"email": args.email, "password": args.password}
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency + 1)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        idle = await sample_latency(session, probe_url, args.duration)
+
+        statuses: Counter = Counter()
+        login_latencies: list[float] = []
+        logins = asyncio.gather(*(
+            login_loop(session, login_url, credentials, args.duration, statuses, login_latencies)
+            for _ in range(args.concurrency)
+        ))
+        loaded = await sample_latency(session, probe_url, args.duration)
+        await logins
+
+    summarize("idle probe", idle)
+    summarize("probe under logins", loaded)
+    summarize("successful logins", login_latencies)
+    print(f"login throughput: {statuses[200] / args.duration:.1f}/s  statuses: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True, help="Existing admin email")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run each phase")
+    asyncio.run(main(parser.parse_args()))
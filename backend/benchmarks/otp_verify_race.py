@@ -0,0 +1,100 @@
+"""
+Check that concurrent OTP verifications can't both succeed or exceed the attempt limit.
+
+Runs directly against the configured OTP store (for the SQL store, the
+database in DATABASE_URL). For each round, one code is issued for a throwaway
+phone number, then `--concurrency` threads verify at the same moment:
+  - all with the correct code: exactly one may succeed
+  - all with a wrong code: at most `max_attempts` may be counted as attempts
+Exits non-zero if either is violated. This stands in for a unit test (the
+repo has no test suite) and needs a live store, so it is run by hand.
+
+Usage:
+    python benchmarks/otp_verify_race.py --rounds 20 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services.otp_store import get_otp_store, VERIFIED, INVALID  # noqa: E402
+
+MAX_ATTEMPTS = 3
+PURPOSE = "login"
+
+
+def race(concurrency: int, phone_number: str, otp_code: str) -> Counter:
+    """Verify from `concurrency` threads released together; returns outcome counts"""
+    store = get_otp_store()
+    barrier = threading.Barrier(concurrency)
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+
+    def worker():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            result = store.verify(db, phone_number, PURPOSE, otp_code, MAX_ATTEMPTS)
+            with lock:
+                outcomes[result.status] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def issue(phone_number: str, otp_code: str) -> None:
+    db = SessionLocal()
+    try:
+        get_otp_store().issue(db, phone_number, PURPOSE, otp_code, 600)
+    finally:
+        db.close()
+
+
+def cleanup(phone_number: str) -> None:
+    db = SessionLocal()
+    try:
+        get_otp_store().invalidate(db, phone_number, PURPOSE)
+    finally:
+        db.close()
+
+
+def main(args) -> int:
+    failures = 0
+    for round_number in range(args.rounds):
+        # Unique per round; fits otp_codes.phone_number
+        phone_number = f"+0{uuid.uuid4().int % 10 ** 12:012d}"
+
+        issue(phone_number, "123456")
+        correct = race(args.concurrency, phone_number, "123456")
+        if correct[VERIFIED] != 1:
+            failures += 1
+            print(f"round {round_number}: correct code verified {correct[VERIFIED]} times: {dict(correct)}")
+
+        issue(phone_number, "123456")
+        wrong = race(args.concurrency, phone_number, "000000")
+        if wrong[INVALID] > MAX_ATTEMPTS:
+            failures += 1
+            print(f"round {round_number}: {wrong[INVALID]} wrong attempts counted (limit {MAX_ATTEMPTS}): {dict(wrong)}")
+
+        cleanup(phone_number)
+
+    print(f"{args.rounds} rounds x {args.concurrency} threads: {failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="Keep within the connection pool size")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+Check that a participant's result list is served from one query, and from
+the cache (no queries) on a repeat call.
+
+Runs against the database in DATABASE_URL. Picks the participants with the
+most checked-in bookings (so per-booking lazy loads would show up as extra
+queries) and counts the statements issued by get_participant_results.
+
+Usage:
+    python benchmarks/participant_results_queries.py --participants 10
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import event, func
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import Booking  # noqa: E402
+from app.services.result_service import get_participant_results, invalidate_participant_results  # noqa: E402
+
+
+class QueryCounter:
+    """Counts statements executed on the engine while active"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+def busiest_participants(db, limit: int) -> list:
+    return (
+        db.query(Booking.participant_id, func.count(Booking.id))
+        .filter(Booking.booking_status == "checked_in")
+        .group_by(Booking.participant_id)
+        .order_by(func.count(Booking.id).desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def main(args) -> int:
+    db = SessionLocal()
+    try:
+        participants = busiest_participants(db, args.participants)
+        if not participants:
+            print("No checked-in bookings to check against")
+            return 1
+
+        failures = 0
+        for participant_id, bookings in participants:
+            invalidate_participant_results(participant_id)
+            with QueryCounter() as miss:
+                results = get_participant_results(db, participant_id)
+            with QueryCounter() as hit:
+                get_participant_results(db, participant_id)
+
+            if miss.count != 1 or hit.count != 0:
+                failures += 1
+            print(f"{participant_id}: {bookings} bookings, {len(results)} results, "
+                  f"{miss.count} queries uncached, {hit.count} cached")
+
+        print(f"{len(participants)} participants: {failures} failures (expected 1 query uncached, 0 cached)")
+        return 1 if failures else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=10)
+    sys.exit(main(parser.parse_args()))
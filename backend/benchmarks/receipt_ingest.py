@@ -0,0 +1,58 @@
+"""
+Measure how fast the API accepts SMS delivery receipts.
+
+Posts `--receipts` signed status callbacks to a running API with
+`--concurrency` requests in flight, half 'sent' and half 'delivered' for
+random SIDs, then reports accepted receipts per second. The receipts don't
+match any queued message, so only the sms_delivery_receipts table grows.
+
+Usage:
+    python benchmarks/receipt_ingest.py --receipts 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.services.sms_client import request_signature, status_callback_url  # noqa: E402
+
+
+async def main(args) -> None:
+    url = args.url or status_callback_url()
+    in_flight = asyncio.Semaphore(args.concurrency)
+    outcomes: dict = {}
+
+    async def post(session: aiohttp.ClientSession, index: int) -> None:
+        form = {
+            "MessageSid": f"SMbench{uuid.uuid4().hex}",
+            "MessageStatus": "sent" if index % 2 else "delivered",
+            "AccountSid": settings.TWILIO_ACCOUNT_SID,
+        }
+        # The signature covers the public callback URL, which may differ from --url
+        headers = {"X-Twilio-Signature": request_signature(settings.TWILIO_AUTH_TOKEN, status_callback_url(), form)}
+        async with in_flight:
+            async with session.post(url, data=form, headers=headers) as response:
+                outcomes[response.status] = outcomes.get(response.status, 0) + 1
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.concurrency)) as session:
+        await asyncio.gather(*(post(session, index) for index in range(args.receipts)))
+    elapsed = time.perf_counter() - started
+
+    accepted = outcomes.get(204, 0)
+    print(f"{accepted}/{args.receipts} accepted in {elapsed:.2f}s ({accepted / elapsed:.0f}/s); statuses: {outcomes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Callback endpoint to hit (default: the configured callback URL)")
+    parser.add_argument("--receipts", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""
+Measure SMS send throughput against the fake provider.
+
+Compares three ways of sending `--messages` messages:
+  - fresh:  a new HTTP session per message (no connection reuse)
+  - pooled: the shared keep-alive SMSClient from `--concurrency` threads
+  - async:  SMSClient.send_async with `--concurrency` messages in flight
+
+Start the fake provider first:
+    python benchmarks/fake_sms_provider.py --port 8025 --latency-ms 80
+
+Usage:
+    python benchmarks/sms_throughput.py --url http://127.0.0.1:8025 --messages 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sms_client import SMSClient, SMSSendError  # noqa: E402
+
+TO_NUMBER = "+60123456789"
+BODY = "Your verification code is: 123456. It will expire in 10 minutes."
+
+
+def make_client(args) -> SMSClient:
+    return SMSClient(
+        base_url=args.url,
+        account_sid="ACbenchmark",
+        auth_token="benchmark",
+        from_number="+15005550006",
+        pool_size=args.concurrency
+    )
+
+
+def send_counted(client: SMSClient) -> bool:
+    try:
+        client.send(TO_NUMBER, BODY)
+        return True
+    except SMSSendError:
+        return False
+
+
+def run_fresh(args) -> int:
+    def send(_):
+        client = make_client(args)
+        try:
+            return send_counted(client)
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return sum(pool.map(send, range(args.messages)))
+
+
+def run_pooled(args) -> int:
+    client = make_client(args)
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            return sum(pool.map(lambda _: send_counted(client), range(args.messages)))
+    finally:
+        client.close()
+
+
+def run_async(args) -> int:
+    async def main():
+        client = make_client(args)
+        in_flight = asyncio.Semaphore(args.concurrency)
+
+        async def send():
+            async with in_flight:
+                try:
+                    await client.send_async(TO_NUMBER, BODY)
+                    return True
+                except SMSSendError:
+                    return False
+
+        try:
+            return sum(await asyncio.gather(*(send() for _ in range(args.messages))))
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+MODES = {"fresh": run_fresh, "pooled": run_pooled, "async": run_async}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8025")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--modes", default="fresh,pooled,async")
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        started = time.perf_counter()
+        sent = MODES[mode](args)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:>6}: {sent}/{args.messages} sent in {elapsed:.2f}s ({sent / elapsed:.1f} msg/s)")
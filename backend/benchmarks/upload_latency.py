@@ -0,0 +1,84 @@
+"""
+Measure latency of a cheap endpoint while result PDFs are being uploaded.
+
+Runs against a live server. Latency of GET /events/ is sampled first on an
+idle server, then while one upload per booking ID is in flight. With uploads
+handled off the event loop, the two distributions should be about the same.
+
+Usage:
+    python benchmarks/upload_latency.py \\
+        --token <admin JWT> --pdf sample.pdf \\
+        --booking-id <checked-in booking> --booking-id <...>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+
+async def sample_latency(session: aiohttp.ClientSession, url: str, duration: float) -> list[float]:
+    """Hit url back-to-back for `duration` seconds, returning latencies in ms"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def upload(session: aiohttp.ClientSession, base_url: str, token: str, booking_id: str, pdf: bytes) -> int:
+    form = aiohttp.FormData()
+    form.add_field("booking_id", booking_id)
+    form.add_field("result_category", "Normal")
+    form.add_field("file", pdf, filename="result.pdf", content_type="application/pdf")
+    async with session.post(
+        f"{base_url}/admin/results",
+        data=form,
+        headers={"Authorization": f"Bearer {token}"}
+    ) as response:
+        await response.read()
+        return response.status
+
+
+def summarize(label: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else max(latencies)
+    print(
+        f"{label:<18} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.1f}ms  "
+        f"p95={p95:7.1f}ms  max={max(latencies):7.1f}ms"
+    )
+
+
+async def main(args) -> None:
+    with open(args.pdf, "rb") as f:
+        pdf = f.read()
+
+    probe_url = f"{args.base_url}/events/"
+    async with aiohttp.ClientSession() as session:
+        idle = await sample_latency(session, probe_url, args.duration)
+
+        uploads = asyncio.gather(*(
+            upload(session, args.base_url, args.token, booking_id, pdf)
+            for booking_id in args.booking_id
+        ))
+        loaded = await sample_latency(session, probe_url, args.duration)
+        statuses = await uploads
+
+    summarize("idle", idle)
+    summarize("during uploads", loaded)
+    print(f"upload statuses: {statuses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Admin access token")
+    parser.add_argument("--pdf", required=True, help="PDF file to upload")
+    parser.add_argument("--booking-id", action="append", required=True, help="Checked-in booking without a result")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to sample each phase")
+    asyncio.run(main(parser.parse_args()))
@@ -57,17 +57,29 @@ export default function EventParticipantsPage() {
     const token = localStorage.getItem('access_token');
     
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/events/${eventId}/participants`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      // The API returns participants a page at a time; follow next_cursor to load them all
+      const all: Participant[] = [];
+      let cursor: string | null = null;
+      let eventData: Event | null = null;
+
+      do {
+        const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const res: Response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/events/${eventId}/participants${query}`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        });
+
+        if (!res.ok) throw new Error('Failed to fetch participants');
 
-      if (!res.ok) throw new Error('Failed to fetch participants');
+        const data = await res.json();
+        eventData = data.event;
+        all.push(...data.participants);
+        cursor = data.next_cursor;
+      } while (cursor);
 
-      const data = await res.json();
-      setEvent(data.event);
-      setParticipants(data.participants);
+      setEvent(eventData);
+      setParticipants(all);
     } catch (err: any) {
       console.error(err);
       setError('Failed to load participants');
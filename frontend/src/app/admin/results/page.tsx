@@ -6,7 +6,7 @@ import ProtectedRoute from '@/components/auth/ProtectedRoute';
 import DashboardLayout from '@/components/layout/DashboardLayout';
 import { Card, CardContent } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
-import { FileText, Send, CheckCircle, Clock } from 'lucide-react';
+import { FileText, Send, CheckCircle, Clock, XCircle } from 'lucide-react';
 
 interface Result {
   id: string;
@@ -15,7 +15,8 @@ interface Result {
   result_notes: string | null;
   uploaded_at: string;
   sms_sent: boolean;
-  sms_sent_at: string | null;
+  sms_sent_at: string | null; // Set once the SMS provider accepts the message
+  sms_delivery_status: 'sent' | 'delivered' | 'failed' | null;
 }
 
 export default function AdminResultsPage() {
@@ -79,7 +80,7 @@ export default function AdminResultsPage() {
       // Update local state
       setResults(prev => prev.map(r => 
         r.id === resultId 
-          ? { ...r, sms_sent: true, sms_sent_at: new Date().toISOString() }
+          ? { ...r, sms_sent: true }
           : r
       ));
     } catch (err: any) {
@@ -163,13 +164,23 @@ export default function AdminResultsPage() {
                             Uploaded: {new Date(result.uploaded_at).toLocaleString()}
                           </p>
                           
-                          {result.sms_sent ? (
+                          {result.sms_delivery_status === 'failed' ? (
+                            <div className="flex items-center gap-2 text-red-600">
+                              <XCircle className="w-4 h-4" />
+                              <span>SMS Failed</span>
+                            </div>
+                          ) : result.sms_sent_at ? (
                             <div className="flex items-center gap-2 text-emerald-600">
                               <CheckCircle className="w-4 h-4" />
                               <span>
-                                SMS Sent: {new Date(result.sms_sent_at!).toLocaleString()}
+                                SMS {result.sms_delivery_status === 'delivered' ? 'Delivered' : 'Sent'}: {new Date(result.sms_sent_at).toLocaleString()}
                               </span>
                             </div>
+                          ) : result.sms_sent ? (
+                            <div className="flex items-center gap-2 text-amber-600">
+                              <Clock className="w-4 h-4" />
+                              <span>SMS Queued</span>
+                            </div>
                           ) : (
                             <div className="flex items-center gap-2 text-amber-600">
                               <Clock className="w-4 h-4" />
@@ -14,6 +14,7 @@ interface ResultDetail {
   result_category: string;
   result_notes: string | null;
   result_file_url: string | null;
+  download_expires_in_minutes: number | null;
   event_name: string;
   event_date: string;
 }
@@ -269,7 +270,7 @@ export default function ViewResultPage() {
                     Download Full Report (PDF)
                   </Button>
                   <p className="text-xs text-gray-500 text-center mt-2">
-                    Download link valid for 1 hour
+                    Download link valid for {result.download_expires_in_minutes ?? 10} minutes
                   </p>
                 </div>
               )}